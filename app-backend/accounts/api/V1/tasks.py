@@ -26,3 +26,15 @@ def send_email_with_celery(template: str, subject: str, context: dict, from_emai
     email.content_subtype = "html"
     email.send()
 
+
+
+@shared_task
+def generate_profile_image_variants(pk):
+    """
+    Builds the resized WebP/JPEG derivatives of a profile image.
+    """
+    from config.images import refresh_derivatives
+    from accounts.models import Profile
+
+    profile = Profile.objects.filter(pk=pk).first()
+    return bool(profile) and refresh_derivatives(profile)
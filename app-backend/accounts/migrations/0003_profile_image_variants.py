@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_profile_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
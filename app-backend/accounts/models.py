@@ -59,6 +59,7 @@ class Profile(models.Model):
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
     image = models.ImageField(upload_to="profile/", default="profile/default.png")
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     phone_number = models.CharField(max_length=20, validators=[validate_iranian_cellphone_number])
     created_date = models.DateTimeField(auto_now_add=True)
     updated_date = models.DateTimeField(auto_now=True)
@@ -1,9 +1,16 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from .models import CustomeUser,Profile
+from .api.V1.tasks import generate_profile_image_variants
+from config.images import schedule_derivatives
 
 
 @receiver(post_save, sender=CustomeUser)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
-        Profile.objects.create(user=instance,pk=instance.pk)
\ No newline at end of file
+        Profile.objects.create(user=instance,pk=instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+def queue_profile_image_variants(sender, instance, **kwargs):
+    schedule_derivatives(instance, generate_profile_image_variants)
@@ -0,0 +1,192 @@
+"""
+Latency percentiles, SQL count and response size of the main endpoints,
+checked against ``benchmarks/baseline.json``.
+
+    pytest benchmarks/bench_endpoints.py -s
+    BENCH_UPDATE_BASELINE=1 pytest benchmarks/bench_endpoints.py -s
+
+Every endpoint is requested ``BENCH_ROUNDS`` times through the test client
+(with real JWT authentication) against a seeded dataset, with the cache
+cleared before each request so snapshots can't hide the work. A run fails
+when an endpoint issues more queries than its baseline, or when its p95
+latency or its response size grows by more than ``BENCH_THRESHOLD``
+(a fraction, default 0.25) over the baseline.
+
+Latencies depend on the machine: regenerate the baseline on the machine
+that runs the comparison. Query counts and sizes are portable.
+"""
+import json
+import os
+import statistics
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import CustomeUser, Profile
+from menu.models import Category, MenuItem
+from reservations.models import Reservation, SeatingPlan
+
+BASELINE = Path(__file__).with_name("baseline.json")
+ROUNDS = int(os.environ.get("BENCH_ROUNDS", 30))
+THRESHOLD = float(os.environ.get("BENCH_THRESHOLD", 0.25))
+UPDATE_BASELINE = os.environ.get("BENCH_UPDATE_BASELINE") == "1"
+# زیر این مقدار اختلاف زمان نویز اندازه‌گیری است
+NOISE_MS = 2.0
+
+MENU_ITEMS = 5_000
+USERS = 200
+RESERVATIONS_PER_USER = 10
+
+
+@pytest.fixture(scope="module")
+def dataset(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        categories = [Category.objects.create(title=title) for title in ("صبحانه", "ناهار", "شام", "نوشیدنی")]
+        items = MenuItem.objects.bulk_create([
+            MenuItem(
+                title=f"آیتم شماره {i}",
+                description="توضیحات آیتم با مواد اولیه تازه و طعم اصیل ایرانی. " * 3,
+                price=10000 + i * 10,
+                discount_percent=i % 3 * 10,
+                is_featured=i % 10 == 0,
+                stock=50,
+                image=f"menu_items/item-{i % 6}.png",
+            )
+            for i in range(MENU_ITEMS)
+        ])
+        Through = MenuItem.category.through
+        Through.objects.bulk_create([
+            Through(menuitem_id=item.pk, category_id=categories[i % len(categories)].pk) for i, item in enumerate(items)
+        ])
+
+        password = make_password("bench-pass")
+        users = CustomeUser.objects.bulk_create([
+            CustomeUser(email=f"user{i}@example.com", password=password, is_verified=True) for i in range(USERS)
+        ])
+        Profile.objects.bulk_create([
+            Profile(pk=user.pk, user=user, first_name="کاربر", last_name=str(i), phone_number="09120000000")
+            for i, user in enumerate(users)
+        ])
+        tomorrow = timezone.now().date() + timedelta(days=1)
+        Reservation.objects.bulk_create([
+            Reservation(user=user, date=tomorrow + timedelta(days=n), time=f"{12 + n % 10}:00", people=2 + n % 4)
+            for user in users for n in range(RESERVATIONS_PER_USER)
+        ])
+        admin = CustomeUser.objects.create_superuser(email="admin@example.com", password="bench-pass")
+        # هر دور بنچمارک همان بازه را رزرو می‌کند
+        SeatingPlan.objects.create(title="bench", covers_per_slot=1_000_000)
+
+        yield {"customer": users[0], "admin": admin, "item": items[0], "category": categories[0]}
+
+        Reservation.objects.all().delete()
+        SeatingPlan.objects.all().delete()
+        MenuItem.objects.all().delete()
+        Category.objects.all().delete()
+        CustomeUser.objects.all().delete()
+
+
+def client_for(user):
+    client = APIClient()
+    if user is not None:
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    return client
+
+
+# نام، متد، نقش کاربر، تابع ساخت آدرس و بدنه درخواست
+ENDPOINTS = [
+    ("menu-items", "get", None, lambda d: "/menu/api/V1/menu-items/", None),
+    ("menu-items-filtered", "get", None,
+     lambda d: f"/menu/api/V1/menu-items/?category={d['category'].pk}&ordering=final_price", None),
+    ("menu-item-detail", "get", None, lambda d: f"/menu/api/V1/menu-items/{d['item'].slug}/", None),
+    ("menu-by-category", "get", None, lambda d: "/menu/api/V1/menu-by-category/", None),
+    ("reserve", "post", "customer", lambda d: "/reservations/api/V1/reserve/",
+     lambda d: {"date": (timezone.now().date() + timedelta(days=2)).isoformat(), "time": "13:00:00", "people": 2}),
+    ("user-reservations", "get", "customer", lambda d: "/reservations/api/V1/user-reservations/", None),
+    ("admin-reservations", "get", "admin", lambda d: "/dashboard/api/V1/admin/reservation/", None),
+    ("admin-users", "get", "admin", lambda d: "/dashboard/api/V1/admin/users/", None),
+    ("admin-menu", "get", "admin", lambda d: "/dashboard/api/V1/admin/menu/", None),
+    ("admin-categories", "get", "admin", lambda d: "/dashboard/api/V1/admin/categories/", None),
+]
+
+
+def measure(client, method, url, data):
+    """
+    ``{p50, p95, p99, queries, bytes}`` over ``ROUNDS`` requests; queries and
+    size come from one extra request so capturing SQL doesn't skew timings.
+    """
+    send = getattr(client, method)
+    cache.clear()
+    send(url, data, format="json")  # گرم کردن
+
+    timings = []
+    for _ in range(ROUNDS):
+        cache.clear()
+        start = time.perf_counter()
+        response = send(url, data, format="json")
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code < 400, response.content[:200]
+
+    cache.clear()
+    with CaptureQueriesContext(connection) as ctx:
+        response = send(url, data, format="json")
+
+    cuts = statistics.quantiles(timings, n=100, method="inclusive")
+    return {
+        "p50": round(cuts[49], 2),
+        "p95": round(cuts[94], 2),
+        "p99": round(cuts[98], 2),
+        "queries": len(ctx.captured_queries),
+        "bytes": len(response.content),
+    }
+
+
+def regressions(result, baseline):
+    problems = []
+    if result["queries"] > baseline["queries"]:
+        problems.append(f"queries {baseline['queries']} -> {result['queries']}")
+    if result["bytes"] > baseline["bytes"] * (1 + THRESHOLD):
+        problems.append(f"bytes {baseline['bytes']} -> {result['bytes']}")
+    if result["p95"] > baseline["p95"] * (1 + THRESHOLD) and result["p95"] - baseline["p95"] > NOISE_MS:
+        problems.append(f"p95 {baseline['p95']}ms -> {result['p95']}ms")
+    return problems
+
+
+def load_baseline():
+    if BASELINE.exists():
+        return json.loads(BASELINE.read_text(encoding="utf-8"))
+    return {}
+
+
+def save_baseline(name, result):
+    baseline = load_baseline()
+    baseline[name] = result
+    BASELINE.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("name, method, role, url, data", ENDPOINTS, ids=[endpoint[0] for endpoint in ENDPOINTS])
+def test_endpoint_against_baseline(dataset, mocker, name, method, role, url, data):
+    # صف ایمیل رزرو بخشی از هزینه درخواست نیست
+    mocker.patch("reservations.api.V1.views.send_reservation_email.delay")
+
+    client = client_for(dataset[role] if role else None)
+    result = measure(client, method, url(dataset), data(dataset) if data else None)
+    print(f"\n{name:>20}: p50 {result['p50']:.2f}ms  p95 {result['p95']:.2f}ms  p99 {result['p99']:.2f}ms  "
+          f"{result['queries']} queries  {result['bytes'] / 1024:.1f} KiB")
+
+    baseline = load_baseline().get(name)
+    if UPDATE_BASELINE or baseline is None:
+        save_baseline(name, result)
+        return
+
+    problems = regressions(result, baseline)
+    assert not problems, f"{name} regressed past {THRESHOLD:.0%}: " + ", ".join(problems)
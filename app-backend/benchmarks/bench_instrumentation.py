@@ -0,0 +1,50 @@
+"""
+Cost of ``ServerTimingMiddleware`` on a menu list request that runs real
+queries, serialization and rendering.
+
+    pytest benchmarks/bench_instrumentation.py -s
+"""
+import statistics
+import time
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from menu.models import Category, MenuItem
+
+MENU_ITEMS_URL = "/menu/api/V1/menu-items/"
+ROUNDS = 200
+
+
+def median_ms(client):
+    timings = []
+    for _ in range(ROUNDS):
+        cache.clear()
+        start = time.perf_counter()
+        client.get(MENU_ITEMS_URL, {"ordering": "final_price"})
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+@pytest.mark.django_db
+def test_server_timing_overhead_is_small():
+    category = Category.objects.create(title="غذای اصلی")
+    items = MenuItem.objects.bulk_create([
+        MenuItem(title=f"آیتم {i}", description="-", price=10000 + i) for i in range(500)
+    ])
+    category.categories.add(*items)
+    client = APIClient()
+
+    without = [name for name in settings.MIDDLEWARE if name != "config.instrumentation.ServerTimingMiddleware"]
+    with override_settings(MIDDLEWARE=without):
+        median_ms(client)  # گرم کردن
+        plain = median_ms(client)
+    with override_settings(SERVER_TIMING_HEADER=True):
+        instrumented = median_ms(client)
+
+    overhead = instrumented - plain
+    print(f"\nmenu-items: {plain:.2f}ms -> {instrumented:.2f}ms with Server-Timing ({overhead / plain:+.1%})")
+    assert overhead < max(plain * 0.05, 0.3)
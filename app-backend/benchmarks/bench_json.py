@@ -0,0 +1,76 @@
+"""
+Encode/decode time and size of the menu list payload with DRF's stdlib JSON
+renderer versus ``config.renderers.FastJSONRenderer`` (orjson).
+
+    pytest benchmarks/bench_json.py -s
+"""
+import io
+import statistics
+import time
+
+import pytest
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from config.renderers import FastJSONRenderer, FastJSONParser
+from menu.api.V1.serializers import MenuItemSerializer
+from menu.models import Category, MenuItem
+
+ROUNDS = 7
+
+
+def median_ms(func):
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+@pytest.fixture
+def menu_payload(db):
+    categories = [Category.objects.create(title=title) for title in ("پیش‌غذا", "غذای اصلی", "نوشیدنی")]
+
+    def build(size):
+        MenuItem.objects.all().delete()
+        items = MenuItem.objects.bulk_create([
+            MenuItem(
+                title=f"آیتم شماره {i}",
+                description="توضیحات آیتم با مواد اولیه تازه و طعم اصیل ایرانی. " * 3,
+                price=10000 + i,
+                discount_percent=i % 3 * 10,
+                image=f"menu_items/item-{i % 6}.png",
+            )
+            for i in range(size)
+        ])
+        Through = MenuItem.category.through
+        Through.objects.bulk_create([
+            Through(menuitem_id=item.pk, category_id=categories[i % 3].pk) for i, item in enumerate(items)
+        ])
+        request = Request(APIRequestFactory().get("/"))
+        queryset = MenuItem.objects.prefetch_related("category")
+        return MenuItemSerializer(queryset, many=True, context={"request": request}).data
+
+    return build
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("size", [1_000, 10_000])
+def test_fast_json_encodes_menu_faster(menu_payload, size):
+    data = menu_payload(size)
+    stdlib, fast = JSONRenderer(), FastJSONRenderer()
+
+    body = stdlib.render(data)
+    assert fast.render(data) == body
+
+    encode_std = median_ms(lambda: stdlib.render(data))
+    encode_fast = median_ms(lambda: fast.render(data))
+    decode_std = median_ms(lambda: JSONParser().parse(io.BytesIO(body)))
+    decode_fast = median_ms(lambda: FastJSONParser().parse(io.BytesIO(body)))
+
+    print(f"\n{size} items, {len(body) / 1024:.0f} KiB (identical bytes): "
+          f"encode {encode_std:.1f}ms -> {encode_fast:.1f}ms, decode {decode_std:.1f}ms -> {decode_fast:.1f}ms")
+    assert encode_fast < encode_std
@@ -0,0 +1,76 @@
+"""
+Pagination benchmark for the public menu list on a 100k-item table.
+
+Not collected by the regular test run; invoke it explicitly:
+
+    pytest benchmarks/bench_pagination.py -s
+"""
+import statistics
+import time
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.pagination import Cursor
+from rest_framework.test import APIClient
+
+from menu.api.V1.paginations import MenuItemCursorPagination
+from menu.models import MenuItem
+
+MENU_ITEMS_URL = "/menu/api/V1/menu-items/"
+ITEMS = 100_000
+DEEP_POSITION = 99_000
+ROUNDS = 20
+
+
+@pytest.fixture
+def big_menu(db):
+    MenuItem.objects.bulk_create(
+        [MenuItem(title=f"آیتم {i}", slug=f"item-{i}", description="-", price=10000) for i in range(ITEMS)],
+        batch_size=5000,
+    )
+
+
+def deep_cursor_url():
+    created_date = (
+        MenuItem.objects.order_by("-created_date", "-id")
+        .values_list("created_date", flat=True)[DEEP_POSITION]
+    )
+    paginator = MenuItemCursorPagination()
+    paginator.base_url = "http://testserver" + MENU_ITEMS_URL
+    return paginator.encode_cursor(Cursor(offset=0, reverse=False, position=str(created_date)))
+
+
+def median_ms(client, url):
+    timings = []
+    for _ in range(ROUNDS):
+        cache.clear()
+        start = time.perf_counter()
+        resp = client.get(url)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert resp.status_code == 200
+    return statistics.median(timings)
+
+
+@pytest.mark.django_db
+def test_deep_cursor_page_costs_the_same_as_first_page(big_menu):
+    client = APIClient()
+    deep_url = deep_cursor_url()
+    offset_url = f"/dashboard/api/V1/admin/menu/?page={DEEP_POSITION // 15}"
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert len(client.get(deep_url).json()["results"]) == 15
+    assert not any("OFFSET" in q["sql"] for q in ctx.captured_queries)
+
+    first = median_ms(client, MENU_ITEMS_URL)
+    deep = median_ms(client, deep_url)
+
+    from accounts.models import CustomeUser
+    admin = CustomeUser.objects.create_superuser(email="bench@example.com", password="bench1234")
+    client.force_authenticate(user=admin)
+    offset = median_ms(client, offset_url)
+
+    print(f"\n{ITEMS} items: page 1 {first:.2f}ms, cursor page {DEEP_POSITION // 15} {deep:.2f}ms, "
+          f"offset page {DEEP_POSITION // 15} {offset:.2f}ms")
+    assert deep < first * 2
@@ -0,0 +1,122 @@
+"""
+Burst of concurrent bookings for the same few slots, and the reservation
+listings on a 100k-row table.
+
+    pytest benchmarks/bench_reservations.py -s
+
+Every thread runs its own connection against the WAL database configured in
+``benchmarks/conftest.py`` and books through ``reservations.capacity.book``
+like ``POST /reserve/`` does. The run fails if any slot holds more covers
+than its capacity or if a slot counter disagrees with its reservations.
+"""
+import random
+import threading
+import time as clock
+from datetime import date, time, timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.models import CustomeUser
+from reservations.capacity import book, SlotFull
+from reservations.models import Reservation, SeatingPlan, SlotOccupancy
+
+THREADS = 8
+BOOKINGS_PER_THREAD = 150
+SLOTS = [time(19, 0), time(19, 30), time(20, 0)]
+COVERS_PER_SLOT = 120
+
+LISTED_RESERVATIONS = 100_000
+LISTED_USERS = 1_000
+LISTINGS = [
+    ("user-reservations", "/reservations/api/V1/user-reservations/"),
+    ("customer-dashboard", "/dashboard/api/V1/my-reserved/"),
+    ("admin-reservations", "/dashboard/api/V1/admin/reservation/"),
+    # لیست امشب پذیرش از ایندکس (date, time)
+    ("admin-tonight", "/dashboard/api/V1/admin/reservation/?date={today}&ordering=date,time"),
+]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_burst_bookings_never_overbook():
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode")
+        assert cursor.fetchone()[0] == "wal"
+
+    SeatingPlan.objects.create(title="bench", covers_per_slot=COVERS_PER_SLOT, slot_minutes=30)
+    users = [CustomeUser.objects.create_user(email=f"guest{i}@example.com", password="x") for i in range(THREADS)]
+    day = date.today() + timedelta(days=30)
+    confirmed = [0] * THREADS
+    rejected = [0] * THREADS
+    errors = []
+
+    def worker(index):
+        rng = random.Random(index)
+        try:
+            for _ in range(BOOKINGS_PER_THREAD):
+                slot, people = rng.choice(SLOTS), rng.randint(1, 6)
+                try:
+                    book(day, slot, people, lambda: Reservation.objects.create(
+                        user=users[index], date=day, time=slot, people=people
+                    ))
+                    confirmed[index] += people
+                except SlotFull:
+                    rejected[index] += 1
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(THREADS)]
+    start = clock.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = clock.perf_counter() - start
+
+    assert not errors, errors
+    booked = dict(Reservation.objects.filter(date=day).values_list("time").annotate(Sum("people")))
+    counters = dict(SlotOccupancy.objects.filter(date=day).values_list("slot", "covers"))
+    assert all(covers <= COVERS_PER_SLOT for covers in booked.values())
+    assert booked == counters
+    assert sum(confirmed) == sum(booked.values())
+
+    attempts = THREADS * BOOKINGS_PER_THREAD
+    print(f"\n{connection.vendor}: {attempts} bookings from {THREADS} threads in {elapsed:.2f}s "
+          f"({attempts / elapsed:.0f} bookings/s), {sum(rejected)} rejected as full, "
+          f"{sum(booked.values())}/{COVERS_PER_SLOT * len(SLOTS)} covers taken")
+
+
+@pytest.mark.django_db
+def test_listings_cost_the_same_at_100k_reservations():
+    users = CustomeUser.objects.bulk_create([
+        CustomeUser(email=f"guest{i}@example.com", is_staff=i == 0) for i in range(LISTED_USERS)
+    ])
+    today = date.today()
+    # بیشتر رزروها سابقه روزهای گذشته‌اند
+    Reservation.objects.bulk_create(
+        [Reservation(user=users[i % LISTED_USERS], date=today - timedelta(days=i % 365), time=time(12 + i % 10, 0), people=2)
+         for i in range(LISTED_RESERVATIONS)],
+        batch_size=5000,
+    )
+    client = APIClient()
+    client.force_authenticate(user=users[0])
+    client.get(LISTINGS[0][1])  # گرم کردن
+
+    for name, url in LISTINGS:
+        cache.clear()
+        start = clock.perf_counter()
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url.format(today=today.isoformat()))
+        elapsed = (clock.perf_counter() - start) * 1000
+        assert response.status_code == 200
+        # کاربر، پروفایل و ایمیل هر ردیف در یک کوئری با صفحه می‌آیند
+        assert len(ctx.captured_queries) <= 2, [query["sql"] for query in ctx.captured_queries]
+        db = sum(float(query["time"]) for query in ctx.captured_queries) * 1000
+        print(f"\n{name:>20}: {len(ctx.captured_queries)} queries ({db:.1f}ms in SQL), {elapsed:.1f}ms "
+              f"for {len(response.data['results'])} of {LISTED_RESERVATIONS} reservations")
@@ -0,0 +1,73 @@
+"""
+Search latency as the catalog grows (1k, 10k and 100k items).
+
+    pytest benchmarks/bench_search.py -s
+"""
+import random
+import statistics
+import time
+
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+
+from menu.models import MenuItem
+from menu.search import index_items
+
+MENU_ITEMS_URL = "/menu/api/V1/menu-items/"
+SIZES = (1_000, 10_000, 100_000)
+ROUNDS = 20
+SYLLABLES = ["کا", "با", "بر", "گو", "سب", "زی", "زر", "شک", "پل", "ما", "دو", "سا", "لا", "سو", "رش", "ته", "نا", "پن", "یر", "خر"]
+# واژگان مصنوعی ۸۰۰۰ کلمه‌ای تا توزیع کلمات شبیه منوی واقعی باشد
+WORDS = [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES]
+QUERY = "زعفرانی"
+MATCHES = 40
+
+
+def seed(start, count, rng):
+    items = MenuItem.objects.bulk_create(
+        [
+            MenuItem(
+                title=" ".join(rng.sample(WORDS, 2)),
+                slug=f"item-{i}",
+                description=" ".join(rng.choices(WORDS, k=12)),
+                price=10000,
+            )
+            for i in range(start, start + count)
+        ],
+        batch_size=5000,
+    )
+    index_items([item.pk for item in items])
+    # آمار جدول‌ها مثل دیتابیس واقعی به‌روز باشد تا planner ایندکس درست را انتخاب کند
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+
+def median_ms(client, query):
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        resp = client.get(MENU_ITEMS_URL, {"q": query})
+        timings.append((time.perf_counter() - start) * 1000)
+        assert resp.status_code == 200
+    return statistics.median(timings)
+
+
+@pytest.mark.django_db
+def test_search_latency_stays_flat():
+    rng = random.Random(7)
+    client = APIClient()
+    # تعداد نتایج ثابت می‌ماند و فقط اندازه کاتالوگ بزرگ می‌شود
+    matched = MenuItem.objects.bulk_create([
+        MenuItem(title=f"{QUERY} {i}", slug=f"match-{i}", description="-", price=10000) for i in range(MATCHES)
+    ])
+    index_items([item.pk for item in matched])
+    seeded = 0
+    results = {}
+    for size in SIZES:
+        seed(seeded, size - seeded, rng)
+        seeded = size
+        results[size] = median_ms(client, QUERY)
+
+    print("\n" + ", ".join(f"{size} items: {ms:.2f}ms" for size, ms in results.items()))
+    assert results[SIZES[-1]] < results[SIZES[0]] * 3
@@ -0,0 +1,95 @@
+"""
+Payload size and serialize time of the menu list: full detail shape versus
+the slim list shape and a sparse ``?fields=`` request.
+
+    pytest benchmarks/bench_serialization.py -s
+"""
+import statistics
+import time
+
+import pytest
+from django.core.cache import cache
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from menu.models import Category, MenuItem
+
+MENU_ITEMS_URL = "/menu/api/V1/menu-items/"
+ITEMS = 2_000
+PAGES = 20
+ROUNDS = 5
+
+
+@pytest.fixture
+def menu(db):
+    categories = [Category.objects.create(title=title) for title in ("پیش‌غذا", "غذای اصلی", "نوشیدنی")]
+    items = MenuItem.objects.bulk_create([
+        MenuItem(
+            title=f"آیتم {i}",
+            description="توضیحات نسبتا طولانی درباره مواد اولیه و طرز تهیه این آیتم. " * 4,
+            price=10000 + i,
+            discount_percent=i % 3 * 10,
+            image=f"menu_items/item-{i % 6}.png",
+        )
+        for i in range(ITEMS)
+    ])
+    Through = MenuItem.category.through
+    Through.objects.bulk_create([
+        Through(menuitem_id=item.pk, category_id=categories[i % 3].pk) for i, item in enumerate(items)
+    ])
+
+
+def walk(client, params):
+    """
+    Follow ``PAGES`` cursor pages and return (bytes, median ms per page).
+    """
+    size, timings = 0, []
+    for _ in range(ROUNDS):
+        url, size = MENU_ITEMS_URL, 0
+        for _ in range(PAGES):
+            cache.clear()
+            start = time.perf_counter()
+            resp = client.get(url, params if url == MENU_ITEMS_URL else None)
+            timings.append((time.perf_counter() - start) * 1000)
+            size += len(resp.content)
+            url = resp.json()["next"]
+    return size, statistics.median(timings)
+
+
+def serialize_ms(serializer_class, items, query=""):
+    request = Request(APIRequestFactory().get(f"/{query}"))
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        serializer_class(items, many=True, context={"request": request}).data
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+@pytest.mark.django_db
+def test_slim_list_halves_serialize_time(menu):
+    from menu.api.V1.serializers import MenuItemSerializer, MenuItemListSerializer
+
+    items = list(MenuItem.objects.prefetch_related("category")[:1000])
+    full = serialize_ms(MenuItemSerializer, items)
+    slim = serialize_ms(MenuItemListSerializer, items)
+    sparse = serialize_ms(MenuItemListSerializer, items, "?fields=id,title,get_price,image")
+
+    print(f"\nserialize {len(items)} items: full {full:.1f}ms, slim {slim:.1f}ms, sparse {sparse:.1f}ms")
+    assert slim < full * 0.6
+
+
+@pytest.mark.django_db
+def test_slim_list_halves_payload(menu):
+    from menu.api.V1.serializers import MenuItemSerializer
+
+    client = APIClient()
+    full_fields = ",".join(MenuItemSerializer.Meta.fields)
+    full = walk(client, {"fields": full_fields})
+    # پارامتر بی‌اثر تا مسیر snapshot دور زده شود و هر سه حالت یکسان اندازه‌گیری شوند
+    slim = walk(client, {"ordering": "-created_date"})
+    sparse = walk(client, {"fields": "id,title,get_price,image"})
+
+    for name, (size, ms) in (("full", full), ("slim", slim), ("sparse", sparse)):
+        print(f"\n{name:>6}: {size / PAGES / 1024:.1f} KiB/page, {ms:.2f}ms/request")
+    assert slim[0] < full[0] / 2
@@ -0,0 +1,70 @@
+"""
+Concurrent stock reservation: many threads ordering the same few items.
+
+    pytest benchmarks/bench_stock.py -s
+
+Every thread runs its own connection against the WAL database configured in
+``benchmarks/conftest.py``. The run fails if any item is oversold or if the
+stock taken does not match the orders that succeeded.
+"""
+import random
+import threading
+import time
+
+import pytest
+from django.db import connection
+
+from menu.models import MenuItem
+from menu.stock import reserve_stock, OutOfStock
+
+THREADS = 8
+ORDERS_PER_THREAD = 250
+ITEMS = 5
+STOCK = 1000
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_orders_never_oversell():
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode")
+        assert cursor.fetchone()[0] == "wal"
+
+    items = MenuItem.objects.bulk_create([
+        MenuItem(title=f"آیتم {i}", description="-", price=10000, stock=STOCK) for i in range(ITEMS)
+    ])
+    ids = [item.pk for item in items]
+    taken = [0] * THREADS
+    failed = [0] * THREADS
+    errors = []
+
+    def worker(index):
+        rng = random.Random(index)
+        try:
+            for _ in range(ORDERS_PER_THREAD):
+                lines = [(item_id, rng.randint(1, 3)) for item_id in rng.sample(ids, rng.randint(1, 3))]
+                try:
+                    reserve_stock(lines)
+                    taken[index] += sum(quantity for _, quantity in lines)
+                except OutOfStock:
+                    failed[index] += 1
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    assert not errors, errors
+    stock = list(MenuItem.objects.filter(pk__in=ids).values_list("stock", flat=True))
+    assert all(value >= 0 for value in stock)
+    assert sum(taken) == ITEMS * STOCK - sum(stock)
+
+    orders = THREADS * ORDERS_PER_THREAD
+    print(f"\n{connection.vendor}: {orders} orders from {THREADS} threads in {elapsed:.2f}s "
+          f"({orders / elapsed:.0f} orders/s), {sum(failed)} rejected, {sum(taken)} units taken")
@@ -0,0 +1,58 @@
+"""
+Bulk import/export throughput and peak memory for a 200k-item menu.
+
+    pytest benchmarks/bench_transfer.py -s
+"""
+import io
+import time
+import resource
+
+import pytest
+
+from menu.models import Category, MenuItem
+from menu.transfer import export_menu_items, import_menu_items
+
+ITEMS = 200_000
+
+
+def source_rows():
+    yield "title,description,price,discount_percent,stock,status,is_featured,preparation_time,categories\n"
+    for i in range(ITEMS):
+        yield f"آیتم {i},توضیح کوتاه {i},{10000 + i},{i % 3 * 10},{i % 20},1,False,15,lunch|dinner\n"
+
+
+class LineStream(io.TextIOBase):
+    # ورودی را خط‌به‌خط تولید می‌کند تا حافظه مصرفی خود فایل حساب نشود
+    def __init__(self, lines):
+        self._lines = lines
+
+    def __iter__(self):
+        return self._lines
+
+    def readline(self, size=-1):
+        return next(self._lines, "")
+
+
+def max_rss_mib():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+@pytest.mark.django_db
+def test_transfer_200k_items():
+    Category.objects.create(title="ناهار", slug="lunch")
+    Category.objects.create(title="شام", slug="dinner")
+
+    rss_before = max_rss_mib()
+    start = time.perf_counter()
+    report = import_menu_items(LineStream(source_rows()), "csv", chunk_size=2000)
+    import_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    exported = sum(len(chunk) for chunk in export_menu_items("csv", chunk_size=2000))
+    export_seconds = time.perf_counter() - start
+
+    print(f"\nimport {report.created} rows: {import_seconds:.1f}s; "
+          f"export {exported / 2**20:.1f}MiB: {export_seconds:.1f}s; "
+          f"peak RSS growth {max_rss_mib() - rss_before:.1f}MiB")
+    assert report.created == ITEMS
+    assert MenuItem.category.through.objects.count() == ITEMS * 2
@@ -0,0 +1,25 @@
+import os
+import tempfile
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix):
+    """
+    Run benchmarks on a file-backed SQLite database in WAL mode, like a
+    deployed instance, instead of the shared in-memory test database that
+    serializes every thread on one connection.
+    """
+    from django.conf import settings
+
+    db = settings.DATABASES["default"]
+    if db["ENGINE"] != "django.db.backends.sqlite3":
+        return
+    db.setdefault("TEST", {})["NAME"] = os.path.join(tempfile.gettempdir(), "restaurant-menu-bench.sqlite3")
+    db.setdefault("OPTIONS", {}).update({
+        "init_command": "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;",
+        # قفل نوشتن از ابتدای تراکنش گرفته می‌شود تا ارتقای قفل به بن‌بست نخورد
+        "transaction_mode": "IMMEDIATE",
+        "timeout": 30,
+    })
@@ -11,6 +11,6 @@ app = Celery('config')
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # شغل‌ها یا task‌ها رو از اپلیکیشن‌های Django بارگذاری می‌کنیم
-app.autodiscover_tasks(['config'])  # اضافه کردن نام اپلیکیشن‌ها
+app.autodiscover_tasks(['config', 'accounts.api.V1', 'menu.api.V1', 'reservations.api.V1'])  # اضافه کردن نام اپلیکیشن‌ها
 app.conf.worker_concurrency = 1
 app.conf.worker_pool = 'solo'
@@ -0,0 +1,144 @@
+"""
+Resized WebP/JPEG derivatives for uploaded images.
+
+Derivatives are written next to the original under ``derivatives/`` with
+deterministic names, and their names and dimensions are stored in the
+model's ``image_variants`` JSON field::
+
+    {"source": "menu_items/kebab.png",
+     "variants": {"thumbnail": {"width": 160, "height": 120,
+                                "webp": "derivatives/menu_items/kebab-thumbnail.webp",
+                                "jpeg": "derivatives/menu_items/kebab-thumbnail.jpg"}, ...}}
+
+Generation is idempotent: a file that already exists is not rendered again,
+and an instance whose ``source`` matches its current image is skipped.
+"""
+import io
+import logging
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.dispatch import Signal
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# sender=model class, instance=...; بعد از commit نسخه‌های جدید فرستاده می‌شود
+derivatives_ready = Signal()
+
+FORMATS = {"webp": ("WEBP", "webp"), "jpeg": ("JPEG", "jpg")}
+
+
+def derivative_name(source_name, size, fmt):
+    stem = source_name.rsplit(".", 1)[0]
+    return f"derivatives/{stem}-{size}.{FORMATS[fmt][1]}"
+
+
+def _encode(image, fmt):
+    pil_format = FORMATS[fmt][0]
+    if pil_format == "JPEG" and image.mode != "RGB":
+        # JPEG شفافیت ندارد؛ پس‌زمینه سفید می‌شود
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        rgba = image.convert("RGBA")
+        background.paste(rgba, mask=rgba.split()[-1])
+        image = background
+    elif pil_format == "WEBP" and image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, quality=settings.IMAGE_DERIVATIVE_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def generate_derivatives(field_file, storage=default_storage):
+    """
+    Render every configured size in every format and return the
+    ``image_variants`` value describing them.
+    """
+    with field_file.open("rb") as source:
+        original = ImageOps.exif_transpose(Image.open(source))
+        original.load()
+
+    variants = {}
+    for size, max_width in settings.IMAGE_DERIVATIVE_WIDTHS.items():
+        image = original
+        if original.width > max_width:
+            image = original.copy()
+            image.thumbnail((max_width, original.height), Image.LANCZOS)
+
+        variant = {"width": image.width, "height": image.height}
+        for fmt in FORMATS:
+            name = derivative_name(field_file.name, size, fmt)
+            if not storage.exists(name):
+                name = storage.save(name, ContentFile(_encode(image, fmt)))
+            variant[fmt] = name
+        variants[size] = variant
+
+    return {"source": field_file.name, "variants": variants}
+
+
+def needs_derivatives(instance):
+    field_file = instance.image
+    if not field_file or field_file.name == instance._meta.get_field("image").get_default():
+        return False
+    return (instance.image_variants or {}).get("source") != field_file.name
+
+
+def refresh_derivatives(instance):
+    """
+    Generate derivatives for ``instance.image`` if they are missing or stale.
+    Returns True when ``image_variants`` was updated.
+    """
+    if not needs_derivatives(instance):
+        return False
+
+    variants = generate_derivatives(instance.image)
+    # اگر در این فاصله تصویر عوض شده باشد نتیجه قدیمی ذخیره نمی‌شود
+    updated = type(instance)._default_manager.filter(pk=instance.pk, image=instance.image.name).update(
+        image_variants=variants
+    )
+    instance.image_variants = variants
+    if updated:
+        # update() سیگنال save نمی‌فرستد؛ کش‌های مدل از این سیگنال باخبر می‌شوند
+        transaction.on_commit(lambda: derivatives_ready.send(sender=type(instance), instance=instance))
+    return True
+
+
+def schedule_derivatives(instance, task):
+    """
+    Queue ``task`` for the instance after the current transaction commits,
+    so generation stays off the request path.
+    """
+    if not needs_derivatives(instance):
+        return
+
+    def enqueue():
+        try:
+            task.delay(instance.pk)
+        except Exception as e:
+            logger.error(f"Error queueing image derivatives for {instance._meta.label} {instance.pk}: {e}")
+
+    transaction.on_commit(enqueue)
+
+
+def build_srcset(image_variants, request=None):
+    """
+    Compact ``{"webp": "url 160w, url 480w, ...", "jpeg": ...}`` map for the
+    client's ``<source srcset>``, or None when no derivatives exist yet.
+    """
+    variants = (image_variants or {}).get("variants")
+    if not variants:
+        return None
+
+    srcset = {}
+    for fmt in FORMATS:
+        candidates = []
+        for variant in sorted(variants.values(), key=lambda v: v["width"]):
+            url = default_storage.url(variant[fmt])
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            candidates.append(f"{url} {variant['width']}w")
+        srcset[fmt] = ", ".join(candidates)
+    return srcset
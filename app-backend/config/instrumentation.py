@@ -0,0 +1,278 @@
+"""
+Per-request timings: ``Server-Timing`` headers and Prometheus histograms.
+
+``ServerTimingMiddleware`` measures every request:
+
+- ``db``: time and number of SQL queries, through ``execute_wrapper``
+- ``auth``: JWT authentication (``TimedJWTAuthentication``)
+- ``serialize``: ``to_representation`` of serializers using ``TimedSerializerMixin``
+- ``render``: ``FastJSONRenderer.render``
+- ``total``: the whole middleware chain
+
+The phases overlap (the user lookup of ``auth`` is also ``db``). They are
+sent back in a ``Server-Timing`` header (to staff users, or to everyone with
+``SERVER_TIMING_HEADER``) and added to per-route histograms
+served in the Prometheus text format by ``metrics_view`` (``/metrics``).
+
+Recording a request costs a few dict updates under a lock. With
+``METRICS_REDIS_URL`` (the shared ``CACHE_URL`` by default) every process
+adds its histograms to one Redis hash every ``METRICS_PUSH_INTERVAL``
+seconds, so any worker answering a scrape reports the totals of all of
+them. Without it the histograms only cover the process that serves
+``/metrics``.
+"""
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+PHASES = ("db", "auth", "serialize", "render")
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500, 1000)
+# (ویژگی registry، نام متریک، برچسب‌ها)
+METRICS = (
+    ("requests", "http_request_duration_seconds", ("route", "method")),
+    ("phases", "http_request_phase_seconds", ("route", "phase")),
+    ("queries", "http_request_sql_queries", ("route",)),
+)
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.durations = dict.fromkeys(PHASES, 0.0)
+        self.queries = 0
+        self._active = set()
+
+
+@contextmanager
+def timed(phase):
+    """
+    Add the time spent in the block to ``phase`` of the current request.
+    Nested blocks of the same phase are counted once.
+    """
+    timings = _current.get()
+    if timings is None or phase in timings._active:
+        yield
+        return
+    timings._active.add(phase)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.durations[phase] += time.perf_counter() - start
+        timings._active.discard(phase)
+
+
+def _sql_wrapper(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.durations["db"] += time.perf_counter() - start
+        timings.queries += 1
+
+
+class TimedJWTAuthentication(JWTAuthentication):
+
+    def authenticate(self, request):
+        with timed("auth"):
+            return super().authenticate(request)
+
+
+class TimedSerializerMixin:
+    """
+    Add ``to_representation`` to the ``serialize`` phase. Lists call it once
+    per item and nested serializers are counted once.
+    """
+
+    def to_representation(self, instance):
+        with timed("serialize"):
+            return super().to_representation(instance)
+
+
+# ---------------- histograms ----------------
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = {}
+
+    def observe(self, labels, value):
+        # [تعداد هر بازه..., بیشتر از آخرین بازه, مجموع, تعداد کل]
+        row = self.counts.get(labels)
+        if row is None:
+            row = self.counts[labels] = [0] * (len(self.buckets) + 3)
+        row[bisect.bisect_left(self.buckets, value)] += 1
+        row[-2] += value
+        row[-1] += 1
+
+    def expose(self, name, label_names):
+        lines = [f"# TYPE {name} histogram"]
+        for labels, row in sorted(self.counts.items()):
+            base = ",".join(f'{key}="{_escape(value)}"' for key, value in zip(label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets, row):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{base},le="{bound:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{base},le="+Inf"}} {row[-1]}')
+            lines.append(f"{name}_sum{{{base}}} {row[-2]:.6f}")
+            lines.append(f"{name}_count{{{base}}} {row[-1]}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = Histogram(DURATION_BUCKETS)
+        self.phases = Histogram(DURATION_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+
+    def record(self, route, method, total, timings):
+        with self.lock:
+            self.requests.observe((route, method), total)
+            for phase, seconds in timings.durations.items():
+                self.phases.observe((route, phase), seconds)
+            self.queries.observe((route,), timings.queries)
+
+    def expose(self):
+        with self.lock:
+            lines = [
+                line
+                for attribute, name, label_names in METRICS
+                for line in getattr(self, attribute).expose(name, label_names)
+            ]
+        return "\n".join(lines) + "\n"
+
+
+class SharedRegistry(Registry):
+    """
+    Histograms of every process summed in a Redis hash. Each process records
+    into its own histograms and adds them to the hash every
+    ``METRICS_PUSH_INTERVAL`` seconds and before answering a scrape.
+    """
+
+    key = "metrics:http"
+
+    def __init__(self, url):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.last_push = time.monotonic()
+        super().__init__()
+
+    def record(self, route, method, total, timings):
+        super().record(route, method, total, timings)
+        if time.monotonic() - self.last_push >= settings.METRICS_PUSH_INTERVAL:
+            try:
+                self.push()
+            except Exception as e:
+                # خطای Redis نباید درخواست را خراب کند
+                logger.warning(f"Could not push request metrics: {e}")
+
+    def push(self):
+        with self.lock:
+            local = [(name, getattr(self, attribute)) for attribute, name, _ in METRICS]
+            self.reset()
+            self.last_push = time.monotonic()
+
+        pipe = self.client.pipeline(transaction=False)
+        for name, histogram in local:
+            sum_index = len(histogram.buckets) + 1
+            for labels, row in histogram.counts.items():
+                prefix = "\t".join((name, *labels))
+                for index, value in enumerate(row):
+                    if not value:
+                        continue
+                    if index == sum_index:
+                        pipe.hincrbyfloat(self.key, f"{prefix}\t{index}", value)
+                    else:
+                        pipe.hincrby(self.key, f"{prefix}\t{index}", value)
+        pipe.execute()
+
+    def expose(self):
+        self.push()
+        shared = Registry()
+        histograms = {name: getattr(shared, attribute) for attribute, name, _ in METRICS}
+        for field, value in self.client.hgetall(self.key).items():
+            name, *labels, index = field.decode().split("\t")
+            histogram = histograms[name]
+            row = histogram.counts.setdefault(tuple(labels), [0] * (len(histogram.buckets) + 3))
+            index = int(index)
+            row[index] = float(value) if index == len(row) - 2 else int(value)
+        return shared.expose()
+
+
+registry = SharedRegistry(settings.METRICS_REDIS_URL) if settings.METRICS_REDIS_URL else Registry()
+
+
+def route_of(request):
+    match = getattr(request, "resolver_match", None)
+    # مسیر الگو (نه آدرس واقعی) تا تعداد برچسب‌ها محدود بماند
+    return match.route if match else "unmatched"
+
+
+def server_timing(timings, total):
+    entries = [f'db;dur={timings.durations["db"] * 1000:.1f};desc="{timings.queries} queries"']
+    entries += [f"{phase};dur={timings.durations[phase] * 1000:.1f}" for phase in PHASES[1:]]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class ServerTimingMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_sql_wrapper))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - start
+
+        # تعداد کوئری‌ها و زمان‌ها اطلاعات داخلی‌اند؛ DRF کاربر JWT را روی request اصلی هم می‌گذارد
+        user = getattr(request, "user", None)
+        if settings.SERVER_TIMING_HEADER or getattr(user, "is_staff", False):
+            response["Server-Timing"] = server_timing(timings, total)
+        registry.record(route_of(request), request.method, total, timings)
+        return response
+
+
+def metrics_view(request):
+    """
+    Prometheus text exposition. Requires ``Authorization: Bearer <METRICS_TOKEN>``;
+    closed to everyone while the setting is empty.
+    """
+    token = settings.METRICS_TOKEN
+    if not token or not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.expose(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -53,6 +53,8 @@ INSTALLED_APPS = [
 ]
    
 MIDDLEWARE = [
+    # اولین میدلور تا زمان کل درخواست را اندازه بگیرد
+    'config.instrumentation.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -92,6 +94,12 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+            # قفل نوشتن از ابتدای تراکنش گرفته می‌شود؛ درخواست‌های همزمان تا timeout صبر می‌کنند
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
@@ -151,12 +159,29 @@ REST_FRAMEWORK = {
     
     'DEFAULT_AUTHENTICATION_CLASSES': (
         
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # همان JWTAuthentication با اندازه‌گیری زمان برای Server-Timing
+        'config.instrumentation.TimedJWTAuthentication',
     ),
 
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'
-        ]
+        ],
+
+    # اگر orjson نصب نباشد همان JSON استاندارد DRF استفاده می‌شود
+    'DEFAULT_RENDERER_CLASSES': (
+        'config.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'config.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+
+    # ثبت بازدید بدون احراز هویت است؛ تعداد درخواست هر IP محدود می‌شود
+    'DEFAULT_THROTTLE_RATES': {
+        'menu_views': '120/min',
+    },
     
 }
 
@@ -181,4 +206,97 @@ EMAIL_HOST_PASSWORD = ''
 CELERY_BROKER_URL = 'redis://redis:6379/0'
 CELERY_RESULT_BACKEND = 'redis://redis:6379/1'
 CELERY_ACCEPT_CONTENT = ['json']
-CELERY_TASK_SERIALIZER = 'json'
\ No newline at end of file
+CELERY_TASK_SERIALIZER = 'json'
+
+# INSTRUMENTATION
+# هدر Server-Timing همیشه برای کاربران staff فرستاده می‌شود؛ برای همه فقط در محیط توسعه روشن شود
+SERVER_TIMING_HEADER = config("SERVER_TIMING_HEADER", default=False, cast=bool)
+# /metrics بدون توکن بسته است
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
+# CACHE
+# نسخه منو، اسنپ‌شات‌ها و اشغال رزروها باید بین همه پروسه‌ها (وب و Celery) مشترک باشند.
+# بدون CACHE_URL هر پروسه کش حافظه خودش را دارد و فقط برای اجرای تک‌پروسه‌ای مناسب است.
+CACHE_URL = config("CACHE_URL", default="")
+if CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# هیستوگرام‌های /metrics از همه پروسه‌ها در Redis جمع می‌شوند؛ بدون آن هر worker فقط اعداد خودش را دارد
+# و با چند worker پشت یک آدرس، شمارنده‌ها بین scrapeها جابه‌جا می‌شوند
+METRICS_REDIS_URL = config("METRICS_REDIS_URL", default=CACHE_URL)
+METRICS_PUSH_INTERVAL = 5
+
+# MENU SNAPSHOTS
+# مدت نگهداری خروجی آماده منو؛ با هر تغییر آیتم یا دسته‌بندی نسخه جدید ساخته می‌شود
+MENU_SNAPSHOT_TIMEOUT = 60 * 60 * 24
+
+
+# MENU SEARCH
+# مسیر کلاس بک‌اند جستجو؛ خالی یعنی FTS5 روی SQLite و جستجوی ساده روی بقیه دیتابیس‌ها
+MENU_SEARCH_BACKEND = None
+MENU_SEARCH_LIMIT = 300
+
+
+# MENU VIEW COUNTER
+# اگر آدرس Redis خالی باشد بازدیدها در حافظه همان پروسه جمع می‌شوند
+MENU_VIEW_COUNTER_REDIS_URL = config("MENU_VIEW_COUNTER_REDIS_URL", default="")
+MENU_VIEW_FLUSH_INTERVAL = 30
+
+# MENU AVAILABILITY
+# طول هر بازه در ایندکس زمان سرو (دقیقه)؛ باید ۱۴۴۰ بر آن بخش‌پذیر باشد
+MENU_AVAILABILITY_BUCKET_MINUTES = 15
+MENU_PUBLISH_SCHEDULE_INTERVAL = 60
+
+# RESERVATIONS
+# وقتی SeatingPlan فعالی ثبت نشده باشد
+RESERVATION_COVERS_PER_SLOT = 40
+RESERVATION_SLOT_MINUTES = 30
+# پلن فعال در کش؛ با هر تغییر SeatingPlan پاک می‌شود
+RESERVATION_PLAN_TIMEOUT = 60 * 60
+# تکرار نوشتن رزرو وقتی SQLite با وجود timeout هنوز قفل است
+RESERVATION_WRITE_RETRIES = 5
+RESERVATION_RETRY_DELAY = 0.05
+# اشغال هر روز در کش؛ تسک reconcile روزهای پیش رو را با دیتابیس تطبیق می‌دهد
+RESERVATION_OCCUPANCY_TIMEOUT = 60 * 60 * 24
+RESERVATION_RECONCILE_DAYS = 62
+RESERVATION_RECONCILE_INTERVAL = 60 * 5
+
+# KITCHEN QUEUE
+# تعداد آشپزهایی که در هر ایستگاه همزمان کار می‌کنند
+KITCHEN_STATION_CAPACITY = 1
+
+CELERY_BEAT_SCHEDULE = {
+    "flush-menu-item-views": {
+        "task": "menu.api.V1.tasks.flush_menu_item_views",
+        "schedule": MENU_VIEW_FLUSH_INTERVAL,
+    },
+    "apply-menu-publish-schedule": {
+        "task": "menu.api.V1.tasks.apply_menu_publish_schedule",
+        "schedule": MENU_PUBLISH_SCHEDULE_INTERVAL,
+    },
+    "reconcile-reservation-occupancy": {
+        "task": "reservations.api.V1.tasks.reconcile_reservation_occupancy",
+        "schedule": RESERVATION_RECONCILE_INTERVAL,
+    },
+}
+
+
+# IMAGE DERIVATIVES
+# بیشترین عرض هر نسخه تصویر؛ تصاویر کوچک‌تر بزرگ نمی‌شوند
+IMAGE_DERIVATIVE_WIDTHS = {
+    "thumbnail": 160,
+    "card": 480,
+    "full": 1200,
+}
+IMAGE_DERIVATIVE_QUALITY = 80
@@ -0,0 +1,142 @@
+import re
+
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import CustomeUser
+from config.instrumentation import registry, Histogram, RequestTimings, SharedRegistry
+from menu.models import MenuItem
+
+MENU_ITEMS_URL = "/menu/api/V1/menu-items/"
+
+
+@pytest.fixture(autouse=True)
+def empty_registry():
+    registry.reset()
+    yield
+    registry.reset()
+
+
+def timing_entries(response):
+    return {
+        name: float(duration)
+        for name, duration in re.findall(r"(\w+);dur=([\d.]+)", response["Server-Timing"])
+    }
+
+
+@pytest.mark.django_db
+def test_server_timing_header_covers_every_phase():
+    MenuItem.objects.create(title="چای", description="-", price=1000)
+    user = CustomeUser.objects.create_user(email="timing@example.com", password="pass1234", is_staff=True)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+
+    response = client.get(MENU_ITEMS_URL, {"ordering": "final_price"})
+    entries = timing_entries(response)
+    assert set(entries) == {"db", "auth", "serialize", "render", "total"}
+    assert all(duration >= 0 for duration in entries.values())
+    assert entries["total"] >= entries["db"]
+    # هدر با یک رقم اعشار میلی‌ثانیه گرد می‌شود؛ مقادیر خام هر مرحله از registry خوانده می‌شوند
+    for phase in ("auth", "serialize", "render"):
+        assert registry.phases.counts[("menu/api/V1/menu-items/", phase)][-2] > 0, phase
+    assert re.search(r'db;dur=[\d.]+;desc="[1-9]\d* queries"', response["Server-Timing"])
+
+
+@pytest.mark.django_db
+def test_server_timing_header_is_hidden_from_customers(settings):
+    user = CustomeUser.objects.create_user(email="customer@example.com", password="pass1234")
+    client = APIClient()
+    assert "Server-Timing" not in client.get(MENU_ITEMS_URL)
+
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    assert "Server-Timing" not in client.get(MENU_ITEMS_URL)
+
+    settings.SERVER_TIMING_HEADER = True
+    assert "Server-Timing" in client.get(MENU_ITEMS_URL)
+
+
+@pytest.mark.django_db
+def test_middleware_leaves_drf_classes_alone(client):
+    from rest_framework import serializers
+    from rest_framework.response import Response
+    client.get(MENU_ITEMS_URL)
+    # زمان‌سنجی فقط از طریق mixin‌ها؛ کلاس‌های DRF برای Celery و دستورات دست‌نخورده می‌مانند
+    assert serializers.Serializer.data.fget.__module__ == "rest_framework.serializers"
+    assert serializers.ListSerializer.data.fget.__module__ == "rest_framework.serializers"
+    assert Response.rendered_content.fget.__module__ == "rest_framework.response"
+
+
+@pytest.mark.django_db
+def test_metrics_aggregate_per_route(settings):
+    client = APIClient()
+    # بدون توکن تنظیم‌شده /metrics برای هیچ‌کس باز نیست
+    assert client.get("/metrics").status_code == 403
+    settings.METRICS_TOKEN = "secret"
+    MenuItem.objects.create(title="چای", description="-", price=1000)
+    slug = MenuItem.objects.get().slug
+    for _ in range(3):
+        client.get(MENU_ITEMS_URL, {"ordering": "final_price"})
+    client.get(f"{MENU_ITEMS_URL}{slug}/")
+
+    body = client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret").content.decode()
+    assert 'http_request_duration_seconds_count{route="menu/api/V1/menu-items/",method="GET"} 3' in body
+    # مسیر الگو ثبت می‌شود نه نامک
+    assert 'route="menu/api/V1/menu-items/<str:slug>/",method="GET"} 1' in body
+    assert 'http_request_phase_seconds_count{route="menu/api/V1/menu-items/",phase="serialize"} 3' in body
+    assert re.search(r'http_request_sql_queries_bucket\{route="menu/api/V1/menu-items/",le="\+Inf"\} 3', body)
+
+    assert client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code == 403
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 7):
+        histogram.observe(("r",), value)
+    lines = histogram.expose("t", ("route",))
+    assert 't_bucket{route="r",le="0.1"} 2' in lines
+    assert 't_bucket{route="r",le="1"} 3' in lines
+    assert 't_bucket{route="r",le="+Inf"} 4' in lines
+    assert 't_sum{route="r"} 7.650000' in lines
+
+
+class HashClient:
+    # همان چند دستور Redis که SharedRegistry استفاده می‌کند، روی یک دیکشنری مشترک
+    def __init__(self, data):
+        self.data = data
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        pass
+
+    def hincrby(self, key, field, value):
+        self.data[field.encode()] = self.data.get(field.encode(), 0) + value
+
+    hincrbyfloat = hincrby
+
+    def hgetall(self, key):
+        return {field: str(value).encode() for field, value in self.data.items()}
+
+
+def test_shared_registry_sums_every_worker(settings):
+    settings.METRICS_PUSH_INTERVAL = 3600
+    shared = {}
+    workers = [SharedRegistry("redis://localhost:6379/15") for _ in range(2)]
+    for worker in workers:
+        worker.client = HashClient(shared)
+
+    timings = RequestTimings()
+    timings.queries = 3
+    workers[0].record("menu/", "GET", 0.02, timings)
+    workers[1].record("menu/", "GET", 0.3, timings)
+    workers[1].push()
+
+    # هر worker که scrape را جواب دهد مجموع همه را برمی‌گرداند
+    for worker in workers:
+        body = worker.expose()
+        assert 'http_request_duration_seconds_count{route="menu/",method="GET"} 2' in body
+        assert 'http_request_duration_seconds_bucket{route="menu/",method="GET",le="0.025"} 1' in body
+        assert 'http_request_duration_seconds_sum{route="menu/",method="GET"} 0.320000' in body
+        assert 'http_request_sql_queries_bucket{route="menu/",le="5"} 2' in body
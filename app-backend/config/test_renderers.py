@@ -0,0 +1,44 @@
+import io
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.parsers import JSONParser
+
+from config import renderers
+from config.renderers import FastJSONRenderer, FastJSONParser
+
+SAMPLE = {
+    "title": "کیک شکلاتی",
+    "price": Decimal("125000"),
+    "ratio": Decimal("0.85"),
+    "created_date": datetime.datetime(2025, 3, 1, 18, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+    "local": timezone.localtime(datetime.datetime(2025, 3, 1, 18, 30, tzinfo=datetime.timezone.utc)),
+    "date": datetime.date(2025, 3, 1),
+    "time": datetime.time(12, 30),
+    "label": gettext_lazy("customer"),
+    "note": "خط\u2028جدید\u2029",
+    "items": [{"id": 1, "category": [{"slug": "نوشیدنی"}]}],
+    None: "null key",
+}
+
+def test_fast_renderer_matches_drf_output():
+    assert FastJSONRenderer().render(SAMPLE) == JSONRenderer().render(SAMPLE)
+
+def test_fast_renderer_falls_back_without_orjson(monkeypatch):
+    monkeypatch.setattr(renderers, "orjson", None)
+    assert FastJSONRenderer().render(SAMPLE) == JSONRenderer().render(SAMPLE)
+
+def test_fast_renderer_indent_falls_back():
+    context = {"indent": 4}
+    assert FastJSONRenderer().render(SAMPLE, renderer_context=context) == JSONRenderer().render(SAMPLE, renderer_context=context)
+
+def test_fast_parser_reads_utf8_and_rejects_garbage():
+    body = JSONRenderer().render({"title": "چای", "lines": [{"item": 1, "quantity": 2}]})
+    assert FastJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(io.BytesIO(body))
+    with pytest.raises(ParseError):
+        FastJSONParser().parse(io.BytesIO(b'{"title": '))
@@ -21,6 +21,7 @@ from django.conf.urls.static import static
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
+from config.instrumentation import metrics_view
 
 schema_view = get_schema_view(
    openapi.Info(
@@ -42,6 +43,7 @@ urlpatterns = [
     path('accounts/api/V1/', include('accounts.api.V1.urls')),    
     path('dashboard/api/V1/', include('dashboard.urls')),  
     path('api-auth/', include('rest_framework.urls')),
+    path('metrics', metrics_view, name='metrics'),
     
 
     #drf_yasg
@@ -0,0 +1,40 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # کش بین تست‌ها مشترک است؛ هر تست باید از کش خالی شروع کند
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def query_budget(db):
+    """
+    Assert that a list endpoint runs the same number of queries at every size.
+
+    ``seed(n)`` must add ``n`` more rows to whatever the endpoint lists. The
+    cache is cleared before each request so snapshots can't hide queries.
+    Returns the ``{size: query_count}`` map.
+    """
+
+    def check(client, url, seed, sizes=(10, 100, 1000)):
+        counts = {}
+        seeded = 0
+        for size in sizes:
+            seed(size - seeded)
+            seeded = size
+            cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                resp = client.get(url)
+            assert resp.status_code == 200, resp.content[:200]
+            counts[size] = len(ctx.captured_queries)
+
+        assert len(set(counts.values())) == 1, f"query count grows with rows on {url}: {counts}"
+        return counts
+
+    return check
@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from accounts.models import CustomeUser, Profile
 from reservations.models import Reservation
+from config.instrumentation import TimedSerializerMixin
 
-class AdminReservationSerializer(serializers.ModelSerializer):
+class AdminReservationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     user_email = serializers.SerializerMethodField()
     class Meta:
         model = Reservation
@@ -15,13 +16,19 @@ class AdminReservationSerializer(serializers.ModelSerializer):
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from accounts.models import Profile  # اگر پروفایل جداست
+from config.images import build_srcset
 
 User = get_user_model()
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    srcset = serializers.SerializerMethodField()
+
     class Meta:
         model = Profile
-        fields = ['first_name', 'last_name', 'phone_number', 'image']
+        fields = ['first_name', 'last_name', 'phone_number', 'image', 'srcset']
+
+    def get_srcset(self, obj):
+        return build_srcset(obj.image_variants, self.context.get('request'))
 
     
     def get_image(self, obj):
@@ -30,7 +37,7 @@ class ProfileSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.image.url)
         return None
 
-class AdminUserSerializer(serializers.ModelSerializer):
+class AdminUserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     profile = ProfileSerializer()
 
     class Meta:
@@ -2,11 +2,16 @@ import pytest
 from rest_framework import status
 from rest_framework.test import APIClient
 from django.urls import reverse
-from accounts.models import CustomeUser
+from accounts.models import CustomeUser, Profile
+from menu.models import MenuItem, Category
+from reservations.models import Reservation
+from datetime import date, time, timedelta
 
 # URL های تست
 ADMIN_RESERVATION_URL = reverse('reservation-list')
 ADMIN_USER_URL = reverse('admin-users-list')
+ADMIN_MENU_URL = reverse('admin-menu-list')
+ADMIN_CATEGORY_URL = reverse('admin-categories-list')
 
 # helper برای احراز هویت
 def auth_client(client, user):
@@ -57,3 +62,243 @@ def test_invalid_method_on_user_list(api_client, admin_user):
         status.HTTP_403_FORBIDDEN,
         status.HTTP_400_BAD_REQUEST  # اضافه شد
     )
+
+
+# ====================== بودجه کوئری ======================
+
+@pytest.mark.django_db
+def test_admin_menu_query_budget(api_client, admin_user, query_budget):
+    client = auth_client(api_client, admin_user)
+    category = Category.objects.create(title="شام")
+    counter = iter(range(1, 10**6))
+
+    def seed(n):
+        items = MenuItem.objects.bulk_create([
+            MenuItem(title=f"آیتم {i}", slug=f"item-{i}", description="-", price=10000)
+            for i in (next(counter) for _ in range(n))
+        ])
+        Through = MenuItem.category.through
+        Through.objects.bulk_create([Through(menuitem_id=item.pk, category_id=category.pk) for item in items])
+
+    query_budget(client, ADMIN_MENU_URL, seed)
+
+@pytest.mark.django_db
+def test_admin_categories_query_budget(api_client, admin_user, query_budget):
+    client = auth_client(api_client, admin_user)
+    counter = iter(range(1, 10**6))
+
+    def seed(n):
+        Category.objects.bulk_create([
+            Category(title=f"دسته {i}", slug=f"cat-{i}") for i in (next(counter) for _ in range(n))
+        ])
+
+    query_budget(client, ADMIN_CATEGORY_URL, seed)
+
+@pytest.mark.django_db
+def test_admin_users_query_budget(api_client, admin_user, query_budget):
+    client = auth_client(api_client, admin_user)
+    counter = iter(range(1, 10**6))
+
+    def seed(n):
+        # bulk_create سیگنال ساخت پروفایل را اجرا نمی‌کند
+        users = CustomeUser.objects.bulk_create([
+            CustomeUser(email=f"user{i}@example.com") for i in (next(counter) for _ in range(n))
+        ])
+        Profile.objects.bulk_create([Profile(user=user, pk=user.pk) for user in users])
+
+    query_budget(client, ADMIN_USER_URL, seed)
+
+@pytest.mark.django_db
+def test_admin_reservations_query_budget(api_client, admin_user, query_budget):
+    client = auth_client(api_client, admin_user)
+    counter = iter(range(1, 10**6))
+
+    def seed(n):
+        # هر رزرو برای کاربر جدا تا ایمیل هر ردیف کوئری جدا نخواهد
+        users = CustomeUser.objects.bulk_create([
+            CustomeUser(email=f"guest{i}@example.com") for i in (next(counter) for _ in range(n))
+        ])
+        Reservation.objects.bulk_create([
+            Reservation(user=user, date=date.today(), time=time(13, 0), people=2) for user in users
+        ])
+
+    query_budget(client, ADMIN_RESERVATION_URL, seed)
+    data = client.get(ADMIN_RESERVATION_URL).json()
+    assert len(data['results']) == 20
+    assert data['results'][0]['user_email'].startswith('guest')
+
+@pytest.mark.django_db
+def test_admin_menu_pagination_modes(api_client, admin_user):
+    client = auth_client(api_client, admin_user)
+    MenuItem.objects.bulk_create([
+        MenuItem(title=f"آیتم {i}", slug=f"item-{i}", description="-") for i in range(20)
+    ])
+
+    data = client.get(ADMIN_MENU_URL).json()
+    assert len(data['results']) == 15
+    assert 'cursor=' in data['next']
+
+    data = client.get(ADMIN_MENU_URL, {'page': 2}).json()
+    assert data['count'] == 20
+    assert len(data['results']) == 5
+
+@pytest.mark.django_db
+def test_admin_menu_search_matches_title(api_client, admin_user):
+    client = auth_client(api_client, admin_user)
+    MenuItem.objects.create(title="چای ماسالا", description="ادویه‌دار")
+    MenuItem.objects.create(title="قهوه", description="تلخ")
+
+    data = client.get(ADMIN_MENU_URL, {'search': 'چاي'}).json()
+    assert [item['title'] for item in data['results']] == ["چای ماسالا"]
+
+@pytest.mark.django_db
+def test_admin_category_search_is_normalized(api_client, admin_user):
+    client = auth_client(api_client, admin_user)
+    Category.objects.create(title="پیش‌غذا")
+
+    data = client.get(ADMIN_CATEGORY_URL, {'search': 'پيش غذا'}).json()
+    assert [c['title'] for c in data] == ["پیش‌غذا"]
+
+@pytest.mark.django_db
+def test_admin_menu_import_and_export(api_client, admin_user):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    client = auth_client(api_client, admin_user)
+    Category.objects.create(title="شام", slug="dinner")
+
+    lines = "\n".join([
+        '{"title": "قیمه", "description": "با سیب‌زمینی", "price": 180000, "categories": ["dinner"]}',
+        '{"title": "قورمه سبزی", "description": "سنتی", "price": "گران"}',
+        'not json',
+    ])
+    upload = SimpleUploadedFile("menu.jsonl", lines.encode("utf-8"))
+    resp = client.post(reverse('admin-menu-import'), {'file': upload}, format='multipart')
+    assert resp.status_code == status.HTTP_201_CREATED
+    assert resp.data['created'] == 1
+    assert [error['row'] for error in resp.data['errors']] == [2, 3]
+
+    resp = client.get(reverse('admin-menu-export'))
+    assert resp.status_code == status.HTTP_200_OK
+    content = b"".join(resp.streaming_content).decode("utf-8")
+    assert content.splitlines()[1].split(",")[2] == "قیمه"
+
+@pytest.mark.django_db
+def test_admin_menu_import_rejects_unreadable_files(api_client, admin_user):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    client = auth_client(api_client, admin_user)
+    header = "title,description,price\n"
+
+    upload = SimpleUploadedFile("menu.csv", (header + "کباب,-,1000\n").encode("cp1256"))
+    resp = client.post(reverse('admin-menu-import'), {'file': upload}, format='multipart')
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    assert resp.data['created'] == 0
+    assert 'file' in resp.data['errors'][0]['errors']
+
+    # فیلد بزرگ‌تر از csv.field_size_limit خطای csv.Error می‌دهد
+    upload = SimpleUploadedFile("menu.csv", (header + "چای,-,1000\nقهوه," + "x" * 200_000 + ",2000\n").encode("utf-8"))
+    resp = client.post(reverse('admin-menu-import'), {'file': upload}, format='multipart')
+    assert resp.status_code == status.HTTP_201_CREATED
+    assert resp.data['created'] == 1
+    assert [(error['row'], list(error['errors'])) for error in resp.data['errors']] == [(3, ['file'])]
+    assert not MenuItem.objects.filter(title="قهوه").exists()
+
+@pytest.mark.django_db
+def test_admin_users_expose_profile_srcset(api_client, admin_user, settings, tmp_path):
+    from django.core.files import File
+    from accounts.api.V1.tasks import generate_profile_image_variants
+
+    settings.MEDIA_ROOT = tmp_path
+    profile = admin_user.profile
+    with open("menu/management/commands/images/menu-item-2.png", "rb") as f:
+        profile.image.save("avatar.png", File(f))
+    generate_profile_image_variants(profile.pk)
+
+    client = auth_client(api_client, admin_user)
+    resp = client.get(ADMIN_USER_URL)
+    assert "avatar-thumbnail.webp 160w" in resp.json()[0]['profile']['srcset']['webp']
+
+@pytest.mark.django_db
+def test_admin_menu_orders_by_final_price(api_client, admin_user):
+    for title, price, discount in [("الف", 100000, 50), ("ب", 80000, 0), ("ج", 60000, 10)]:
+        MenuItem.objects.create(user=admin_user, title=title, description="-", price=price, discount_percent=discount)
+
+    client = auth_client(api_client, admin_user)
+    resp = client.get(ADMIN_MENU_URL, {"ordering": "-final_price", "max_price": 79999})
+    assert [row["title"] for row in resp.json()["results"]] == ["ج", "الف"]
+
+@pytest.mark.django_db
+def test_admin_menu_keeps_full_shape_and_accepts_omit(api_client, admin_user):
+    MenuItem.objects.create(user=admin_user, title="سالاد", description="تازه", price=50000)
+    client = auth_client(api_client, admin_user)
+
+    item = client.get(ADMIN_MENU_URL).json()['results'][0]
+    assert item['description'] == "تازه" and 'is_out_of_stock' in item
+
+    item = client.get(ADMIN_MENU_URL, {'omit': 'description,user'}).json()['results'][0]
+    assert 'description' not in item and 'user' not in item and 'title' in item
+
+# ====================== فیلتر رزروها ======================
+
+@pytest.fixture
+def booked_days(db):
+    guests = CustomeUser.objects.bulk_create([CustomeUser(email=f"guest{i}@example.com") for i in range(3)])
+    today = date.today()
+    Reservation.objects.bulk_create([
+        Reservation(user=guests[i % 3], date=today + timedelta(days=i % 4), time=time(12 + i % 10, 30), people=1 + i % 6)
+        for i in range(80)
+    ])
+    return guests
+
+def query_plan(client, url, params):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert client.get(url, params).status_code == status.HTTP_200_OK
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {ctx.captured_queries[-1]['sql']}")
+        return [row[-1] for row in cursor.fetchall()]
+
+@pytest.mark.django_db
+def test_admin_reservation_filters(api_client, admin_user, booked_days):
+    client = auth_client(api_client, admin_user)
+    today = date.today()
+
+    tonight = client.get(ADMIN_RESERVATION_URL, {'date': today.isoformat(), 'time_from': '18:00', 'ordering': 'date,time'}).json()['results']
+    assert tonight and all(r['date'] == today.isoformat() and r['time'] >= '18:00' for r in tonight)
+    assert [r['time'] for r in tonight] == sorted(r['time'] for r in tonight)
+
+    ranged = client.get(ADMIN_RESERVATION_URL, {
+        'date_from': (today + timedelta(days=1)).isoformat(), 'date_to': (today + timedelta(days=2)).isoformat(),
+        'min_people': 3, 'max_people': 4, 'time_to': '15:00',
+    }).json()['results']
+    assert ranged and all(
+        r['date'] in ((today + timedelta(days=1)).isoformat(), (today + timedelta(days=2)).isoformat())
+        and 3 <= r['people'] <= 4 and r['time'] <= '15:00' for r in ranged
+    )
+
+    guest = booked_days[1]
+    mine = client.get(ADMIN_RESERVATION_URL, {'email': guest.email.upper()}).json()['results']
+    assert len(mine) == 20 and {r['user'] for r in mine} == {guest.pk}
+
+@pytest.mark.django_db
+def test_admin_reservation_ordering_pages_by_date_and_time(api_client, admin_user, booked_days):
+    client = auth_client(api_client, admin_user)
+    seen = []
+    url, params = ADMIN_RESERVATION_URL, {'ordering': 'date,time'}
+    while url:
+        data = client.get(url, params).json()
+        seen += [(r['date'], r['time'], r['id']) for r in data['results']]
+        url, params = data['next'], None
+    assert len(seen) == 80 and seen == sorted(seen)
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("params, index", [
+    ({'date': '2030-01-01', 'ordering': 'date,time'}, "reservation_date_time_idx"),
+    ({'date_from': '2030-01-01', 'date_to': '2030-01-07', 'ordering': 'date,time'}, "reservation_date_time_idx"),
+    ({'user': 1}, "reservation_user_created_idx"),
+    ({}, "reservation_created_idx"),
+])
+def test_admin_reservation_queries_use_indexes(api_client, admin_user, booked_days, params, index):
+    plans = query_plan(auth_client(api_client, admin_user), ADMIN_RESERVATION_URL, params)
+    assert any(detail.split(" (")[0].endswith(f"INDEX {index}") for detail in plans), plans
+    assert not any("TEMP B-TREE" in detail for detail in plans), plans
@@ -7,7 +7,10 @@ router.register('admin/reservation', AdminReservationCreateView, basename='reser
 router.register('admin/users', AdminUserViewSet, basename='admin-users')
 router.register('admin/menu', AdminMenuItemView, basename='admin-menu') 
 router.register('admin/categories', AdminCategoryView, basename='admin-categories')
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path('admin/menu-import/', AdminMenuImportView.as_view(), name='admin-menu-import'),
+    path('admin/menu-export/', AdminMenuExportView.as_view(), name='admin-menu-export'),
+]
 
 
 
@@ -1,6 +1,16 @@
+import io
+from django.http import StreamingHttpResponse
 from rest_framework.viewsets import ModelViewSet
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.parsers import MultiPartParser
+from rest_framework import status
 from rest_framework.permissions import IsAdminUser
 from reservations.models import Reservation
+from reservations.capacity import book, rebook, SlotFull
+from reservations.api.V1.views import slot_full_error
+from reservations.api.V1.paginations import ReservationPagination
+from reservations.api.V1.filters import ReservationFilter
 from rest_framework import permissions
 from reservations.models import Reservation
 from .serializers import AdminReservationSerializer,AdminUserSerializer
@@ -9,6 +19,10 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from menu.models import MenuItem, Category, ProductStatusType
 from menu.api.V1.serializers import MenuItemSerializer,CategorySerializer
+from menu.api.V1.paginations import AdminMenuItemPagination
+from menu.api.V1.filters import MenuSearchFilter, NormalizedSearchFilter, MenuItemFilter
+from menu.api.V1.mixins import PendingViewsMixin, SparseQuerysetMixin
+from menu.transfer import import_menu_items, export_menu_items, detect_format, FORMATS
 
 
 User = get_user_model()
@@ -19,9 +33,29 @@ class IsAdminUser(permissions.BasePermission):
         return request.user and request.user.is_staff
 
 class AdminReservationCreateView(ModelViewSet):
-    queryset = Reservation.objects.all()
+    queryset = Reservation.objects.select_related('user')
     serializer_class = AdminReservationSerializer
     permission_classes = [IsAdminUser]
+    pagination_class = ReservationPagination
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_class = ReservationFilter
+    ordering_fields = ['date', 'time', 'people', 'created_date']
+    ordering = ReservationPagination.ordering
+
+    def perform_create(self, serializer):
+        data = serializer.validated_data
+        try:
+            book(data['date'], data['time'], data['people'], serializer.save)
+        except SlotFull as e:
+            raise slot_full_error(e)
+
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        data = {'date': instance.date, 'time': instance.time, 'people': instance.people, **serializer.validated_data}
+        try:
+            rebook(instance, data['date'], data['time'], data['people'], serializer.save)
+        except SlotFull as e:
+            raise slot_full_error(e)
 
 
 
@@ -32,17 +66,17 @@ class AdminUserViewSet(ModelViewSet):
 
 
 
-class AdminMenuItemView(ModelViewSet):
+class AdminMenuItemView(PendingViewsMixin, SparseQuerysetMixin, ModelViewSet):
 
-    queryset = MenuItem.objects.filter(status=ProductStatusType.publish.value) 
+    queryset = MenuItem.objects.filter(status=ProductStatusType.publish.value).prefetch_related('category')
     serializer_class = MenuItemSerializer 
     permission_classes = [IsAdminUser]
+    pagination_class = AdminMenuItemPagination
     lookup_field = 'slug'
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['category']
-    search_fields = ['description', 'category__title']
-    ordering_fields = ['created_date', 'price']
-    ordering = ['-created_date']
+    filter_backends = [DjangoFilterBackend, OrderingFilter, MenuSearchFilter]
+    filterset_class = MenuItemFilter
+    ordering_fields = ['created_date', 'price', 'final_price', 'discount_percent']
+    ordering = ['-created_date', '-id']
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
@@ -55,7 +89,53 @@ class AdminCategoryView(ModelViewSet):
     serializer_class = CategorySerializer
     permission_classes = [IsAdminUser]
     lookup_field = 'slug'
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    search_fields = ['title']
+    filter_backends = [DjangoFilterBackend, NormalizedSearchFilter, OrderingFilter]
+    search_fields = ['search_text']
     ordering_fields = ['title']
     ordering = ['title']
+
+
+
+class AdminMenuImportView(APIView):
+    """
+    Bulk import of menu items from an uploaded CSV or JSONL file.
+    Returns the number of created items and the errors of rejected rows.
+    """
+
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"file": ["فایلی ارسال نشده است."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        fmt = request.data.get('file_format') or detect_format(upload.name)
+        if fmt not in FORMATS:
+            return Response({"file_format": [f"فرمت‌های مجاز: {', '.join(FORMATS)}"]}, status=status.HTTP_400_BAD_REQUEST)
+
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        report = import_menu_items(stream, fmt, user=request.user)
+        return Response(
+            report.as_dict(),
+            status=status.HTTP_201_CREATED if report.created else status.HTTP_400_BAD_REQUEST,
+        )
+
+
+class AdminMenuExportView(APIView):
+    """
+    Streams every menu item as CSV (default) or JSONL (?file_format=jsonl).
+    """
+
+    permission_classes = [IsAdminUser]
+    content_types = {'csv': 'text/csv; charset=utf-8', 'jsonl': 'application/x-ndjson; charset=utf-8'}
+
+    def get(self, request):
+        fmt = request.query_params.get('file_format', 'csv')
+        if fmt not in FORMATS:
+            return Response({"file_format": [f"فرمت‌های مجاز: {', '.join(FORMATS)}"]}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(export_menu_items(fmt), content_type=self.content_types[fmt])
+        response['Content-Disposition'] = f'attachment; filename="menu.{fmt}"'
+        return response
+
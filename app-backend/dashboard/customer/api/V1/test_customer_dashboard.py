@@ -84,13 +84,24 @@ def test_get_reservations(api_client, customer_user, customer_reservations, othe
     client = auth_client(api_client, customer_user)
     resp = client.get(RESERVATION_URL)
     assert resp.status_code == status.HTTP_200_OK
-    data = resp.json()
+    data = resp.json()["results"]
     # فقط رزروهای خودش را می‌بیند
     assert all(r["email"] == customer_user.email for r in data)
     assert len(data) == customer_reservations.count()
     # مطمئن می‌شویم رزرو کاربر دیگر نمایش داده نشده
     assert all(r["email"] != "other@example.com" for r in data)
 
+@pytest.mark.django_db
+def test_reservations_query_budget(api_client, customer_user, query_budget):
+    client = auth_client(api_client, customer_user)
+
+    def seed(n):
+        Reservation.objects.bulk_create(
+            [Reservation(user=customer_user, date=date.today(), time=time(14, 0), people=2) for _ in range(n)]
+        )
+
+    query_budget(client, RESERVATION_URL, seed)
+
 @pytest.mark.django_db
 def test_invalid_method_on_profile(api_client, customer_user):
     client = auth_client(api_client, customer_user)
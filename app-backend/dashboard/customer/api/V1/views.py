@@ -5,6 +5,7 @@ from dashboard.admin.api.V1.serializers import (
         ProfileSerializer
 )
 from reservations.api.V1.serializers import ReservationSerializer
+from reservations.api.V1.paginations import ReservationPagination
 
 class UserProfileView(RetrieveUpdateAPIView):
     serializer_class = ProfileSerializer
@@ -16,8 +17,8 @@ class UserProfileView(RetrieveUpdateAPIView):
 class ReservationCustomerListAPIView(ListAPIView):
     serializer_class = ReservationSerializer
     permission_classes = [IsAuthenticated]
-    
+    pagination_class = ReservationPagination
 
     def get_queryset(self):
-        return Reservation.objects.filter(user=self.request.user)
+        return Reservation.objects.filter(user=self.request.user).select_related('user__profile')
     
\ No newline at end of file
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import MenuItem, Category
+from .models import MenuItem, Category, KitchenTicket, ServingWindow
+from .kitchen import delete_tickets
 
 
 @admin.register(Category)
@@ -10,6 +11,11 @@ class CategoryAdmin(admin.ModelAdmin):
     ordering = ("title",)
 
 
+class ServingWindowInline(admin.TabularInline):
+    model = ServingWindow
+    extra = 0
+
+
 @admin.register(MenuItem)
 class MenuItemAdmin(admin.ModelAdmin):
     list_display = ("title", "price", "stock", "status", "is_featured", "created_date")
@@ -18,6 +24,7 @@ class MenuItemAdmin(admin.ModelAdmin):
     prepopulated_fields = {"slug": ("title",)}
     filter_horizontal = ("category",)
     readonly_fields = ("views", "created_date", "updated_date")
+    inlines = (ServingWindowInline,)
     fieldsets = (
         ("اطلاعات کلی", {
             "fields": ("title", "slug", "description", "category", "user")
@@ -28,10 +35,24 @@ class MenuItemAdmin(admin.ModelAdmin):
         ("وضعیت و قیمت", {
             "fields": ("price", "discount_percent", "stock", "status", "is_featured")
         }),
+        ("زمان‌بندی", {
+            "fields": ("publish_at", "unpublish_at")
+        }),
         ("سایر", {
             "fields": ("views", "preparation_time", "created_date", "updated_date")
         }),
     )
 
 
+@admin.register(KitchenTicket)
+class KitchenTicketAdmin(admin.ModelAdmin):
+    list_display = ("item", "station", "quantity", "minutes", "status", "created_date")
+    list_filter = ("status",)
+    # مجموع بار ایستگاه‌ها فقط از طریق menu.kitchen تغییر می‌کند
+    readonly_fields = ("item", "station", "quantity", "minutes", "status", "created_date", "completed_date")
+
+    def delete_model(self, request, obj):
+        delete_tickets(KitchenTicket.objects.filter(pk=obj.pk))
 
+    def delete_queryset(self, request, queryset):
+        delete_tickets(queryset)
@@ -0,0 +1,62 @@
+import django_filters
+from rest_framework.filters import BaseFilterBackend, SearchFilter
+from rest_framework.settings import api_settings
+from menu.models import MenuItem
+from menu.search import search_menu_items, normalize_text
+
+
+class MenuItemFilter(django_filters.FilterSet):
+    """
+    ``min_price``/``max_price`` compare against ``final_price``, the price
+    after discount, so the range matches what customers actually pay.
+    """
+
+    min_price = django_filters.NumberFilter(field_name='final_price', lookup_expr='gte')
+    max_price = django_filters.NumberFilter(field_name='final_price', lookup_expr='lte')
+    discounted = django_filters.BooleanFilter(method='filter_discounted')
+
+    class Meta:
+        model = MenuItem
+        fields = ['category', 'is_featured', 'min_price', 'max_price', 'discounted']
+
+    def filter_discounted(self, queryset, name, value):
+        if value:
+            return queryset.filter(discount_percent__gt=0)
+        return queryset.filter(discount_percent=0)
+
+
+class MenuSearchFilter(BaseFilterBackend):
+    """
+    Ranked full-text search over menu items (``?q=`` or ``?search=``).
+
+    Results come back ordered by relevance unless an explicit ``?ordering=``
+    is given.
+    """
+
+    search_params = ('q', api_settings.SEARCH_PARAM)
+
+    def get_search_query(self, request):
+        for param in self.search_params:
+            query = request.query_params.get(param, '').strip()
+            if query:
+                return query
+        return ''
+
+    def filter_queryset(self, request, queryset, view):
+        query = self.get_search_query(request)
+        if not query:
+            return queryset
+        results = search_menu_items(queryset, query)
+        if request.query_params.get(api_settings.ORDERING_PARAM) and queryset.query.order_by:
+            results = results.order_by(*queryset.query.order_by)
+        return results
+
+
+class NormalizedSearchFilter(SearchFilter):
+    """
+    SearchFilter that folds the search terms the same way ``search_text``
+    columns are folded.
+    """
+
+    def get_search_terms(self, request):
+        return normalize_text(' '.join(super().get_search_terms(request))).split()
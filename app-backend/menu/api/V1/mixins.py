@@ -0,0 +1,77 @@
+from django.http import HttpResponse, HttpResponseNotModified
+from rest_framework.permissions import SAFE_METHODS
+from config.renderers import FastJSONRenderer
+from menu.cache import get_or_build_snapshot, etag_matches
+from menu.counters import pending_views
+
+
+class SnapshotListMixin:
+    """
+    Serve the unfiltered list from a prebuilt, versioned snapshot.
+
+    Requests with query parameters (filters, search, pagination cursors)
+    go through the regular list path.
+    """
+
+    snapshot_name = None
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params:
+            return super().list(request, *args, **kwargs)
+
+        etag, content = get_or_build_snapshot(
+            self.snapshot_name,
+            self.get_snapshot_variant(request),
+            lambda: self.build_snapshot(request, *args, **kwargs),
+        )
+
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content, content_type="application/json")
+        response["ETag"] = etag
+        return response
+
+    def get_snapshot_variant(self, request):
+        # لینک‌های مطلق در خروجی به دامنه درخواست وابسته‌اند
+        return f"{request.scheme}://{request.get_host()}"
+
+    def build_snapshot(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        return FastJSONRenderer().render(response.data)
+
+
+class PendingViewsMixin:
+    """
+    Pass buffered, not yet flushed views to the serializer so list
+    responses show near-real-time ``views``.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        if args and kwargs.get("many"):
+            context = kwargs.setdefault("context", self.get_serializer_context())
+            context["pending_views"] = pending_views([obj.pk for obj in args[0]])
+        return super().get_serializer(*args, **kwargs)
+
+
+class SparseQuerysetMixin:
+    """
+    Load only the columns the (sparse) serializer will read, and skip the
+    category prefetch when categories are not requested.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+
+        serializer = self.get_serializer()
+        wanted = serializer.get_model_field_names()
+        if 'category' not in wanted:
+            queryset = queryset.prefetch_related(None)
+
+        concrete = {field.name for field in queryset.model._meta.concrete_fields}
+        # فیلدهای مرتب‌سازی برای ساختن cursor صفحه بعد لازم‌اند
+        ordering = [*queryset.query.order_by, *getattr(self.paginator, 'ordering', ())]
+        ordering = {name.lstrip('-') for name in ordering if isinstance(name, str)}
+        return queryset.only('pk', *(concrete & (wanted | ordering)))
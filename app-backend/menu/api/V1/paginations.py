@@ -1,6 +1,58 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import PageNumberPagination, CursorPagination
+from menu.search import is_ranked
 
 
 class MenuItemPagination(PageNumberPagination):
     page_size = 15
-    
\ No newline at end of file
+
+
+class MenuItemCursorPagination(CursorPagination):
+    """
+    Keyset pagination on ``(created_date, id)``.
+
+    The cursor carries the last seen ``created_date`` so every page is a
+    ``WHERE created_date < ...`` range read; ``id`` breaks ties between items
+    created in the same instant. Ranked search results have no stable key,
+    so they are paged by number instead.
+    """
+
+    page_size = 15
+    ordering = ('-created_date', '-id')
+    page_query_param = MenuItemPagination.page_query_param
+
+    def use_page_numbers(self, queryset, request):
+        return is_ranked(queryset)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = tuple(super().get_ordering(request, queryset, view))
+        # مرتب‌سازی روی فیلدهای غیر یکتا (مثل final_price) با id قطعی می‌شود
+        if ordering[-1].lstrip('-') not in ('id', 'pk'):
+            ordering += ('-id' if ordering[0].startswith('-') else 'id',)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_page_numbers(queryset, request):
+            self.fallback = MenuItemPagination()
+            return self.fallback.paginate_queryset(queryset, request, view)
+        self.fallback = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.fallback is not None:
+            return self.fallback.to_html()
+        return super().to_html()
+
+
+class AdminMenuItemPagination(MenuItemCursorPagination):
+    """
+    Cursor pagination by default; ``?page=`` falls back to numbered pages
+    for the admin UI.
+    """
+
+    def use_page_numbers(self, queryset, request):
+        return self.page_query_param in request.query_params or super().use_page_numbers(queryset, request)
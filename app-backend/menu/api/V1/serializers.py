@@ -1,8 +1,52 @@
+from django.urls import reverse
 from rest_framework import serializers
-from ...models import MenuItem, Category
+from rest_framework.permissions import SAFE_METHODS
+from config.images import build_srcset
+from config.instrumentation import TimedSerializerMixin
+from ...models import MenuItem, Category, KitchenTicket
 
 
-class CategorySerializer(serializers.ModelSerializer):
+def parse_field_list(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+class SparseFieldsMixin:
+    """
+    Read-only sparse fieldsets: ``?fields=a,b`` keeps only the named
+    fields, ``?omit=a,b`` drops them. Without ``?fields`` the serializer
+    starts from ``default_fields`` (all fields when it is None).
+    Unknown names are ignored.
+
+    ``model_fields`` maps derived fields to the model columns they read, so
+    views can load only those columns (see ``SparseQuerysetMixin``).
+    """
+
+    default_fields = None
+    model_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return
+
+        wanted = parse_field_list(request.query_params.get('fields')) or self.default_fields
+        omitted = set(parse_field_list(request.query_params.get('omit')))
+        for name in list(self.fields):
+            if (wanted is not None and name not in wanted) or name in omitted:
+                self.fields.pop(name)
+
+    def get_model_field_names(self):
+        names = set()
+        for name, field in self.fields.items():
+            if name in self.model_fields:
+                names.update(self.model_fields[name])
+            elif not field.write_only and field.source != '*':
+                names.add(field.source.split('.')[0])
+        return names
+
+
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serialize category data for listing and detail views.
     """
@@ -13,7 +57,7 @@ class CategorySerializer(serializers.ModelSerializer):
 
 
 
-class MenuItemSerializer(serializers.ModelSerializer):
+class MenuItemSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     # فقط برای گرفتن اطلاعات
     category = CategorySerializer(many=True, read_only=True)
 
@@ -26,6 +70,7 @@ class MenuItemSerializer(serializers.ModelSerializer):
 
     detail_link = serializers.SerializerMethodField()
     get_price = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = MenuItem
@@ -38,6 +83,7 @@ class MenuItemSerializer(serializers.ModelSerializer):
             'slug',
             'description',
             'image',
+            'srcset',
             'stock',
             'status',
             'price',
@@ -46,6 +92,8 @@ class MenuItemSerializer(serializers.ModelSerializer):
             'views',
             'is_featured',
             'preparation_time',
+            'publish_at',
+            'unpublish_at',
             'created_date',
             'updated_date',
             'is_discounted',
@@ -55,10 +103,27 @@ class MenuItemSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = [
             'created_date', 'updated_date', 'views',
-            'get_price', 'detail_link',
+            'get_price', 'detail_link', 'srcset',
             'is_discounted', 'is_published', 'is_out_of_stock'
         ]
 
+    # ستون‌هایی که فیلدهای محاسبه‌ای به آن‌ها نیاز دارند
+    model_fields = {
+        'get_price': ['final_price'],
+        'is_discounted': ['discount_percent'],
+        'is_published': ['status'],
+        'is_out_of_stock': ['stock'],
+        'detail_link': ['slug'],
+        'srcset': ['image_variants'],
+    }
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        pending = self.context.get('pending_views')
+        if pending and 'views' in data:
+            data['views'] += pending.get(instance.pk, 0)
+        return data
+
     def create(self, validated_data):
         categories = validated_data.pop('category_ids', [])
         item = MenuItem.objects.create(**validated_data)
@@ -77,7 +142,83 @@ class MenuItemSerializer(serializers.ModelSerializer):
     def get_detail_link(self, obj):
         request = self.context.get('request')
         if request:
-            return request.build_absolute_uri(f'/api/V1/menu/{obj.slug}/')
+            return request.build_absolute_uri(reverse('api-V1-menu:menu-item-detail', kwargs={'slug': obj.slug}))
 
     def get_get_price(self, obj):
         return obj.get_price()
+
+    def get_srcset(self, obj):
+        return build_srcset(obj.image_variants, self.context.get('request'))
+
+
+class MenuItemListSerializer(MenuItemSerializer):
+    """
+    Slim list shape for menu pages: what a menu card shows, nothing the
+    client can derive. ``?fields=`` can still ask for any detail field.
+    """
+
+    default_fields = [
+        'id',
+        'title',
+        'slug',
+        'description',
+        'category',
+        'image',
+        'srcset',
+        'price',
+        'get_price',
+        'discount_percent',
+        'is_featured',
+        'preparation_time',
+        'detail_link',
+    ]
+
+
+class CategoryGroupListSerializer(serializers.ListSerializer):
+    """
+    Turn ``(category, menu item)`` through-table rows, ordered by category,
+    into ``[{category..., "items": [...]}, ...]`` in a single pass. An item
+    that sits in several categories is serialized only once.
+    """
+
+    def to_representation(self, rows):
+        groups, items = [], {}
+        for row in rows:
+            if not groups or groups[-1]['id'] != row.category_id:
+                category = row.category
+                groups.append({'id': category.pk, 'title': category.title, 'slug': category.slug, 'items': []})
+            if row.menuitem_id not in items:
+                items[row.menuitem_id] = self.child.to_representation(row.menuitem)
+            groups[-1]['items'].append(items[row.menuitem_id])
+        return groups
+
+
+class MenuItemGroupedSerializer(MenuItemListSerializer):
+    """
+    Slim item shape nested under its category; the category list is left out
+    because the grouping already carries it.
+    """
+
+    default_fields = [name for name in MenuItemListSerializer.default_fields if name != 'category']
+
+    class Meta(MenuItemListSerializer.Meta):
+        list_serializer_class = CategoryGroupListSerializer
+
+
+class OrderLineSerializer(serializers.Serializer):
+    item = serializers.IntegerField(min_value=1)
+    quantity = serializers.IntegerField(min_value=1, max_value=100)
+
+
+class OrderLinesSerializer(serializers.Serializer):
+    """
+    Lines of one order, for stock reservation and the kitchen queue.
+    """
+
+    lines = OrderLineSerializer(many=True, allow_empty=False, max_length=100)
+
+
+class KitchenTicketSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = KitchenTicket
+        fields = ['id', 'item', 'station', 'quantity', 'minutes', 'status', 'created_date']
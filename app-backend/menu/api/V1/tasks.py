@@ -0,0 +1,32 @@
+from celery import shared_task
+from menu.counters import flush_view_counts
+
+
+@shared_task
+def flush_menu_item_views():
+    """
+    Periodically moves buffered menu item views into MenuItem.views.
+    """
+    return flush_view_counts()
+
+
+@shared_task
+def apply_menu_publish_schedule():
+    """
+    Publishes / unpublishes menu items whose publish_at / unpublish_at has passed.
+    """
+    from menu.availability import apply_publish_schedule
+
+    return apply_publish_schedule()
+
+
+@shared_task
+def generate_menu_item_image_variants(pk):
+    """
+    Builds the resized WebP/JPEG derivatives of a menu item's image.
+    """
+    from config.images import refresh_derivatives
+    from menu.models import MenuItem
+
+    item = MenuItem.objects.filter(pk=pk).first()
+    return bool(item) and refresh_derivatives(item)
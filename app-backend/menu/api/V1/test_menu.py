@@ -63,7 +63,7 @@ def menu_items(db, customer_user, categories):
 def test_get_menu_items_list(api_client, menu_items):
     resp = api_client.get(MENU_ITEMS_URL)
     assert resp.status_code == status.HTTP_200_OK
-    data = resp.json()
+    data = resp.json()['results']
     # فقط آیتم‌های publish برگردند
     assert len(data) == 2
     titles = [item['title'] for item in data]
@@ -90,3 +90,947 @@ def test_invalid_method_on_menu_items(api_client):
 def test_invalid_method_on_categories(api_client):
     resp = api_client.post(CATEGORIES_URL, data={"title":"foo"})
     assert resp.status_code in (status.HTTP_405_METHOD_NOT_ALLOWED, status.HTTP_403_FORBIDDEN)
+
+@pytest.mark.django_db
+def test_menu_items_snapshot_etag_not_modified(api_client, menu_items):
+    resp = api_client.get(MENU_ITEMS_URL)
+    assert resp.status_code == status.HTTP_200_OK
+    etag = resp["ETag"]
+
+    resp = api_client.get(MENU_ITEMS_URL, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+    assert resp["ETag"] == etag
+
+@pytest.mark.django_db
+def test_menu_items_snapshot_invalidated_on_change(api_client, menu_items, categories):
+    etag = api_client.get(MENU_ITEMS_URL)["ETag"]
+
+    menu_items[0].title = "کیک وانیلی"
+    menu_items[0].save()
+    resp = api_client.get(MENU_ITEMS_URL, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_200_OK
+    assert "کیک وانیلی" in [item['title'] for item in resp.json()['results']]
+
+    etag = resp["ETag"]
+    menu_items[1].category.add(categories[0])
+    resp = api_client.get(MENU_ITEMS_URL, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_200_OK
+
+def test_snapshot_invalidated_by_another_process(settings, tmp_path):
+    """
+    With a cache shared between processes (Redis in docker-compose, a file
+    cache here) a write in the Celery worker or another web worker makes
+    this process rebuild its snapshot.
+    """
+    import multiprocessing
+    from menu.cache import get_or_build_snapshot, invalidate_menu_snapshots
+
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": str(tmp_path)}}
+    builds = []
+
+    def builder():
+        builds.append(1)
+        return f"snapshot {len(builds)}".encode()
+
+    first = get_or_build_snapshot("menu-items", "test", builder)
+    assert get_or_build_snapshot("menu-items", "test", builder) == first
+
+    worker = multiprocessing.get_context("fork").Process(target=invalidate_menu_snapshots)
+    worker.start()
+    worker.join()
+    assert worker.exitcode == 0
+
+    assert get_or_build_snapshot("menu-items", "test", builder) != first
+    assert len(builds) == 2
+
+@pytest.mark.django_db
+def test_categories_snapshot_invalidated_on_delete(api_client, categories):
+    etag = api_client.get(CATEGORIES_URL)["ETag"]
+    categories[0].delete()
+    resp = api_client.get(CATEGORIES_URL, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_200_OK
+    assert [c['title'] for c in resp.json()] == ["نوشیدنی"]
+
+@pytest.fixture
+def seed_menu_items(db, categories):
+    counter = iter(range(1, 10**6))
+
+    def seed(n):
+        items = MenuItem.objects.bulk_create([
+            MenuItem(title=f"آیتم {i}", slug=f"item-{i}", description="-", price=10000)
+            for i in (next(counter) for _ in range(n))
+        ])
+        Through = MenuItem.category.through
+        Through.objects.bulk_create([
+            Through(menuitem_id=item.pk, category_id=category.pk)
+            for item in items for category in categories
+        ])
+    return seed
+
+@pytest.mark.django_db
+def test_menu_items_query_budget(api_client, query_budget, seed_menu_items):
+    query_budget(api_client, MENU_ITEMS_URL, seed_menu_items)
+
+@pytest.mark.django_db
+def test_categories_query_budget(api_client, query_budget):
+    counter = iter(range(1, 10**6))
+
+    def seed(n):
+        Category.objects.bulk_create([
+            Category(title=f"دسته {i}", slug=f"cat-{i}") for i in (next(counter) for _ in range(n))
+        ])
+    query_budget(api_client, CATEGORIES_URL, seed)
+
+@pytest.mark.django_db
+def test_menu_items_cursor_pagination_walks_all_items(api_client, seed_menu_items):
+    seed_menu_items(40)
+    seen = []
+    url = MENU_ITEMS_URL
+    while url:
+        data = api_client.get(url).json()
+        seen.extend(item['id'] for item in data['results'])
+        url = data['next']
+    assert len(seen) == 40
+    assert len(set(seen)) == 40
+    expected = list(MenuItem.objects.order_by('-created_date', '-id').values_list('id', flat=True))
+    assert seen == expected
+
+# ====================== جستجو ======================
+
+def test_normalize_text_folds_arabic_variants():
+    from menu.search import normalize_text
+    assert normalize_text("كيك") == normalize_text("کیک")
+    assert normalize_text("پیش‌غذا") == "پیش غذا"
+    assert normalize_text("قَهْوه ۲") == "قهوه 2"
+
+@pytest.mark.django_db
+def test_menu_items_search_by_title_with_arabic_letters(api_client, menu_items):
+    resp = api_client.get(MENU_ITEMS_URL, {'q': 'كيك'})
+    assert resp.status_code == status.HTTP_200_OK
+    titles = [item['title'] for item in resp.json()['results']]
+    assert titles == ["کیک شکلاتی"]
+
+@pytest.mark.django_db
+def test_menu_items_search_skips_drafts(api_client, menu_items):
+    resp = api_client.get(MENU_ITEMS_URL, {'q': 'قهوه'})
+    assert resp.json()['results'] == []
+
+@pytest.mark.django_db
+def test_menu_items_search_limit_counts_only_visible_items(api_client, settings):
+    settings.MENU_SEARCH_LIMIT = 2
+    for i in range(3):
+        MenuItem.objects.create(title=f"لیمو لیمو {i}", description="لیمو", status=ProductStatusType.draft.value)
+    published = MenuItem.objects.create(title="شربت", description="با کمی لیمو و نعناع و گلاب و زعفران و هل")
+
+    resp = api_client.get(MENU_ITEMS_URL, {'q': 'لیمو'})
+    assert [item['id'] for item in resp.json()['results']] == [published.pk]
+
+@pytest.mark.django_db
+def test_menu_items_search_ranks_title_matches_first(api_client, customer_user, categories):
+    by_description = MenuItem.objects.create(title="بستنی", description="با طعم نعناع و لیمو و کمی شکلات تلخ و وانیل و توت فرنگی")
+    by_title = MenuItem.objects.create(title="لیمو", description="تازه")
+    resp = api_client.get(MENU_ITEMS_URL, {'q': 'لیمو'})
+    assert [item['id'] for item in resp.json()['results']] == [by_title.pk, by_description.pk]
+
+@pytest.mark.django_db
+def test_menu_items_search_follows_category_changes(api_client, menu_items, categories):
+    resp = api_client.get(MENU_ITEMS_URL, {'q': 'دسر'})
+    assert [item['title'] for item in resp.json()['results']] == ["کیک شکلاتی"]
+
+    categories[0].title = "شیرینی"
+    categories[0].save()
+    assert api_client.get(MENU_ITEMS_URL, {'q': 'دسر'}).json()['results'] == []
+    assert len(api_client.get(MENU_ITEMS_URL, {'q': 'شیرینی'}).json()['results']) == 1
+
+    menu_items[1].category.add(categories[0])
+    assert len(api_client.get(MENU_ITEMS_URL, {'q': 'شیرینی'}).json()['results']) == 2
+
+    menu_items[0].delete()
+    assert len(api_client.get(MENU_ITEMS_URL, {'q': 'شیرینی'}).json()['results']) == 1
+
+@pytest.mark.django_db
+def test_contains_search_backend(menu_items):
+    from menu.search import ContainsSearchBackend
+    results = ContainsSearchBackend().search(MenuItem.objects.all(), 'چاي سبز')
+    assert [item.title for item in results] == ["چای سبز"]
+
+# ====================== شمارش بازدید ======================
+
+@pytest.fixture
+def view_counter(settings):
+    from menu.counters import get_counter
+    settings.MENU_VIEW_FLUSH_INTERVAL = 10**6
+    counter = get_counter()
+    counter.drain()
+    yield counter
+    counter.drain()
+
+@pytest.mark.django_db
+def test_views_are_buffered_then_flushed_in_batches(api_client, menu_items, view_counter):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from menu.counters import flush_view_counts
+
+    cake, tea = menu_items[0], menu_items[1]
+    for _ in range(3):
+        assert api_client.post(f"{MENU_ITEMS_URL}{cake.pk}/view/").status_code == status.HTTP_204_NO_CONTENT
+    api_client.post(f"{MENU_ITEMS_URL}{tea.pk}/view/")
+
+    cake.refresh_from_db()
+    assert cake.views == 0
+    resp = api_client.get(MENU_ITEMS_URL, {'fields': 'id,views'})
+    views = {item['id']: item['views'] for item in resp.json()['results']}
+    assert views == {cake.pk: 3, tea.pk: 1}
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert flush_view_counts() == 2
+    assert len([q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]) == 2
+
+    cake.refresh_from_db()
+    tea.refresh_from_db()
+    assert (cake.views, tea.views) == (3, 1)
+    assert view_counter.pending([cake.pk, tea.pk]) == {}
+
+@pytest.mark.django_db
+def test_views_of_unknown_or_draft_items_are_rejected(api_client, menu_items, view_counter):
+    draft = MenuItem.objects.create(title="حلیم", description="-", status=ProductStatusType.draft.value)
+    for pk in (draft.pk, 10**9):
+        assert api_client.post(f"{MENU_ITEMS_URL}{pk}/view/").status_code == status.HTTP_404_NOT_FOUND
+    assert view_counter.drain() == {}
+
+@pytest.mark.django_db
+def test_views_are_throttled_per_client(api_client, menu_items, view_counter, mocker):
+    from rest_framework.throttling import ScopedRateThrottle
+    mocker.patch.object(ScopedRateThrottle, "THROTTLE_RATES", {"menu_views": "3/min"})
+
+    url = f"{MENU_ITEMS_URL}{menu_items[0].pk}/view/"
+    assert [api_client.post(url).status_code for _ in range(4)] == [204, 204, 204, 429]
+    assert view_counter.drain() == {menu_items[0].pk: 3}
+
+# ====================== نامک ======================
+
+@pytest.mark.django_db
+def test_save_without_title_change_runs_no_select(categories):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    category = Category.objects.get(pk=categories[0].pk)
+    with CaptureQueriesContext(connection) as ctx:
+        category.save()
+    assert [q['sql'].split()[0] for q in ctx.captured_queries] == ['UPDATE']
+
+@pytest.mark.django_db
+def test_title_change_regenerates_slug(menu_items):
+    item = MenuItem.objects.get(pk=menu_items[0].pk)
+    item.title = "کیک وانیلی"
+    item.save()
+    assert item.slug == "کیک-وانیلی"
+
+@pytest.mark.django_db
+def test_duplicate_titles_get_unique_slugs(db):
+    first = MenuItem.objects.create(title="کباب کوبیده", description="-")
+    second = MenuItem.objects.create(title="کباب کوبیده", description="-")
+    assert first.slug == "کباب-کوبیده"
+    assert second.slug == "کباب-کوبیده-2"
+
+@pytest.mark.django_db
+def test_bulk_create_allocates_slugs_per_batch(db):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    MenuItem.objects.create(title="دوغ", description="-")
+    MenuItem.objects.create(title="دوغ", description="-")
+
+    with CaptureQueriesContext(connection) as ctx:
+        items = MenuItem.objects.bulk_create([
+            MenuItem(title="دوغ", description="-"),
+            MenuItem(title="دوغ", description="-"),
+            MenuItem(title="لیموناد", description="-"),
+        ])
+    assert [item.slug for item in items] == ["دوغ-3", "دوغ-4", "لیموناد"]
+    assert len([q for q in ctx.captured_queries if q['sql'].startswith('SELECT')]) == 2
+
+@pytest.mark.django_db
+def test_bulk_update_title_updates_slug(menu_items):
+    items = list(MenuItem.objects.order_by('pk')[:2])
+    items[0].title = "چای سبز"
+    MenuItem.objects.bulk_update(items, ['title'])
+    assert MenuItem.objects.get(pk=items[0].pk).slug == "چای-سبز-2"
+    assert MenuItem.objects.get(pk=items[1].pk).slug == "چای-سبز"
+
+@pytest.mark.django_db
+def test_deferred_title_keeps_slug(menu_items):
+    cake, tea, _ = menu_items
+    MenuItem.objects.filter(pk=cake.pk).update(slug="cake")
+    MenuItem.objects.filter(pk=tea.pk).update(slug="tea")
+
+    item = MenuItem.objects.defer('title').get(pk=cake.pk)
+    item.stock = 3
+    item.save()
+    assert item.slug == "cake"
+
+    # عنوان بعد از defer خوانده شده ولی تغییری نکرده
+    item = MenuItem.objects.only('pk', 'slug').get(pk=cake.pk)
+    assert item.title == "کیک شکلاتی"
+    item.save()
+    assert MenuItem.objects.get(pk=cake.pk).slug == "cake"
+
+    items = list(MenuItem.objects.defer('title').filter(pk__in=[cake.pk, tea.pk]).order_by('pk'))
+    items[0].title
+    items[1].title = "چای ترش"
+    MenuItem.objects.bulk_update(items, ['title'])
+    assert dict(MenuItem.objects.filter(pk__in=[cake.pk, tea.pk]).values_list('pk', 'slug')) == {
+        cake.pk: "cake", tea.pk: "چای-ترش",
+    }
+
+# ====================== ورود و خروج گروهی ======================
+
+IMPORT_CSV = """title,description,price,discount_percent,stock,status,is_featured,preparation_time,categories
+کباب برگ,با برنج,250000,10,5,1,True,30,دسر|نوشیدنی
+جوجه کباب,,abc,0,5,1,False,20,دسر
+دوغ,محلی,30000,0,10,1,False,2,ناموجود
+دوغ,گازدار,35000,0,10,1,False,2,
+"""
+
+@pytest.mark.django_db
+def test_import_menu_items_reports_row_errors(categories):
+    import io
+    from menu.transfer import import_menu_items
+
+    report = import_menu_items(io.StringIO(IMPORT_CSV), "csv", chunk_size=2)
+    assert report.created == 2
+    assert [error['row'] for error in report.errors] == [3, 4]
+    assert set(report.errors[0]['errors']) == {'description', 'price'}
+
+    kebab = MenuItem.objects.get(title="کباب برگ")
+    assert sorted(kebab.category.values_list('title', flat=True)) == ["دسر", "نوشیدنی"]
+    assert kebab.is_featured and kebab.discount_percent == 10
+    assert MenuItem.objects.get(title="دوغ").slug == "دوغ"
+
+@pytest.mark.django_db
+def test_export_round_trips_through_import(menu_items):
+    import io
+    from menu.transfer import import_menu_items, export_menu_items
+
+    exported = {fmt: "".join(export_menu_items(fmt, chunk_size=2)) for fmt in ("csv", "jsonl")}
+    for fmt, content in exported.items():
+        report = import_menu_items(io.StringIO(content), fmt)
+        assert (report.created, report.failed) == (3, 0)
+
+    copies = MenuItem.objects.filter(title="کیک شکلاتی")
+    assert copies.count() == 3
+    assert {tuple(item.category.values_list('title', flat=True)) for item in copies} == {("دسر",)}
+
+@pytest.mark.django_db
+def test_import_and_export_commands(categories, tmp_path):
+    from django.core.management import call_command
+
+    source = tmp_path / "menu.csv"
+    source.write_text(IMPORT_CSV, encoding="utf-8")
+    call_command("import_menu", str(source))
+    assert MenuItem.objects.count() == 2
+
+    target = tmp_path / "menu.jsonl"
+    call_command("export_menu", "--format", "jsonl", "--output", str(target))
+    assert len(target.read_text(encoding="utf-8").splitlines()) == 2
+
+
+@pytest.mark.django_db
+def test_fake_menu_bulk_mode(customer_user, menu_items, settings, tmp_path, django_assert_max_num_queries):
+    from django.core.management import call_command
+    from menu.management.commands.fake_menu import generate_rows
+    from menu.search import search_menu_items
+
+    settings.MEDIA_ROOT = tmp_path
+    # تعداد کوئری به تعداد دسته‌ها وابسته است، نه به تعداد آیتم‌ها
+    with django_assert_max_num_queries(60):
+        call_command("fake_menu", "--count", "45", "--seed", "7", "--batch-size", "20")
+
+    fake = MenuItem.objects.exclude(pk__in=[item.pk for item in menu_items])
+    assert fake.count() == 45
+    assert fake.values("slug").distinct().count() == 45
+    assert fake.values("image").distinct().count() <= 6
+    assert len(list(tmp_path.rglob("*.png"))) == 6
+    assert MenuItem.category.through.objects.filter(menuitem__in=fake).count() >= 45
+    assert fake.first().final_price
+
+    # همان seed همان داده را می‌سازد، با هر تعداد پروسه
+    assert generate_rows(7, 1, 21, 20, ["a", "b"], 6) == generate_rows(7, 1, 21, 20, ["a", "b"], 6)
+    title = generate_rows(7, 0, 1, 1, ["a", "b"], 6)[0]["title"]
+    assert search_menu_items(fake, title.rstrip(".")).exists()
+
+
+SAMPLE_IMAGE = "menu/management/commands/images/menu-item-1.png"
+
+@pytest.fixture
+def image_item(settings, tmp_path, customer_user):
+    from django.core.files import File
+
+    settings.MEDIA_ROOT = tmp_path
+    item = MenuItem(user=customer_user, title="پیتزا", description="تست", price=100000)
+    with open(SAMPLE_IMAGE, "rb") as f:
+        item.image.save("pizza.png", File(f), save=False)
+    return item
+
+@pytest.mark.django_db
+def test_image_variants_are_queued_after_commit(image_item, mocker, django_capture_on_commit_callbacks):
+    delay = mocker.patch("menu.api.V1.tasks.generate_menu_item_image_variants.delay")
+    with django_capture_on_commit_callbacks(execute=True):
+        image_item.save()
+    delay.assert_called_once_with(image_item.pk)
+
+    # بدون تغییر تصویر دوباره صف نمی‌شود
+    image_item.image_variants = {"source": image_item.image.name}
+    with django_capture_on_commit_callbacks(execute=True):
+        image_item.save()
+    assert delay.call_count == 1
+
+@pytest.mark.django_db
+def test_image_variants_are_generated_once(api_client, image_item, settings):
+    from menu.api.V1.tasks import generate_menu_item_image_variants
+
+    image_item.save()
+    assert generate_menu_item_image_variants(image_item.pk) is True
+    assert generate_menu_item_image_variants(image_item.pk) is False
+
+    image_item.refresh_from_db()
+    variants = image_item.image_variants["variants"]
+    assert variants["thumbnail"]["width"] == settings.IMAGE_DERIVATIVE_WIDTHS["thumbnail"]
+    # تصویر 610 پیکسلی بزرگ‌تر نمی‌شود
+    assert variants["full"]["width"] == 610
+    for variant in variants.values():
+        assert (settings.MEDIA_ROOT / variant["webp"]).exists()
+        assert (settings.MEDIA_ROOT / variant["jpeg"]).exists()
+
+    srcset = api_client.get(MENU_ITEMS_URL).json()["results"][0]["srcset"]
+    assert srcset["webp"].endswith("pizza-full.webp 610w")
+    assert "160w" in srcset["jpeg"]
+
+@pytest.mark.django_db
+def test_image_variants_invalidate_cached_menu(api_client, image_item, django_capture_on_commit_callbacks):
+    from menu.api.V1.tasks import generate_menu_item_image_variants
+
+    image_item.save()
+    listed = api_client.get(MENU_ITEMS_URL).json()["results"][0]
+    assert listed["srcset"] is None
+    assert api_client.get(listed["detail_link"]).json()["srcset"] is None
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert generate_menu_item_image_variants(image_item.pk) is True
+    assert api_client.get(MENU_ITEMS_URL).json()["results"][0]["srcset"]
+    assert api_client.get(listed["detail_link"]).json()["srcset"]
+
+@pytest.mark.django_db
+def test_backfill_image_variants_command(image_item):
+    from django.core.management import call_command
+
+    image_item.save()
+    call_command("backfill_image_variants", "--workers", "1")
+    image_item.refresh_from_db()
+    assert set(image_item.image_variants["variants"]) == {"thumbnail", "card", "full"}
+
+
+@pytest.mark.django_db
+def test_final_price_is_exact_and_follows_every_write(customer_user, categories):
+    item = MenuItem.objects.create(user=customer_user, title="چای", description="-", price=12345, discount_percent=15)
+    # 12345 * 0.85 = 10493.25
+    assert item.get_price() == 10493
+    assert MenuItem.objects.get(pk=item.pk).final_price == 10493
+
+    MenuItem.objects.filter(pk=item.pk).update(discount_percent=50)
+    assert MenuItem.objects.get(pk=item.pk).final_price == 6173  # 6172.5 گرد به بالا
+
+    item.refresh_from_db()
+    item.price = 1000
+    MenuItem.objects.bulk_update([item], ["price"])
+    assert item.final_price == 500
+    assert MenuItem.objects.get(pk=item.pk).final_price == 500
+
+@pytest.mark.django_db
+def test_menu_items_filter_and_order_by_final_price(api_client, customer_user):
+    for title, price, discount in [("الف", 100000, 50), ("ب", 80000, 0), ("ج", 60000, 10)]:
+        MenuItem.objects.create(user=customer_user, title=title, description="-", price=price, discount_percent=discount)
+
+    resp = api_client.get(MENU_ITEMS_URL, {"ordering": "final_price"})
+    assert [row["get_price"] for row in resp.json()["results"]] == [50000, 54000, 80000]
+
+    resp = api_client.get(MENU_ITEMS_URL, {"min_price": 52000, "max_price": 60000})
+    assert [row["title"] for row in resp.json()["results"]] == ["ج"]
+
+# ====================== فیلدهای انتخابی ======================
+
+@pytest.mark.django_db
+def test_menu_items_list_uses_slim_shape(api_client, menu_items):
+    from menu.api.V1.serializers import MenuItemListSerializer
+
+    item = api_client.get(MENU_ITEMS_URL).json()['results'][0]
+    assert set(item) == set(MenuItemListSerializer.default_fields)
+    # کارت منو توضیحات را نشان می‌دهد
+    assert item['description']
+    assert 'created_date' not in item
+
+@pytest.mark.django_db
+def test_menu_items_sparse_fields_trim_sql_columns(api_client, menu_items):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as ctx:
+        resp = api_client.get(MENU_ITEMS_URL, {'fields': 'id,title,get_price'})
+    assert [list(item) for item in resp.json()['results']] == [['id', 'title', 'get_price']] * 2
+    # بدون دسته‌بندی prefetch اجرا نمی‌شود
+    assert len(ctx.captured_queries) == 1
+    sql = ctx.captured_queries[0]['sql']
+    assert '"description"' not in sql and '"final_price"' in sql
+
+    item = api_client.get(MENU_ITEMS_URL, {'fields': 'id,description,category', 'omit': 'category'}).json()['results'][0]
+    assert list(item) == ['id', 'description']
+
+# ====================== جزئیات آیتم ======================
+
+@pytest.mark.django_db
+def test_menu_item_detail_is_served_from_cache(api_client, menu_items, django_assert_num_queries):
+    link = api_client.get(MENU_ITEMS_URL).json()['results'][0]['detail_link']
+    resp = api_client.get(link)
+    assert resp.status_code == status.HTTP_200_OK
+    assert 'description' in resp.json()
+
+    # فقط views از دیتابیس خوانده می‌شود
+    with django_assert_num_queries(1):
+        again = api_client.get(link)
+    assert again.content == resp.content
+
+    assert api_client.get(link, HTTP_IF_NONE_MATCH=resp['ETag']).status_code == status.HTTP_304_NOT_MODIFIED
+    assert api_client.get(link, HTTP_IF_MODIFIED_SINCE=resp['Last-Modified']).status_code == status.HTTP_304_NOT_MODIFIED
+
+@pytest.mark.django_db
+def test_menu_item_detail_invalidated_on_change(api_client, menu_items, categories):
+    cake = menu_items[0]
+    url = f"{MENU_ITEMS_URL}{cake.slug}/"
+    etag = api_client.get(url)['ETag']
+
+    categories[0].title = "شیرینی"
+    categories[0].save()
+    resp = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.json()['category'][0]['title'] == "شیرینی"
+
+    old_slug = cake.slug
+    cake.title = "کیک وانیلی"
+    cake.save()
+    assert api_client.get(f"{MENU_ITEMS_URL}{old_slug}/").status_code == status.HTTP_404_NOT_FOUND
+    assert api_client.get(f"{MENU_ITEMS_URL}{cake.slug}/").json()['title'] == "کیک وانیلی"
+
+@pytest.mark.django_db
+def test_menu_item_detail_last_modified_follows_cache_version(api_client, menu_items, categories, monkeypatch):
+    import time
+    cake = menu_items[0]
+    url = f"{MENU_ITEMS_URL}{cake.slug}/"
+    clock = [time.time_ns()]
+    monkeypatch.setattr(time, "time_ns", lambda: clock[0])
+
+    last_modified = api_client.get(url)['Last-Modified']
+    assert api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code == status.HTTP_304_NOT_MODIFIED
+    clock[0] += 5 * 10**9
+    # تغییر نام دسته‌بندی updated_date آیتم را جلو نمی‌برد
+    category = Category.objects.get(pk=categories[0].pk)
+    category.title = "شیرینی"
+    category.save()
+    resp = api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp['Last-Modified'] != last_modified
+
+@pytest.mark.django_db
+def test_menu_item_detail_views_do_not_invalidate_cache(api_client, menu_items, view_counter, django_assert_num_queries):
+    from menu.counters import flush_view_counts
+    cake = menu_items[0]
+    url = f"{MENU_ITEMS_URL}{cake.slug}/"
+    first = api_client.get(url)
+    assert first.json()['views'] == 0
+
+    for _ in range(2):
+        api_client.post(f"{MENU_ITEMS_URL}{cake.pk}/view/")
+    # بازدیدهای بافرشده بدون ساختن دوباره کش دیده می‌شوند
+    with django_assert_num_queries(1):
+        assert api_client.get(url).json()['views'] == 2
+
+    flush_view_counts()
+    api_client.post(f"{MENU_ITEMS_URL}{cake.pk}/view/")
+    resp = api_client.get(url)
+    assert resp.json()['views'] == 3
+    assert (resp['ETag'], resp['Last-Modified']) == (first['ETag'], first['Last-Modified'])
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code == status.HTTP_304_NOT_MODIFIED
+    assert list(resp.json()) == list(first.json())
+
+@pytest.mark.django_db
+def test_menu_item_detail_hides_drafts(api_client, menu_items):
+    draft = menu_items[2]
+    assert draft.status == ProductStatusType.draft.value
+    assert api_client.get(f"{MENU_ITEMS_URL}{draft.slug}/").status_code == status.HTTP_404_NOT_FOUND
+
+# ====================== منو به تفکیک دسته‌بندی ======================
+
+MENU_BY_CATEGORY_URL = "/menu/api/V1/menu-by-category/"
+
+@pytest.mark.django_db
+def test_menu_by_category_groups_published_items(api_client, menu_items, categories):
+    cake, tea, _ = menu_items
+    cake.category.add(categories[1])
+
+    groups = api_client.get(MENU_BY_CATEGORY_URL).json()
+    assert [(group['title'], [item['title'] for item in group['items']]) for group in groups] == [
+        ("دسر", ["کیک شکلاتی"]),
+        ("نوشیدنی", ["چای سبز", "کیک شکلاتی"]),
+    ]
+    assert groups[0]['items'][0] == groups[1]['items'][1]
+    assert 'category' not in groups[0]['items'][0]
+
+@pytest.mark.django_db
+def test_menu_by_category_query_budget(api_client, query_budget, seed_menu_items):
+    # یک کوئری روی جدول واسط، هر تعداد آیتم و دسته‌بندی
+    assert set(query_budget(api_client, MENU_BY_CATEGORY_URL, seed_menu_items).values()) == {1}
+
+# ====================== موجودی ======================
+
+STOCK_RESERVE_URL = "/menu/api/V1/stock/reserve/"
+STOCK_RELEASE_URL = "/menu/api/V1/stock/release/"
+
+@pytest.mark.django_db
+def test_reserve_stock_is_all_or_nothing(api_client, customer_user, menu_items):
+    cake, tea, _ = menu_items  # موجودی: 5 و 0
+    api_client.force_authenticate(customer_user)
+
+    resp = api_client.post(STOCK_RESERVE_URL, {"lines": [
+        {"item": cake.pk, "quantity": 2}, {"item": tea.pk, "quantity": 1},
+    ]}, format="json")
+    assert resp.status_code == status.HTTP_409_CONFLICT
+    assert resp.json()["item"] == tea.pk
+    cake.refresh_from_db()
+    assert cake.stock == 5
+
+@pytest.mark.django_db
+def test_reserve_stock_announces_sold_out(api_client, customer_user, menu_items, django_capture_on_commit_callbacks):
+    from menu.stock import sold_out
+
+    cake = menu_items[0]
+    received = []
+    sold_out.connect(lambda sender, item_ids, **kwargs: received.extend(item_ids), weak=False, dispatch_uid="test")
+    api_client.force_authenticate(customer_user)
+    try:
+        with django_capture_on_commit_callbacks(execute=True):
+            first = api_client.post(STOCK_RESERVE_URL, {"lines": [{"item": cake.pk, "quantity": 2}]}, format="json")
+        assert first.json()["sold_out"] == [] and received == []
+
+        with django_capture_on_commit_callbacks(execute=True):
+            # خطوط تکراری یک آیتم با هم جمع می‌شوند
+            last = api_client.post(STOCK_RESERVE_URL, {"lines": [
+                {"item": cake.pk, "quantity": 1}, {"item": cake.pk, "quantity": 2},
+            ]}, format="json")
+        assert last.json()["sold_out"] == [cake.pk] and received == [cake.pk]
+    finally:
+        sold_out.disconnect(dispatch_uid="test")
+
+    cake.refresh_from_db()
+    assert cake.is_out_of_stock
+
+@pytest.mark.django_db
+def test_reserve_stock_requires_login(api_client, menu_items):
+    resp = api_client.post(STOCK_RESERVE_URL, {"lines": [{"item": menu_items[0].pk, "quantity": 1}]}, format="json")
+    assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+
+@pytest.mark.django_db
+def test_release_stock_restores_cancelled_order(api_client, customer_user, menu_items, django_capture_on_commit_callbacks):
+    cake = menu_items[0]
+    api_client.force_authenticate(customer_user)
+    api_client.post(STOCK_RESERVE_URL, {"lines": [{"item": cake.pk, "quantity": 5}]}, format="json")
+    assert api_client.get(f"{MENU_ITEMS_URL}{cake.slug}/").json()["is_out_of_stock"]
+
+    # لغو سفارش فقط توسط کارکنان؛ کاربر عادی نمی‌تواند موجودی بسازد
+    assert api_client.post(STOCK_RELEASE_URL, {"lines": [{"item": cake.pk, "quantity": 5}]}, format="json").status_code == status.HTTP_403_FORBIDDEN
+
+    api_client.force_authenticate(CustomeUser.objects.create_superuser(email="orders@example.com", password="pass1234"))
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = api_client.post(STOCK_RELEASE_URL, {"lines": [{"item": cake.pk, "quantity": 3}, {"item": cake.pk, "quantity": 2}]}, format="json")
+    assert resp.status_code == status.HTTP_204_NO_CONTENT
+    cake.refresh_from_db()
+    assert cake.stock == 5
+    assert not api_client.get(f"{MENU_ITEMS_URL}{cake.slug}/").json()["is_out_of_stock"]
+
+# ====================== صف آشپزخانه ======================
+
+KITCHEN_LOAD_URL = "/menu/api/V1/kitchen/load/"
+KITCHEN_ETA_URL = "/menu/api/V1/kitchen/eta/"
+KITCHEN_TICKETS_URL = "/menu/api/V1/kitchen/tickets/"
+
+@pytest.fixture
+def staff_client(db):
+    admin = CustomeUser.objects.create_superuser(email="kitchen@example.com", password="pass1234")
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+@pytest.mark.django_db
+def test_kitchen_eta_follows_running_totals(api_client, staff_client, menu_items, categories, django_capture_on_commit_callbacks):
+    cake, tea, _ = menu_items
+    MenuItem.objects.filter(pk=cake.pk).update(preparation_time=20)
+    MenuItem.objects.filter(pk=tea.pk).update(preparation_time=5)
+
+    eta = api_client.get(KITCHEN_ETA_URL, {"items": f"{cake.pk},{tea.pk}:2"}).json()
+    assert eta["eta_minutes"] == 20
+
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = staff_client.post(KITCHEN_TICKETS_URL, {"lines": [{"item": cake.pk, "quantity": 2}]}, format="json")
+    assert resp.status_code == status.HTTP_201_CREATED
+    ticket = resp.json()[0]
+
+    eta = api_client.get(KITCHEN_ETA_URL, {"items": f"{cake.pk},{tea.pk}:2"}).json()
+    assert eta["eta_minutes"] == 60
+    assert eta["stations"] == [
+        {"station": categories[0].pk, "eta_minutes": 60},
+        {"station": categories[1].pk, "eta_minutes": 10},
+    ]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert staff_client.post(f"{KITCHEN_TICKETS_URL}{ticket['id']}/complete/").status_code == status.HTTP_204_NO_CONTENT
+    assert staff_client.post(f"{KITCHEN_TICKETS_URL}{ticket['id']}/complete/").status_code == status.HTTP_404_NOT_FOUND
+    assert api_client.get(KITCHEN_ETA_URL, {"items": str(cake.pk)}).json()["eta_minutes"] == 20
+
+@pytest.mark.django_db
+def test_kitchen_load_is_cheap_to_poll(api_client, staff_client, menu_items, django_assert_num_queries, django_capture_on_commit_callbacks):
+    cake = menu_items[0]
+    first = api_client.get(KITCHEN_LOAD_URL)
+    assert first.json() == []
+
+    with django_assert_num_queries(0):
+        assert api_client.get(KITCHEN_LOAD_URL, HTTP_IF_NONE_MATCH=first["ETag"]).status_code == status.HTTP_304_NOT_MODIFIED
+
+    with django_capture_on_commit_callbacks(execute=True):
+        staff_client.post(KITCHEN_TICKETS_URL, {"lines": [{"item": cake.pk, "quantity": 1}]}, format="json")
+    resp = api_client.get(KITCHEN_LOAD_URL, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.json()[0]["minutes"] == cake.preparation_time
+
+@pytest.mark.django_db
+def test_kitchen_admin_delete_releases_load(api_client, admin_client, menu_items, django_capture_on_commit_callbacks):
+    from menu.kitchen import enqueue_order, complete_ticket
+    from menu.models import KitchenLoad, KitchenTicket
+    cake = menu_items[0]
+    with django_capture_on_commit_callbacks(execute=True):
+        first, second, third, done = (enqueue_order([(cake.pk, 1)])[0] for _ in range(4))
+        complete_ticket(done.pk)
+    load = KitchenLoad.objects.get(pk=first.station_id)
+    assert (load.minutes, load.tickets) == (3 * cake.preparation_time, 3)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        admin_client.post(f"/admin/menu/kitchenticket/{first.pk}/delete/", {"post": "yes"})
+    load.refresh_from_db()
+    assert (load.minutes, load.tickets) == (2 * cake.preparation_time, 2)
+
+    # حذف گروهی؛ تیکت آماده‌شده چیزی از بار کم نمی‌کند
+    with django_capture_on_commit_callbacks(execute=True):
+        admin_client.post("/admin/menu/kitchenticket/", {
+            "action": "delete_selected", "post": "yes", "_selected_action": [second.pk, third.pk, done.pk],
+        })
+    load.refresh_from_db()
+    assert (load.minutes, load.tickets) == (0, 0)
+    assert not KitchenTicket.objects.exists()
+    assert api_client.get(KITCHEN_LOAD_URL).json()[0]["minutes"] == 0
+
+@pytest.mark.django_db
+def test_kitchen_eta_rejects_bad_items(api_client, menu_items):
+    assert api_client.get(KITCHEN_ETA_URL, {"items": "abc"}).status_code == status.HTTP_400_BAD_REQUEST
+    assert api_client.get(KITCHEN_ETA_URL, {"items": "999999"}).json()["items"] == [999999]
+
+# ====================== ایندکس‌ها ======================
+
+FEATURED_URL = "/menu/api/V1/featured/"
+DEALS_URL = "/menu/api/V1/deals/"
+ADMIN_MENU_URL = "/dashboard/api/V1/admin/menu/"
+
+@pytest.fixture
+def indexed_menu(db, categories):
+    items = MenuItem.objects.bulk_create([
+        MenuItem(
+            title=f"آیتم {i}", slug=f"item-{i}", description="-", price=10000 + i,
+            status=ProductStatusType.publish.value if i % 4 else ProductStatusType.draft.value,
+            is_featured=i % 10 == 0, discount_percent=(i % 5) * 10,
+        )
+        for i in range(300)
+    ])
+    Through = MenuItem.category.through
+    Through.objects.bulk_create([Through(menuitem_id=item.pk, category_id=categories[item.pk % 2].pk) for item in items])
+    return items
+
+def query_plans(client, url, params=None):
+    """
+    Run the request and return ``EXPLAIN QUERY PLAN`` lines of every SELECT
+    it issued, explained with the same bound parameters.
+    """
+    from django.db import connection
+
+    queries = []
+
+    def capture(execute, sql, sql_params, many, context):
+        if sql.startswith('SELECT'):
+            queries.append((sql, sql_params))
+        return execute(sql, sql_params, many, context)
+
+    with connection.execute_wrapper(capture):
+        assert client.get(url, params).status_code == status.HTTP_200_OK
+    plans = []
+    with connection.cursor() as cursor:
+        for sql, sql_params in queries:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", sql_params)
+            plans.extend(row[-1] for row in cursor.fetchall())
+    return plans
+
+def full_scans(plans):
+    # «SCAN جدول» بدون ایندکس یعنی خواندن کل جدول
+    return [detail for detail in plans if detail.startswith('SCAN ') and 'USING' not in detail]
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url, params, index", [
+    (MENU_ITEMS_URL, None, "menu_pub_created_idx"),
+    (MENU_ITEMS_URL, {"ordering": "final_price"}, "menu_pub_price_idx"),
+    (MENU_ITEMS_URL, {"min_price": 10100, "max_price": 10200}, "menu_pub_price_idx"),
+    (FEATURED_URL, None, "menu_featured_idx"),
+    (DEALS_URL, None, "menu_deals_idx"),
+    (ADMIN_MENU_URL, {"is_featured": "true"}, "menu_featured_idx"),
+    (ADMIN_MENU_URL, {"discounted": "true", "ordering": "-discount_percent"}, "menu_deals_idx"),
+    (ADMIN_MENU_URL, {"category": 1}, "menu_pub_created_idx"),
+])
+def test_hot_menu_queries_use_indexes(api_client, staff_client, indexed_menu, url, params, index):
+    client = staff_client if url == ADMIN_MENU_URL else api_client
+    plans = query_plans(client, url, params)
+    assert full_scans(plans) == []
+    assert any(f"INDEX {index} " in detail for detail in plans), plans
+
+@pytest.mark.django_db
+def test_featured_and_deals_lists(api_client, indexed_menu):
+    featured = api_client.get(FEATURED_URL).json()['results']
+    assert featured and all(item['is_featured'] for item in featured)
+
+    deals = api_client.get(DEALS_URL).json()['results']
+    discounts = [item['discount_percent'] for item in deals]
+    assert discounts == sorted(discounts, reverse=True) and min(discounts) > 0
+
+    # صفحه بعد با cursor روی درصد تخفیف
+    page_two = api_client.get(api_client.get(DEALS_URL, {"ordering": "-discount_percent"}).json()['next']).json()['results']
+    assert not {item['id'] for item in deals} & {item['id'] for item in page_two}
+
+# ---------------- serving windows / scheduled publishing ----------------
+
+AVAILABLE_URL = "/menu/api/V1/available/"
+
+@pytest.fixture
+def served_menu(db, customer_user):
+    from datetime import time
+    from menu.models import ServingWindow
+
+    def make(title, *windows, status=ProductStatusType.publish.value):
+        item = MenuItem.objects.create(user=customer_user, title=title, description="-", price=1000, status=status)
+        for start, end in windows:
+            ServingWindow.objects.create(item=item, start_time=time(*start), end_time=time(*end))
+        return item
+
+    return {
+        "breakfast": make("املت", ((7, 0), (11, 0))),
+        "late": make("کباب", ((12, 0), (15, 0)), ((19, 0), (1, 0))),
+        "all_day": make("چای"),
+        "draft": make("حلیم", ((7, 0), (11, 0)), status=ProductStatusType.draft.value),
+    }
+
+def available_titles(client, at):
+    response = client.get(AVAILABLE_URL, {"at": at})
+    assert response.status_code == status.HTTP_200_OK
+    return {item['title'] for item in response.json()['results']}
+
+@pytest.mark.django_db
+def test_available_menu_follows_serving_windows(api_client, served_menu):
+    assert available_titles(api_client, "08:00") == {"املت", "چای"}
+    assert available_titles(api_client, "13:30") == {"کباب", "چای"}
+    # پنجره شام از نیمه‌شب عبور می‌کند
+    assert available_titles(api_client, "00:30") == {"کباب", "چای"}
+    assert available_titles(api_client, "04:00") == {"چای"}
+    assert api_client.get(AVAILABLE_URL, {"at": "25:00"}).status_code == status.HTTP_400_BAD_REQUEST
+
+    body = api_client.get(AVAILABLE_URL, {"at": "08:07"}).json()
+    assert (body['starts'], body['ends']) == ("08:00", "08:15")
+
+@pytest.mark.django_db
+def test_available_menu_is_answered_from_the_bucket_index(api_client, served_menu, django_assert_num_queries):
+    api_client.get(AVAILABLE_URL)
+    first = api_client.get(AVAILABLE_URL, {"at": "08:00"})
+    # همان بازه: بدون هیچ کوئری از کش
+    with django_assert_num_queries(0):
+        second = api_client.get(AVAILABLE_URL, {"at": "08:14"})
+    assert second.content == first.content
+
+    # بازه دیگر: ایندکس آماده است؛ فقط آیتم‌ها و دسته‌بندی‌هایشان خوانده می‌شوند
+    with django_assert_num_queries(2):
+        api_client.get(AVAILABLE_URL, {"at": "13:00"})
+
+@pytest.mark.django_db
+def test_available_menu_rebuilt_when_windows_change(api_client, served_menu):
+    from datetime import time
+
+    assert "چای" in available_titles(api_client, "04:00")
+    served_menu["all_day"].serving_windows.create(start_time=time(16, 0), end_time=time(18, 0))
+    assert available_titles(api_client, "04:00") == set()
+    assert available_titles(api_client, "17:00") == {"چای"}
+
+    served_menu["breakfast"].serving_windows.all().delete()
+    assert available_titles(api_client, "04:00") == {"املت"}
+
+@pytest.mark.django_db
+def test_publish_schedule_flips_status(api_client, menu_items, django_capture_on_commit_callbacks):
+    from datetime import timedelta
+    from django.utils import timezone
+    from menu.api.V1.tasks import apply_menu_publish_schedule
+
+    now = timezone.now()
+    cake, tea, coffee = menu_items
+    MenuItem.objects.filter(pk=coffee.pk).update(publish_at=now - timedelta(minutes=1))
+    MenuItem.objects.filter(pk=cake.pk).update(unpublish_at=now - timedelta(minutes=1))
+    # هر دو زمان گذشته: آخری اعمال می‌شود
+    MenuItem.objects.filter(pk=tea.pk).update(unpublish_at=now - timedelta(hours=2), publish_at=now - timedelta(hours=1))
+    assert api_client.get(f"{MENU_ITEMS_URL}{cake.slug}/").status_code == status.HTTP_200_OK
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert apply_menu_publish_schedule() == (2, 1)
+
+    items = {item.pk: item for item in MenuItem.objects.all()}
+    assert [items[pk].status for pk in (cake.pk, tea.pk, coffee.pk)] == [
+        ProductStatusType.draft.value, ProductStatusType.publish.value, ProductStatusType.publish.value,
+    ]
+    assert all(item.publish_at is None and item.unpublish_at is None for item in items.values())
+    assert api_client.get(f"{MENU_ITEMS_URL}{cake.slug}/").status_code == status.HTTP_404_NOT_FOUND
+    assert {item['id'] for item in api_client.get(MENU_ITEMS_URL).json()['results']} == {tea.pk, coffee.pk}
+
+    # آیتم‌های آینده دست نمی‌خورند
+    MenuItem.objects.filter(pk=cake.pk).update(publish_at=now + timedelta(hours=1))
+    assert apply_menu_publish_schedule() == (0, 0)
+
+@pytest.mark.django_db
+def test_publish_schedule_replaces_cached_index_and_snapshots(api_client, served_menu, django_capture_on_commit_callbacks):
+    from datetime import timedelta
+    from django.utils import timezone
+    from menu.availability import get_availability_index
+    from menu.api.V1.tasks import apply_menu_publish_schedule
+
+    # همه کش‌ها پیش از اجرای تسک ساخته شده‌اند
+    index = get_availability_index()
+    assert available_titles(api_client, "08:00") == {"املت", "چای"}
+    listed = api_client.get(MENU_ITEMS_URL)
+
+    past = timezone.now() - timedelta(minutes=1)
+    MenuItem.objects.filter(pk=served_menu["draft"].pk).update(publish_at=past)
+    MenuItem.objects.filter(pk=served_menu["breakfast"].pk).update(unpublish_at=past)
+    with django_capture_on_commit_callbacks(execute=True):
+        assert apply_menu_publish_schedule() == (1, 1)
+
+    assert get_availability_index() != index
+    assert served_menu["draft"].pk in get_availability_index()[1][32]
+    assert available_titles(api_client, "08:00") == {"حلیم", "چای"}
+    relisted = api_client.get(MENU_ITEMS_URL, HTTP_IF_NONE_MATCH=listed["ETag"])
+    assert relisted.status_code == status.HTTP_200_OK
+    assert {item['title'] for item in relisted.json()['results']} == (
+        {item['title'] for item in listed.json()['results']} - {"املت"} | {"حلیم"}
+    )
@@ -8,6 +8,18 @@ app_name='api-V1-menu'
 
 urlpatterns = [
     path('menu-items/', MenuItemView.as_view(), name='menu-items'),
+    path('featured/', FeaturedMenuItemView.as_view(), name='featured'),
+    path('deals/', DealsMenuItemView.as_view(), name='deals'),
+    path('menu-items/<int:pk>/view/', MenuItemViewCountView.as_view(), name='menu-item-view'),
+    path('menu-items/<str:slug>/', MenuItemDetailView.as_view(), name='menu-item-detail'),
     path('categories/', CategoryView.as_view(), name='categories'),
+    path('stock/reserve/', StockReservationView.as_view(), name='stock-reserve'),
+    path('stock/release/', StockReleaseView.as_view(), name='stock-release'),
+    path('kitchen/load/', KitchenLoadView.as_view(), name='kitchen-load'),
+    path('kitchen/eta/', KitchenEtaView.as_view(), name='kitchen-eta'),
+    path('kitchen/tickets/', KitchenTicketView.as_view(), name='kitchen-tickets'),
+    path('kitchen/tickets/<int:pk>/complete/', KitchenTicketCompleteView.as_view(), name='kitchen-ticket-complete'),
+    path('available/', AvailableMenuView.as_view(), name='available'),
+    path('menu-by-category/', MenuByCategoryView.as_view(), name='menu-by-category'),
 ]
 
@@ -1,18 +1,315 @@
-from .serializers import MenuItemSerializer, CategorySerializer 
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import status
+from rest_framework.filters import OrderingFilter
+from rest_framework.generics import ListAPIView, RetrieveAPIView
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.views import APIView
+
+from config.renderers import FastJSONRenderer
+from menu.availability import parse_serving_time, bucket_of, bucket_bounds, available_item_ids
+from menu.cache import get_or_build_item, get_or_build_snapshot, etag_matches
+from menu.counters import record_view, pending_views
+from menu.kitchen import get_load_snapshot, estimate_eta, enqueue_order, complete_ticket, UnknownItems
 from menu.models import MenuItem, Category, ProductStatusType
-from rest_framework.generics import ListAPIView
+from menu.stock import reserve_stock, release_stock, OutOfStock
+from .serializers import (
+    MenuItemSerializer, MenuItemListSerializer, MenuItemGroupedSerializer, CategorySerializer,
+    OrderLinesSerializer, KitchenTicketSerializer,
+)
+from .mixins import SnapshotListMixin, PendingViewsMixin, SparseQuerysetMixin
+from .paginations import MenuItemCursorPagination
+from .filters import MenuSearchFilter, MenuItemFilter
+
+
+class MenuItemView(SnapshotListMixin, PendingViewsMixin, SparseQuerysetMixin, ListAPIView):
+
+    queryset = MenuItem.objects.filter(status=ProductStatusType.publish.value).prefetch_related('category')
+    serializer_class = MenuItemListSerializer
+    pagination_class = MenuItemCursorPagination
+    filter_backends = [DjangoFilterBackend, OrderingFilter, MenuSearchFilter]
+    filterset_class = MenuItemFilter
+    ordering_fields = ['created_date', 'final_price']
+    ordering = MenuItemCursorPagination.ordering
+    snapshot_name = "menu-items"
+
+
+class FeaturedMenuItemView(MenuItemView):
+    """
+    Published featured items, newest first (``menu_featured_idx``).
+    """
+
+    queryset = MenuItem.objects.filter(
+        status=ProductStatusType.publish.value, is_featured=True
+    ).prefetch_related('category')
+    snapshot_name = "featured"
 
 
+class DealsMenuItemView(MenuItemView):
+    """
+    Published discounted items, biggest discount first (``menu_deals_idx``).
+    """
 
+    queryset = MenuItem.objects.filter(
+        status=ProductStatusType.publish.value, discount_percent__gt=0
+    ).prefetch_related('category')
+    ordering_fields = ['discount_percent', 'created_date', 'final_price']
+    ordering = ('-discount_percent', '-id')
+    snapshot_name = "deals"
 
-class MenuItemView(ListAPIView):
 
-    queryset = MenuItem.objects.filter(status=ProductStatusType.publish.value) 
-    serializer_class = MenuItemSerializer 
+class MenuItemDetailView(SparseQuerysetMixin, RetrieveAPIView):
+    """
+    Full detail of one published menu item, looked up by slug.
 
+    Plain requests are served from a per-item cache entry that is dropped
+    whenever the item changes, and answered with 304 when the client's
+    ETag or ``If-Modified-Since`` (from the item's cache version) is still
+    current. ``views`` is left out of the cached bytes and filled in per
+    request from the database and the pending view buffer, so the view
+    counter never invalidates the entry; the ETag is weak for that reason.
+    """
 
-class CategoryView(ListAPIView):
+    queryset = MenuItem.objects.filter(status=ProductStatusType.publish.value).prefetch_related('category')
+    serializer_class = MenuItemSerializer
+    lookup_field = 'slug'
+
+    def retrieve(self, request, *args, **kwargs):
+        if request.query_params:
+            return super().retrieve(request, *args, **kwargs)
+
+        etag, last_modified, content = get_or_build_item(
+            kwargs['slug'],
+            f"{request.scheme}://{request.get_host()}",
+            lambda: self.build_detail(request, *args, **kwargs),
+        )
+        etag = f"W/{etag}"
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = HttpResponse(self.fill_views(kwargs['slug'], content), content_type="application/json")
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def build_detail(self, request, *args, **kwargs):
+        instance = self.get_object()
+        data = self.get_serializer(instance).data
+        # جای خالی views؛ در هر درخواست با fill_views پر می‌شود
+        data['views'] = None
+        self.loaded_views = (instance.pk, instance.views)
+        return FastJSONRenderer().render(data)
+
+    def fill_views(self, slug, content):
+        # اگر همین درخواست کش را ساخته، views را از قبل دارد
+        row = getattr(self, 'loaded_views', None) or (
+            MenuItem.objects.filter(slug=slug).values_list('pk', 'views').first()
+        )
+        views = row[1] + pending_views([row[0]]).get(row[0], 0) if row else 0
+        # کلید "views" بدون escape فقط خود فیلد است؛ متن‌ها آن را به صورت \"views\" دارند
+        return content.replace(b'"views":null', b'"views":%d' % views, 1)
+
+
+class CategoryView(SnapshotListMixin, ListAPIView):
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
-  
\ No newline at end of file
+    snapshot_name = "categories"
+
+
+class MenuByCategoryView(SnapshotListMixin, ListAPIView):
+    """
+    Categories with their published items nested, in one response.
+
+    The rows come from a single query over the ``MenuItem.category`` through
+    table joined to both sides, ordered by category, and are grouped in one
+    pass by ``CategoryGroupListSerializer``.
+    """
+
+    queryset = MenuItem.category.through.objects.filter(
+        menuitem__status=ProductStatusType.publish.value
+    ).select_related('category', 'menuitem').order_by('category_id', '-menuitem__created_date', '-menuitem_id')
+    serializer_class = MenuItemGroupedSerializer
+    pagination_class = None
+    snapshot_name = "menu-by-category"
+
+    def get_queryset(self):
+        # فقط ستون‌هایی از آیتم که سریالایزر می‌خواند
+        item_fields = self.get_serializer().get_model_field_names()
+        concrete = {field.name for field in MenuItem._meta.concrete_fields}
+        return super().get_queryset().only(
+            'category__title', 'category__slug', *(f'menuitem__{name}' for name in item_fields & concrete)
+        )
+
+
+class AvailableMenuView(SparseQuerysetMixin, ListAPIView):
+    """
+    Published items served at ``?at=HH:MM`` (default: now).
+
+    The ids come from the precomputed per-bucket availability index and the
+    rendered body is cached per bucket, so every request in the same bucket
+    is answered from the same snapshot.
+    """
+
+    queryset = MenuItem.objects.filter(status=ProductStatusType.publish.value).prefetch_related('category')
+    serializer_class = MenuItemListSerializer
+    pagination_class = None
+
+    def list(self, request, *args, **kwargs):
+        try:
+            bucket = bucket_of(parse_serving_time(request.query_params.get('at')))
+        except ValueError:
+            return Response({"detail": "پارامتر at نامعتبر است."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # پارامترهای دیگر (مثل fields) خروجی را تغییر می‌دهند و کش نمی‌شوند
+        if set(request.query_params) - {'at'}:
+            return Response(self.build_bucket(bucket))
+
+        etag, content = get_or_build_snapshot(
+            "available",
+            f"{bucket}:{request.scheme}://{request.get_host()}",
+            lambda: FastJSONRenderer().render(self.build_bucket(bucket)),
+        )
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content, content_type="application/json")
+        response["ETag"] = etag
+        return response
+
+    def build_bucket(self, bucket):
+        starts, ends = bucket_bounds(bucket)
+        queryset = self.filter_queryset(self.get_queryset()).filter(pk__in=available_item_ids(bucket))
+        return {"starts": starts, "ends": ends, "results": self.get_serializer(queryset, many=True).data}
+
+
+class MenuItemViewCountView(APIView):
+    """
+    Record one view of a menu item. The count is buffered and flushed to
+    MenuItem.views in batches, so this never touches the menu item row.
+    """
+
+    authentication_classes = []
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'menu_views'
+
+    def post(self, request, pk):
+        # شناسه‌های ساختگی نباید بافر را بی‌حد بزرگ کنند
+        if not MenuItem.objects.filter(pk=pk, status=ProductStatusType.publish.value).exists():
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        record_view(pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class StockReservationView(APIView):
+    """
+    Reserve stock for the lines of an order in one transaction.
+    Responds 409 with the failing item when any line can't be filled.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = OrderLinesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        lines = [(line['item'], line['quantity']) for line in serializer.validated_data['lines']]
+        try:
+            sold_out = reserve_stock(lines)
+        except OutOfStock as e:
+            return Response(
+                {"detail": "موجودی کافی نیست.", "item": e.item_id, "requested": e.requested},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response({"lines": serializer.validated_data['lines'], "sold_out": sold_out})
+
+
+class StockReleaseView(APIView):
+    """
+    Put back the stock of a cancelled order (staff only).
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        serializer = OrderLinesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        lines = [(line['item'], line['quantity']) for line in serializer.validated_data['lines']]
+        release_stock(lines)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def parse_order_query(value):
+    """
+    ``?items=12:2,15`` -> ``[(12, 2), (15, 1)]``
+    """
+    lines = []
+    for part in value.split(','):
+        item_id, _, quantity = part.strip().partition(':')
+        lines.append((int(item_id), int(quantity or 1)))
+    return lines
+
+
+class KitchenLoadView(APIView):
+    """
+    Outstanding preparation minutes per station. Cheap to poll: the body is
+    a cached snapshot and a matching ``If-None-Match`` gets a 304.
+    """
+
+    authentication_classes = []
+
+    def get(self, request):
+        etag, content, _ = get_load_snapshot()
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content, content_type="application/json")
+        response["ETag"] = etag
+        response["Cache-Control"] = "no-cache"
+        return response
+
+
+class KitchenEtaView(APIView):
+    """
+    ETA of an order placed now: ``?items=<id>[:<quantity>],...``
+    """
+
+    authentication_classes = []
+
+    def get(self, request):
+        try:
+            lines = parse_order_query(request.query_params.get('items', ''))
+            return Response(estimate_eta(lines))
+        except ValueError:
+            return Response({"detail": "پارامتر items نامعتبر است."}, status=status.HTTP_400_BAD_REQUEST)
+        except UnknownItems as e:
+            return Response({"detail": "آیتم پیدا نشد.", "items": e.item_ids}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class KitchenTicketView(APIView):
+    """
+    Queue the lines of an order in the kitchen (staff only).
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        serializer = OrderLinesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        lines = [(line['item'], line['quantity']) for line in serializer.validated_data['lines']]
+        try:
+            tickets = enqueue_order(lines)
+        except UnknownItems as e:
+            return Response({"detail": "آیتم پیدا نشد.", "items": e.item_ids}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(KitchenTicketSerializer(tickets, many=True).data, status=status.HTTP_201_CREATED)
+
+
+class KitchenTicketCompleteView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def post(self, request, pk):
+        if not complete_ticket(pk):
+            return Response({"detail": "سفارش در صف نیست."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,150 @@
+"""
+Time-of-day menu availability and scheduled publishing.
+
+The day is cut into buckets of ``settings.MENU_AVAILABILITY_BUCKET_MINUTES``.
+``get_availability_index`` maps every bucket to the published items served in
+it, built with one query over the items and their ``ServingWindow`` rows and
+cached under the menu snapshot version, so it is rebuilt after any change to
+items, categories or windows. A request for time T only looks up T's bucket;
+windows are never evaluated per row at request time.
+
+Windows are widened to bucket boundaries: an item served 07:10-10:50 is
+listed in every bucket from 07:00 to 11:00.
+
+``apply_publish_schedule`` flips the status of items whose ``publish_at`` or
+``unpublish_at`` has passed; it runs from celery beat.
+"""
+import math
+from collections import defaultdict
+from datetime import time as dt_time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .cache import get_snapshot_version, invalidate_menu_snapshots, invalidate_menu_items
+from .models import MenuItem, ProductStatusType
+
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def bucket_count():
+    return MINUTES_PER_DAY // settings.MENU_AVAILABILITY_BUCKET_MINUTES
+
+
+def bucket_of(value):
+    return (value.hour * 60 + value.minute) // settings.MENU_AVAILABILITY_BUCKET_MINUTES
+
+
+def bucket_bounds(bucket):
+    """
+    ``(start, end)`` of a bucket as ``HH:MM`` strings.
+    """
+    size = settings.MENU_AVAILABILITY_BUCKET_MINUTES
+    start, end = bucket * size, (bucket + 1) * size % MINUTES_PER_DAY
+    return f"{start // 60:02d}:{start % 60:02d}", f"{end // 60:02d}:{end % 60:02d}"
+
+
+def parse_serving_time(value):
+    """
+    ``HH:MM[:SS]`` or an ISO datetime (converted to local time) -> ``time``.
+    Empty means now. Raises ``ValueError`` for anything else.
+    """
+    if not value:
+        return timezone.localtime().time()
+    try:
+        return dt_time.fromisoformat(value)
+    except ValueError:
+        moment = parse_datetime(value)
+        if moment is None:
+            raise
+    if timezone.is_aware(moment):
+        moment = timezone.localtime(moment)
+    return moment.time()
+
+
+def window_buckets(start, end):
+    """
+    Buckets touched by a window; a window ending before it starts wraps
+    past midnight.
+    """
+    size = settings.MENU_AVAILABILITY_BUCKET_MINUTES
+    start_minutes = start.hour * 60 + start.minute
+    end_minutes = end.hour * 60 + end.minute
+    first, last = start_minutes // size, math.ceil(end_minutes / size)
+    if end_minutes > start_minutes:
+        return range(first, last)
+    return [*range(first, bucket_count()), *range(0, last)]
+
+
+def build_availability_index():
+    """
+    ``(all_day_ids, [ids per bucket])`` for the published menu.
+    """
+    rows = MenuItem.objects.filter(status=ProductStatusType.publish.value).values_list(
+        "pk", "serving_windows__start_time", "serving_windows__end_time"
+    ).order_by()
+
+    all_day = []
+    covered = defaultdict(set)
+    for pk, start, end in rows:
+        if start is None:
+            all_day.append(pk)
+        else:
+            covered[pk].update(window_buckets(start, end))
+
+    buckets = [[] for _ in range(bucket_count())]
+    for pk, item_buckets in covered.items():
+        for bucket in item_buckets:
+            buckets[bucket].append(pk)
+    return tuple(sorted(all_day)), [tuple(sorted(ids)) for ids in buckets]
+
+
+def get_availability_index():
+    key = f"menu:availability:{get_snapshot_version()}:{settings.MENU_AVAILABILITY_BUCKET_MINUTES}"
+    index = cache.get(key)
+    if index is None:
+        index = build_availability_index()
+        cache.set(key, index, settings.MENU_SNAPSHOT_TIMEOUT)
+    return index
+
+
+def available_item_ids(bucket):
+    all_day, buckets = get_availability_index()
+    return [*all_day, *buckets[bucket]]
+
+
+# ---------------- scheduled publishing ----------------
+
+def apply_publish_schedule(now=None):
+    """
+    Publish / unpublish items whose scheduled time has passed and clear the
+    timestamps that were applied. When both times have passed the later one
+    wins. Returns ``(published, unpublished)`` counts.
+    """
+    now = now or timezone.now()
+    due_publish = Q(publish_at__lte=now)
+    due_unpublish = Q(unpublish_at__lte=now)
+
+    with transaction.atomic():
+        slugs = list(MenuItem.objects.filter(due_publish | due_unpublish).values_list("slug", flat=True))
+        if not slugs:
+            return 0, 0
+
+        published = MenuItem.objects.filter(
+            due_publish & ~(due_unpublish & Q(unpublish_at__gte=F("publish_at")))
+        ).update(status=ProductStatusType.publish.value, updated_date=now)
+        unpublished = MenuItem.objects.filter(
+            due_unpublish & ~(due_publish & Q(publish_at__gt=F("unpublish_at")))
+        ).update(status=ProductStatusType.draft.value, updated_date=now)
+        MenuItem.objects.filter(due_publish).update(publish_at=None)
+        MenuItem.objects.filter(due_unpublish).update(unpublish_at=None)
+
+        # update() سیگنال نمی‌فرستد
+        transaction.on_commit(invalidate_menu_snapshots)
+        transaction.on_commit(lambda: invalidate_menu_items(slugs))
+    return published, unpublished
@@ -0,0 +1,98 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+SNAPSHOT_VERSION_KEY = "menu:snapshot:version"
+
+
+def get_snapshot_version():
+    """
+    Current version of the published menu.
+
+    The version is seeded from the clock so that a version key evicted from
+    the cache can never be re-created with a number an old snapshot used.
+    """
+    version = cache.get(SNAPSHOT_VERSION_KEY)
+    if version is None:
+        cache.add(SNAPSHOT_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(SNAPSHOT_VERSION_KEY)
+    return version
+
+
+def invalidate_menu_snapshots():
+    """
+    Bump the menu version so every snapshot built so far becomes unreachable.
+    """
+    try:
+        cache.incr(SNAPSHOT_VERSION_KEY)
+    except ValueError:
+        cache.add(SNAPSHOT_VERSION_KEY, time.time_ns(), None)
+
+
+def make_etag(content):
+    return '"%s"' % hashlib.sha1(content).hexdigest()
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def get_or_build_snapshot(name, variant, builder):
+    """
+    Return ``(etag, content)`` for a serialized snapshot of the menu.
+
+    ``builder`` is only called when no snapshot exists for the current menu
+    version; its bytes are then stored until the next invalidation.
+    """
+    key = f"menu:snapshot:{name}:{get_snapshot_version()}:{variant}"
+    snapshot = cache.get(key)
+    if snapshot is None:
+        content = builder()
+        snapshot = (make_etag(content), content)
+        cache.set(key, snapshot, settings.MENU_SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+# ---------------- menu item detail ----------------
+
+def _item_version_key(slug):
+    return f"menu:item:{slug}:version"
+
+
+def get_or_build_item(slug, variant, builder):
+    """
+    Return ``(etag, last_modified, content)`` for one serialized menu item.
+
+    Each item has its own version key, so invalidating one item leaves the
+    cached entries of all other items untouched. ``last_modified`` is the
+    second the version was created, so it moves with every invalidation, like
+    the ETag. ``builder`` returns the content and may raise ``Http404``.
+    """
+    version = cache.get(_item_version_key(slug))
+    if version is None:
+        cache.add(_item_version_key(slug), time.time_ns(), None)
+        version = cache.get(_item_version_key(slug))
+
+    key = f"menu:item:{slug}:{version}:{variant}"
+    entry = cache.get(key)
+    if entry is None:
+        content = builder()
+        entry = (make_etag(content), version // 10**9, content)
+        cache.set(key, entry, settings.MENU_SNAPSHOT_TIMEOUT)
+    return entry
+
+
+def invalidate_menu_items(slugs):
+    """
+    Drop the version keys of the given slugs; their cached details become
+    unreachable and are rebuilt on the next request.
+    """
+    keys = [_item_version_key(slug) for slug in set(slugs) if slug]
+    if keys:
+        cache.delete_many(keys)
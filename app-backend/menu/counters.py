@@ -0,0 +1,131 @@
+"""
+Write-behind counting for ``MenuItem.views``.
+
+Views are buffered in Redis (``settings.MENU_VIEW_COUNTER_REDIS_URL``) or,
+when Redis isn't configured, in a per-process counter. ``flush_view_counts``
+moves the buffered deltas to the database with one ``F()`` update per
+distinct delta instead of one UPDATE per request.
+"""
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+
+class LocalViewCounter:
+    """
+    In-process buffer. A celery worker can't see it, so the process flushes
+    its own buffer every ``MENU_VIEW_FLUSH_INTERVAL`` seconds.
+    """
+
+    flushes_inline = True
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def incr(self, pk, count):
+        with self._lock:
+            self._counts[pk] += count
+
+    def pending(self, ids):
+        with self._lock:
+            return {pk: self._counts[pk] for pk in ids if pk in self._counts}
+
+    def drain(self):
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        return dict(counts)
+
+
+class RedisViewCounter:
+    """
+    Shared buffer in a Redis hash; drained atomically with MULTI/EXEC.
+    """
+
+    flushes_inline = False
+    key = "menu:views:pending"
+
+    def __init__(self, url):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+
+    def incr(self, pk, count):
+        self.client.hincrby(self.key, pk, count)
+
+    def pending(self, ids):
+        ids = list(ids)
+        if not ids:
+            return {}
+        values = self.client.hmget(self.key, ids)
+        return {pk: int(value) for pk, value in zip(ids, values) if value is not None}
+
+    def drain(self):
+        pipe = self.client.pipeline()
+        pipe.hgetall(self.key)
+        pipe.delete(self.key)
+        counts, _ = pipe.execute()
+        return {int(pk): int(value) for pk, value in counts.items()}
+
+
+_counter = None
+_last_flush = time.monotonic()
+
+
+def get_counter():
+    global _counter
+    if _counter is None:
+        if settings.MENU_VIEW_COUNTER_REDIS_URL:
+            _counter = RedisViewCounter(settings.MENU_VIEW_COUNTER_REDIS_URL)
+        else:
+            _counter = LocalViewCounter()
+    return _counter
+
+
+def record_view(pk, count=1):
+    global _last_flush
+    counter = get_counter()
+    counter.incr(pk, count)
+    if counter.flushes_inline and time.monotonic() - _last_flush >= settings.MENU_VIEW_FLUSH_INTERVAL:
+        _last_flush = time.monotonic()
+        flush_view_counts()
+
+
+def pending_views(ids):
+    """
+    Views recorded but not yet written to the database, as ``{pk: count}``.
+    """
+    return get_counter().pending(ids)
+
+
+def flush_view_counts():
+    """
+    Write all buffered views to the database; returns the number of items updated.
+    """
+    from .models import MenuItem
+
+    counter = get_counter()
+    counts = counter.drain()
+    if not counts:
+        return 0
+
+    by_delta = defaultdict(list)
+    for pk, delta in counts.items():
+        by_delta[delta].append(pk)
+
+    try:
+        with transaction.atomic():
+            for delta, ids in by_delta.items():
+                MenuItem.objects.filter(pk__in=ids).update(views=F("views") + delta)
+    except Exception:
+        # شمارش‌ها نباید با خطای دیتابیس از دست بروند
+        for pk, delta in counts.items():
+            counter.incr(pk, delta)
+        raise
+
+    # کش جزئیات views را ندارد و لازم نیست پاک شود
+    return len(counts)
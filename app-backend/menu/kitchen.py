@@ -0,0 +1,189 @@
+"""
+Kitchen queue and ETA estimates.
+
+Each station (category) keeps a running total of the preparation minutes
+that are still queued in ``KitchenLoad``. Queueing an order adds to it and
+completing or deleting a ticket subtracts from it with ``F()`` updates, so the total is
+never re-summed from open tickets.
+
+The per-station totals are cached as one versioned snapshot; an ETA is the
+snapshot plus the minutes of the new order, spread over
+``settings.KITCHEN_STATION_CAPACITY`` cooks per station. Stations work in
+parallel, so the order is ready when its slowest station is.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Min, Sum
+from django.utils import timezone
+
+from config.renderers import FastJSONRenderer
+
+from .cache import make_etag
+from .models import MenuItem, KitchenLoad, KitchenTicket, TicketStatus
+from .stock import merge_lines
+
+
+LOAD_VERSION_KEY = "kitchen:load:version"
+
+
+class UnknownItems(Exception):
+    def __init__(self, item_ids):
+        self.item_ids = sorted(item_ids)
+        super().__init__(f"Unknown menu items: {self.item_ids}")
+
+
+def _bump_version():
+    try:
+        cache.incr(LOAD_VERSION_KEY)
+    except ValueError:
+        cache.add(LOAD_VERSION_KEY, time.time_ns(), None)
+
+
+def get_load_snapshot():
+    """
+    Return ``(etag, content, loads)``: the JSON of every station's queue and
+    a ``{category_id: minutes}`` map. Built once per change of the queue.
+    """
+    version = cache.get(LOAD_VERSION_KEY)
+    if version is None:
+        cache.add(LOAD_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(LOAD_VERSION_KEY)
+
+    key = f"kitchen:load:{version}"
+    snapshot = cache.get(key)
+    if snapshot is None:
+        rows = KitchenLoad.objects.select_related("category").order_by("category_id")
+        stations = [
+            {
+                "station": load.category_id,
+                "title": load.category.title if load.category else None,
+                "minutes": load.minutes,
+                "tickets": load.tickets,
+            }
+            for load in rows
+        ]
+        content = FastJSONRenderer().render(stations)
+        loads = {station["station"]: station["minutes"] for station in stations}
+        snapshot = (make_etag(content), content, loads)
+        cache.set(key, snapshot, settings.MENU_SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def _order_minutes(lines):
+    """
+    Merge the order lines and look up every item's preparation time and
+    station with one grouped query: ``(lines, {item_id: (minutes, station)})``.
+    """
+    lines = merge_lines(lines)
+    quantities = dict(lines)
+    # ایستگاه هر آیتم اولین دسته‌بندی آن است
+    rows = MenuItem.objects.filter(pk__in=quantities).annotate(station=Min("category")).values_list(
+        "pk", "preparation_time", "station"
+    )
+    items = {pk: (preparation_time, station) for pk, preparation_time, station in rows}
+    missing = set(quantities) - set(items)
+    if missing:
+        raise UnknownItems(missing)
+    return lines, items
+
+
+def estimate_eta(lines):
+    """
+    Minutes until an order of ``(item_id, quantity)`` lines would be ready
+    if it were placed now, plus the per-station breakdown.
+    """
+    lines, items = _order_minutes(lines)
+    _, _, loads = get_load_snapshot()
+
+    added = {}
+    for item_id, quantity in lines:
+        preparation_time, station = items[item_id]
+        added[station] = added.get(station, 0) + preparation_time * quantity
+
+    capacity = settings.KITCHEN_STATION_CAPACITY
+    stations = [
+        {"station": station, "eta_minutes": math.ceil((loads.get(station, 0) + minutes) / capacity)}
+        for station, minutes in sorted(added.items(), key=lambda pair: pair[0] or 0)
+    ]
+    return {"eta_minutes": max(station["eta_minutes"] for station in stations), "stations": stations}
+
+
+def enqueue_order(lines):
+    """
+    Queue the lines of an order in the kitchen and add their minutes to the
+    running totals. Returns the created tickets.
+    """
+    lines, items = _order_minutes(lines)
+
+    with transaction.atomic():
+        stations = {}
+        for station in {station for _, station in items.values()}:
+            stations[station], _ = KitchenLoad.objects.get_or_create(category_id=station)
+
+        tickets = KitchenTicket.objects.bulk_create([
+            KitchenTicket(
+                item_id=item_id,
+                station=stations[items[item_id][1]],
+                quantity=quantity,
+                minutes=items[item_id][0] * quantity,
+            )
+            for item_id, quantity in lines
+        ])
+
+        totals = {}
+        for ticket in tickets:
+            minutes, count = totals.get(ticket.station_id, (0, 0))
+            totals[ticket.station_id] = (minutes + ticket.minutes, count + 1)
+        for station_id, (minutes, count) in totals.items():
+            KitchenLoad.objects.filter(pk=station_id).update(
+                minutes=F("minutes") + minutes, tickets=F("tickets") + count, updated_date=timezone.now()
+            )
+        transaction.on_commit(_bump_version)
+    return tickets
+
+
+def complete_ticket(ticket_id):
+    """
+    Mark a queued ticket as done and take its minutes off its station.
+    Returns False if the ticket doesn't exist or was already completed.
+    """
+    with transaction.atomic():
+        # فقط یکی از درخواست‌های همزمان وضعیت را تغییر می‌دهد
+        done = KitchenTicket.objects.filter(pk=ticket_id, status=TicketStatus.queued.value).update(
+            status=TicketStatus.done.value, completed_date=timezone.now()
+        )
+        if not done:
+            return False
+        ticket = KitchenTicket.objects.only("station", "minutes").get(pk=ticket_id)
+        KitchenLoad.objects.filter(pk=ticket.station_id).update(
+            minutes=F("minutes") - ticket.minutes, tickets=F("tickets") - 1, updated_date=timezone.now()
+        )
+        transaction.on_commit(_bump_version)
+    return True
+
+
+def delete_tickets(queryset):
+    """
+    Delete tickets and take the minutes of those still queued off their
+    stations. Returns the number of deleted tickets.
+    """
+    with transaction.atomic():
+        totals = (
+            queryset.filter(status=TicketStatus.queued.value)
+            .order_by()
+            .values("station")
+            .annotate(minutes=Sum("minutes"), count=Count("pk"))
+        )
+        totals = [(row["station"], row["minutes"], row["count"]) for row in totals]
+        deleted, _ = queryset.delete()
+        for station_id, minutes, count in totals:
+            KitchenLoad.objects.filter(pk=station_id).update(
+                minutes=F("minutes") - minutes, tickets=F("tickets") - count, updated_date=timezone.now()
+            )
+        if totals:
+            transaction.on_commit(_bump_version)
+    return deleted
@@ -0,0 +1,62 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections
+from config.images import refresh_derivatives
+
+
+MODELS = {
+    'menu': 'menu.MenuItem',
+    'profile': 'accounts.Profile',
+}
+
+
+def process_image(label, pk):
+    # در هر پروسه جداگانه اجرا می‌شود و اتصال دیتابیس خودش را باز می‌کند
+    instance = apps.get_model(label).objects.filter(pk=pk).first()
+    return bool(instance) and refresh_derivatives(instance)
+
+
+class Command(BaseCommand):
+    help = 'Generate missing image derivatives for existing menu items and profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=[*MODELS, 'all'], default='all')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+
+    def handle(self, *args, **options):
+        labels = MODELS.values() if options['model'] == 'all' else [MODELS[options['model']]]
+        jobs = []
+        for label in labels:
+            model = apps.get_model(label)
+            default = model._meta.get_field('image').get_default()
+            rows = model.objects.exclude(image='').exclude(image=default).values_list('pk', 'image', 'image_variants')
+            jobs += [(label, pk) for pk, image, variants in rows.iterator() if (variants or {}).get('source') != image]
+
+        if not jobs:
+            self.stdout.write(self.style.SUCCESS("✅ All images already have derivatives."))
+            return
+
+        if options['workers'] <= 1:
+            outcomes = [self._outcome(job, lambda job=job: process_image(*job)) for job in jobs]
+        else:
+            # اتصال‌های باز نباید بین پروسه‌های fork شده مشترک بمانند
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=options['workers'], mp_context=context) as pool:
+                futures = [(job, pool.submit(process_image, *job)) for job in jobs]
+                outcomes = [self._outcome(job, future.result) for job, future in futures]
+
+        failed = outcomes.count(False)
+        self.stdout.write(self.style.SUCCESS(f"✅ {len(jobs) - failed} images processed, {failed} failed."))
+
+    def _outcome(self, job, result):
+        try:
+            result()
+            return True
+        except Exception as e:
+            self.stdout.write(self.style.WARNING(f"⚠️ {job[0]} {job[1]}: {e}"))
+            return False
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from menu.transfer import export_menu_items, FORMATS
+
+
+class Command(BaseCommand):
+    help = 'Export all menu items as CSV or JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument('--output', help='File path; defaults to stdout')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        chunks = export_menu_items(options['format'], chunk_size=options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(chunks)
+        else:
+            self.stdout.ending = ''
+            for chunk in chunks:
+                self.stdout.write(chunk)
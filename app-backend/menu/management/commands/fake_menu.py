@@ -1,21 +1,69 @@
 from django.core.management.base import BaseCommand
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.db.models import Max
+from django.utils.text import slugify
 from faker import Faker
+import multiprocessing
 import random
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from django.core.files import File
-from django.utils.text import slugify
-from menu.models import MenuItem, Category
+from menu.models import MenuItem, Category, ProductStatusType
+from menu.cache import invalidate_menu_snapshots
+from menu.search import build_document, index_documents
+from menu.transfer import insert_category_rows
 from accounts.models import CustomeUser
 
 BASE_DIR = Path(__file__).resolve().parent
+IMAGE_DIR = "menu_items/fake"
+
+
+def generate_rows(seed, chunk, first_number, count, category_titles, image_count):
+    """
+    Field values for one chunk of fake items. Each chunk has its own seed, so
+    the same ``--seed`` gives the same data with any number of workers.
+
+    Two-word titles repeat a lot; numbering the slugs up front keeps them
+    unique without the per-collision lookups of ``allocate_slugs``.
+    """
+    chunk_seed = None if seed is None else seed * 1_000_003 + chunk
+    fake = Faker('en_US')
+    fake.seed_instance(chunk_seed)
+    rng = random.Random(chunk_seed)
+
+    rows = []
+    for number in range(first_number, first_number + count):
+        title = fake.sentence(nb_words=2)
+        description = fake.text(max_nb_chars=150)
+        category_indexes = rng.sample(range(len(category_titles)), k=rng.randint(1, min(2, len(category_titles))))
+        rows.append({
+            "title": title,
+            "slug": f"{slugify(title, allow_unicode=True)[:40].rstrip('-')}-{number}",
+            "description": description,
+            "search_text": build_document(title, [category_titles[i] for i in category_indexes], description),
+            "stock": rng.randint(0, 20),
+            "price": rng.randint(50000, 200000),
+            "discount_percent": rng.choice([0, 10, 20]),
+            "views": rng.randint(0, 200),
+            "is_featured": rng.choice([True, False]),
+            "preparation_time": rng.randint(5, 45),
+            "image": rng.randrange(image_count),
+            "categories": category_indexes,
+        })
+    return rows
+
 
 class Command(BaseCommand):
     help = 'Generate fake menu items with image and categories'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=15)
+        parser.add_argument('--seed', type=int, help='Makes the generated data reproducible')
+        parser.add_argument('--workers', type=int, default=1, help='Processes generating the fake text')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
     def handle(self, *args, **options):
-        fake = Faker('en_US')
-      
-        
         default_categories = [
             {"title": "صبحانه", "slug": "breakfast"},
             {"title": "ناهار", "slug": "lunch"},
@@ -29,49 +77,72 @@ class Command(BaseCommand):
             if created:
                 self.stdout.write(self.style.SUCCESS(f"✅ دسته‌بندی اضافه شد: {cat['title']}"))
 
-
-        image_list = [f"images/menu-item-{i}.png" for i in range(1, 6)] 
-        categories = list(Category.objects.all())
+        categories = list(Category.objects.order_by("pk"))
         user = CustomeUser.objects.first()
 
-        if not categories:
-            self.stdout.write(self.style.WARNING("❌ No categories found. Please create some first."))
-            return
-
         if not user:
             self.stdout.write(self.style.WARNING("❌ No user found. Please create a superuser first."))
             return
 
-        for _ in range(15): 
-            title = fake.sentence(nb_words=2)
-            slug = slugify(title, allow_unicode=True)
-            description = fake.text(max_nb_chars=150)
-
-            selected_image = random.choice(image_list)
-            image_path = BASE_DIR / selected_image
-
-            if not image_path.exists():
-                self.stdout.write(self.style.WARNING(f"⚠️ Image not found: {selected_image}"))
-                continue
-
-            with open(image_path, "rb") as img_file:
-                image_file = File(img_file, name=Path(selected_image).name)
-
-                item = MenuItem.objects.create(
-                    user=user,
-                    title=title,
-                    slug=slug,
-                    description=description,
-                    image=image_file,
-                    stock=random.randint(0, 20),
-                    status=1,  # Published
-                    price=random.randint(50000, 200000),
-                    discount_percent=random.choice([0, 10, 20]),
-                    views=random.randint(0, 200),
-                    is_featured=random.choice([True, False]),
-                    preparation_time=random.randint(5, 45),
-                )
-
-                item.category.set(random.sample(categories, k=random.randint(1, 2)))
-
-        self.stdout.write(self.style.SUCCESS("✅ Fake menu items created successfully."))
+        images = self.store_images()
+        if not images:
+            self.stdout.write(self.style.WARNING("❌ No sample images found."))
+            return
+
+        count, size = options['count'], options['batch_size']
+        offset = (MenuItem.objects.aggregate(Max("pk"))["pk__max"] or 0) + 1
+        chunks = [(options['seed'], number, offset + start, min(size, count - start),
+                   [category.title for category in categories], len(images))
+                  for number, start in enumerate(range(0, count, size))]
+
+        created = 0
+        if options['workers'] <= 1:
+            for chunk in chunks:
+                created += self.write_rows(generate_rows(*chunk), user, categories, images)
+        else:
+            # پروسه‌ها فقط متن می‌سازند؛ نوشتن در دیتابیس در همین پروسه انجام می‌شود
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=options['workers'], mp_context=context) as pool:
+                for rows in pool.map(generate_rows, *zip(*chunks)):
+                    created += self.write_rows(rows, user, categories, images)
+
+        if created:
+            invalidate_menu_snapshots()
+        self.stdout.write(self.style.SUCCESS(f"✅ {created} fake menu items created successfully."))
+
+    def store_images(self):
+        """
+        Copy every sample image into media once; all items reference these files.
+        """
+        names = []
+        for path in sorted((BASE_DIR / "images").glob("*.png")):
+            name = f"{IMAGE_DIR}/{path.name}"
+            if not default_storage.exists(name):
+                with open(path, "rb") as img_file:
+                    name = default_storage.save(name, File(img_file))
+            names.append(name)
+        return names
+
+    def write_rows(self, rows, user, categories, images):
+        items = []
+        for row in rows:
+            category_indexes = row.pop("categories")
+            row["image"] = images[row["image"]]
+            item = MenuItem(user=user, status=ProductStatusType.publish.value, **row)
+            items.append((item, category_indexes))
+
+        # نامک‌های شماره‌دار به ندرت با نامک‌های موجود برخورد می‌کنند؛ آن‌ها دوباره ساخته می‌شوند
+        taken = set(MenuItem.objects.filter(slug__in=[item.slug for item, _ in items]).values_list("slug", flat=True))
+        for item, _ in items:
+            if item.slug in taken:
+                item.slug = ""
+
+        with transaction.atomic():
+            MenuItem.objects.bulk_create([item for item, _ in items])
+            insert_category_rows(
+                (item.pk, categories[i].pk) for item, category_indexes in items for i in category_indexes
+            )
+            index_documents({item.pk: item.search_text for item, _ in items})
+        self.stdout.write(f"… {len(items)} items")
+        return len(items)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from menu.transfer import import_menu_items, detect_format, FORMATS
+from accounts.models import CustomeUser
+
+
+class Command(BaseCommand):
+    help = 'Import menu items from a CSV or JSONL file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--user', help='Email of the user the items belong to')
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            user = CustomeUser.objects.filter(email=options['user']).first()
+            if user is None:
+                raise CommandError(f"User not found: {options['user']}")
+
+        fmt = options['format'] or detect_format(options['path'])
+        with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+            report = import_menu_items(stream, fmt, user=user, chunk_size=options['chunk_size'])
+
+        for error in report.errors:
+            self.stdout.write(self.style.WARNING(f"⚠️ row {error['row']}: {error['errors']}"))
+        self.stdout.write(self.style.SUCCESS(f"✅ {report.created} items imported, {report.failed} rows failed."))
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-18 17:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='menuitem',
+            index=models.Index(fields=['status', '-created_date', '-id'], name='menu_pub_created_idx'),
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 5.1.7 on 2026-10-18 17:16
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+# کپی ثابت از menu.search در زمان این مایگریشن؛ تغییرات بعدی آن ماژول نباید این را عوض کند
+FTS_TABLE = "menu_search"
+
+CHARACTER_MAP = str.maketrans({
+    "ي": "ی",
+    "ى": "ی",
+    "ئ": "ی",
+    "ك": "ک",
+    "ة": "ه",
+    "ۀ": "ه",
+    "ؤ": "و",
+    "أ": "ا",
+    "إ": "ا",
+    "ٱ": "ا",
+    "آ": "ا",
+    "\u200c": " ",  # ZWNJ
+    "\u200d": "",  # ZWJ
+    "\u0640": "",  # کشیده
+    **{persian: str(digit) for digit, persian in enumerate("۰۱۲۳۴۵۶۷۸۹")},
+    **{arabic: str(digit) for digit, arabic in enumerate("٠١٢٣٤٥٦٧٨٩")},
+})
+DIACRITICS = re.compile("[\u064b-\u065f\u0670\u06d6-\u06ed]")
+
+
+def normalize_text(text):
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text)
+    text = DIACRITICS.sub("", text).translate(CHARACTER_MAP).lower()
+    return " ".join(text.split())
+
+
+def build_document(title, category_titles, description):
+    return normalize_text(" ".join([title, *category_titles, description]))
+
+
+def create_search_index(apps, schema_editor):
+    Category = apps.get_model('menu', 'Category')
+    MenuItem = apps.get_model('menu', 'MenuItem')
+
+    categories = list(Category.objects.all())
+    for category in categories:
+        category.search_text = normalize_text(category.title)
+    Category.objects.bulk_update(categories, ['search_text'])
+
+    titles = {}
+    for item_id, title in MenuItem.category.through.objects.values_list('menuitem_id', 'category__title'):
+        titles.setdefault(item_id, []).append(title)
+    items = list(MenuItem.objects.only('pk', 'title', 'description'))
+    for item in items:
+        item.search_text = build_document(item.title, titles.get(item.pk, []), item.description)
+    MenuItem.objects.bulk_update(items, ['search_text'], batch_size=500)
+
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(document, tokenize="unicode61 remove_diacritics 2")'
+    )
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, document) VALUES (%s, %s)',
+            [(item.pk, item.search_text) for item in items],
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0002_menuitem_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='search_text',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255, verbose_name='متن جستجو'),
+        ),
+        migrations.AddField(
+            model_name='menuitem',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='متن جستجو'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0003_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menuitem',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='نسخه\u200cهای تصویر'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.7 on 2026-10-18 17:51
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0004_menuitem_image_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menuitem',
+            name='final_price',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Cast('price', models.BigIntegerField()), '*', django.db.models.expressions.CombinedExpression(models.Value(100), '-', models.F('discount_percent'))), '+', models.Value(50)), '/', models.Value(100)), output_field=models.BigIntegerField(), verbose_name='قیمت نهایی'),
+        ),
+        migrations.AddIndex(
+            model_name='menuitem',
+            index=models.Index(fields=['status', 'final_price'], name='menu_pub_price_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.7 on 2026-10-18 18:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0005_final_price'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KitchenLoad',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('minutes', models.PositiveIntegerField(default=0, verbose_name='دقیقه\u200cهای در صف')),
+                ('tickets', models.PositiveIntegerField(default=0, verbose_name='سفارش\u200cهای در صف')),
+                ('updated_date', models.DateTimeField(auto_now=True, verbose_name='تاریخ بروزرسانی')),
+                ('category', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='kitchen_load', to='menu.category', verbose_name='ایستگاه')),
+            ],
+            options={
+                'verbose_name': 'بار آشپزخانه',
+                'verbose_name_plural': 'بار آشپزخانه',
+            },
+        ),
+        migrations.CreateModel(
+            name='KitchenTicket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(default=1, verbose_name='تعداد')),
+                ('minutes', models.PositiveIntegerField(verbose_name='زمان آماده\u200cسازی (دقیقه)')),
+                ('status', models.IntegerField(choices=[(1, 'در صف'), (2, 'آماده')], default=1, verbose_name='وضعیت')),
+                ('created_date', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('completed_date', models.DateTimeField(blank=True, null=True, verbose_name='تاریخ آماده شدن')),
+                ('item', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='kitchen_tickets', to='menu.menuitem', verbose_name='آیتم منو')),
+                ('station', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kitchen_tickets', to='menu.kitchenload', verbose_name='ایستگاه')),
+            ],
+            options={
+                'verbose_name': 'سفارش آشپزخانه',
+                'verbose_name_plural': 'سفارش\u200cهای آشپزخانه',
+                'ordering': ['created_date'],
+                'indexes': [models.Index(fields=['status', 'created_date'], name='kitchen_ticket_queue_idx')],
+            },
+        ),
+    ]
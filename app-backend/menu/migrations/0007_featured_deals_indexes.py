@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-18 18:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0006_kitchen_queue'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='menuitem',
+            index=models.Index(condition=models.Q(('is_featured', True)), fields=['status', '-created_date', '-id'], name='menu_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='menuitem',
+            index=models.Index(condition=models.Q(('discount_percent__gt', 0)), fields=['status', '-discount_percent', '-id'], name='menu_deals_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.7 on 2026-10-18 18:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0007_featured_deals_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServingWindow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(blank=True, max_length=50, verbose_name='عنوان')),
+                ('start_time', models.TimeField(verbose_name='شروع')),
+                ('end_time', models.TimeField(verbose_name='پایان')),
+            ],
+            options={
+                'verbose_name': 'زمان سرو',
+                'verbose_name_plural': 'زمان\u200cهای سرو',
+                'ordering': ['start_time'],
+            },
+        ),
+        migrations.AddField(
+            model_name='menuitem',
+            name='publish_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='زمان انتشار'),
+        ),
+        migrations.AddField(
+            model_name='menuitem',
+            name='unpublish_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='زمان عدم نمایش'),
+        ),
+        migrations.AddIndex(
+            model_name='menuitem',
+            index=models.Index(condition=models.Q(('publish_at__isnull', False)), fields=['publish_at'], name='menu_publish_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='menuitem',
+            index=models.Index(condition=models.Q(('unpublish_at__isnull', False)), fields=['unpublish_at'], name='menu_unpublish_at_idx'),
+        ),
+        migrations.AddField(
+            model_name='servingwindow',
+            name='item',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='serving_windows', to='menu.menuitem', verbose_name='آیتم منو'),
+        ),
+    ]
@@ -1,19 +1,143 @@
 from django.db import models
-from django.utils.text import slugify
-from decimal import Decimal
+from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db.models.functions import Cast
+from .cache import invalidate_menu_items
+from .search import normalize_text
+from .slugs import allocate_slugs
 
 
-class Category(models.Model):
+def compute_final_price(price, discount_percent):
+    """
+    Discounted price in whole units, rounded half up with integer arithmetic.
+    Mirrors ``FINAL_PRICE_EXPRESSION`` so Python and SQL always agree.
+    """
+    return (int(price) * (100 - discount_percent) + 50) // 100
+
+
+# تقسیم صحیح روی bigint؛ نتیجه با compute_final_price یکسان است
+FINAL_PRICE_EXPRESSION = (
+    Cast("price", models.BigIntegerField()) * (100 - models.F("discount_percent")) + 50
+) / 100
+
+
+class SlugQuerySet(models.QuerySet):
+    """
+    Bulk operations that keep slugs unique without a query per row.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        allocate_slugs(self.model, [obj for obj in objs if not obj.slug])
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def load_saved_titles(self, objs):
+        """
+        Fetch the stored title and slug, in one query, of the instances that
+        were loaded with ``title`` deferred but have since been given one.
+        """
+        unknown = {
+            obj.pk: obj for obj in objs
+            if obj.pk and "title" in obj.__dict__ and getattr(obj, "_loaded_title", None) is None
+        }
+        if unknown:
+            rows = self.model._base_manager.using(self.db).filter(pk__in=unknown).values_list("pk", "title", "slug")
+            for pk, title, slug in rows:
+                unknown[pk].remember_saved_title(title, slug)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        if "title" in fields:
+            self.load_saved_titles(objs)
+            changed = [obj for obj in objs if obj.title_changed()]
+            if changed:
+                allocate_slugs(self.model, changed)
+                fields = [*fields, "slug"] if "slug" not in fields else fields
+        result = super().bulk_update(objs, fields, *args, **kwargs)
+        for obj in objs:
+            obj.mark_title_saved()
+        return result
+
+
+class MenuItemQuerySet(SlugQuerySet):
+    """
+    ``final_price`` is computed by the database; bulk writes mirror it onto
+    the instances so they match what a fresh query would return. Bulk
+    updates also drop the cached details of the touched items.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        for obj in objs:
+            obj.sync_final_price()
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        if "title" in fields:
+            self.load_saved_titles(objs)
+        # نامک قبلی هم باید از کش جزئیات پاک شود
+        slugs = [obj._loaded_slug for obj in objs if getattr(obj, "_loaded_slug", None)]
+        result = super().bulk_update(objs, fields, *args, **kwargs)
+        for obj in objs:
+            obj.sync_final_price()
+        invalidate_menu_items(slugs + [obj.slug for obj in objs])
+        return result
+
+
+class TitleSlugMixin:
+    """
+    Track the title and slug loaded from the database so a save can tell
+    whether the slug needs regenerating without fetching the row again.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.mark_title_saved()
+        return instance
+
+    def mark_title_saved(self):
+        # اگر title در کوئری defer شده باشد مقدار قبلی را نمی‌دانیم
+        self._loaded_title = self.__dict__.get("title")
+        self._loaded_slug = self.__dict__.get("slug")
+
+    def remember_saved_title(self, title, slug):
+        self._loaded_title = title
+        if not getattr(self, "_loaded_slug", None):
+            self._loaded_slug = slug
+
+    def title_changed(self):
+        if "title" not in self.__dict__:
+            # defer شده و دست نخورده؛ همان مقدار دیتابیس است
+            return False
+        loaded = getattr(self, "_loaded_title", None)
+        if loaded is None and self.pk:
+            row = type(self)._base_manager.filter(pk=self.pk).values_list("title", "slug").first()
+            if row:
+                self.remember_saved_title(*row)
+                loaded = self._loaded_title
+        return loaded is None or loaded != self.title
+
+    def save(self, *args, **kwargs):
+        if not self.slug or (self.pk and self.title_changed()):
+            allocate_slugs(type(self), [self])
+        super().save(*args, **kwargs)
+        self.mark_title_saved()
+
+
+class Category(TitleSlugMixin, models.Model):
     title = models.CharField(max_length=255, verbose_name="عنوان دسته‌بندی")
     slug = models.SlugField(allow_unicode=True, unique=True, verbose_name="نامک")
+    search_text = models.CharField(max_length=255, blank=True, default="", editable=False, verbose_name="متن جستجو")
+
+    objects = SlugQuerySet.as_manager()
 
     def __str__(self):
         return self.title
     
     def save(self, *args, **kwargs):
-        if not self.slug or (self.pk and Category.objects.get(pk=self.pk).title != self.title):
-            self.slug = slugify(self.title, allow_unicode=True)
+        self.search_text = normalize_text(self.title)
         super().save(*args, **kwargs)
 
     class Meta:
@@ -26,13 +150,15 @@ class ProductStatusType(models.IntegerChoices):
     draft = 2, "عدم نمایش"
 
 
-class MenuItem(models.Model):
+class MenuItem(TitleSlugMixin, models.Model):
     user = models.ForeignKey('accounts.CustomeUser', on_delete=models.CASCADE, related_name='menu_items', null=True, blank=True, verbose_name="کاربر")
     category = models.ManyToManyField(Category, verbose_name="دسته‌بندی‌ها", related_name="categories")
     title = models.CharField(max_length=255, verbose_name="نام آیتم")
     slug = models.SlugField(allow_unicode=True, unique=True, verbose_name="نامک")
     description = models.TextField(verbose_name="توضیحات")
+    search_text = models.TextField(blank=True, default="", editable=False, verbose_name="متن جستجو")
     image = models.ImageField(upload_to='menu_items', verbose_name="تصویر اصلی")
+    image_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name="نسخه‌های تصویر")
 
     stock = models.PositiveIntegerField(default=0, verbose_name="موجودی")
     status = models.IntegerField(choices=ProductStatusType.choices, default=ProductStatusType.publish.value, verbose_name="وضعیت")
@@ -40,30 +166,65 @@ class MenuItem(models.Model):
     discount_percent = models.IntegerField(default=0, validators=[MinValueValidator(0), MaxValueValidator(100)], verbose_name="درصد تخفیف")
     views = models.PositiveIntegerField(default=0, verbose_name="تعداد بازدید")
 
+    final_price = models.GeneratedField(
+        expression=FINAL_PRICE_EXPRESSION,
+        output_field=models.BigIntegerField(),
+        db_persist=True,
+        verbose_name="قیمت نهایی",
+    )
+
     is_featured = models.BooleanField(default=False, verbose_name="آیتم ویژه")
     preparation_time = models.PositiveIntegerField(default=15, verbose_name="مدت زمان آماده‌سازی (دقیقه)")  # اینجا اضافه شد
 
+    # وضعیت در این زمان‌ها توسط تسک زمان‌بندی‌شده عوض می‌شود
+    publish_at = models.DateTimeField(null=True, blank=True, verbose_name="زمان انتشار")
+    unpublish_at = models.DateTimeField(null=True, blank=True, verbose_name="زمان عدم نمایش")
+
     created_date = models.DateTimeField(auto_now_add=True, verbose_name="تاریخ ایجاد")
     updated_date = models.DateTimeField(auto_now=True, verbose_name="تاریخ بروزرسانی")
 
+    objects = MenuItemQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_date"]
         verbose_name = "آیتم منو"
         verbose_name_plural = "آیتم‌های منو"
+        indexes = [
+            # صفحه‌بندی کلیدی روی (created_date, id) برای آیتم‌های منتشرشده
+            models.Index(fields=["status", "-created_date", "-id"], name="menu_pub_created_idx"),
+            # فیلتر و مرتب‌سازی بر اساس قیمتی که مشتری می‌پردازد
+            models.Index(fields=["status", "final_price"], name="menu_pub_price_idx"),
+            # ایندکس‌های جزئی فقط ردیف‌های ویژه / تخفیف‌دار را نگه می‌دارند؛ با status در ابتدای
+            # ایندکس، هم فیلتر انتشار و هم مرتب‌سازی مستقیم از ایندکس خوانده می‌شود
+            models.Index(
+                fields=["status", "-created_date", "-id"],
+                condition=models.Q(is_featured=True),
+                name="menu_featured_idx",
+            ),
+            models.Index(
+                fields=["status", "-discount_percent", "-id"],
+                condition=models.Q(discount_percent__gt=0),
+                name="menu_deals_idx",
+            ),
+            # تسک زمان‌بندی هر دقیقه فقط ردیف‌های زمان‌دار را می‌خواند
+            models.Index(fields=["publish_at"], condition=models.Q(publish_at__isnull=False), name="menu_publish_at_idx"),
+            models.Index(fields=["unpublish_at"], condition=models.Q(unpublish_at__isnull=False), name="menu_unpublish_at_idx"),
+        ]
 
     def __str__(self):
         return self.title
-    
+
 
     def save(self, *args, **kwargs):
-        if not self.slug or (self.pk and MenuItem.objects.get(pk=self.pk).title != self.title):
-            self.slug = slugify(self.title, allow_unicode=True)
         super().save(*args, **kwargs)
+        self.sync_final_price()
 
+    def sync_final_price(self):
+        if "price" in self.__dict__ and "discount_percent" in self.__dict__:
+            self.final_price = compute_final_price(self.price, self.discount_percent)
 
     def get_price(self):
-        discount_amount = self.price * Decimal(self.discount_percent / 100)
-        return round(self.price - discount_amount)
+        return self.final_price
 
     def is_discounted(self):
         return self.discount_percent != 0
@@ -76,3 +237,74 @@ class MenuItem(models.Model):
         return self.stock == 0
 
 
+
+
+class ServingWindow(models.Model):
+    """
+    Time of day an item is served, e.g. breakfast 07:00-11:00. A window
+    whose end is before its start runs past midnight. Items without any
+    window are served all day.
+    """
+
+    item = models.ForeignKey(MenuItem, on_delete=models.CASCADE, related_name="serving_windows", verbose_name="آیتم منو")
+    title = models.CharField(max_length=50, blank=True, verbose_name="عنوان")
+    start_time = models.TimeField(verbose_name="شروع")
+    end_time = models.TimeField(verbose_name="پایان")
+
+    class Meta:
+        ordering = ["start_time"]
+        verbose_name = "زمان سرو"
+        verbose_name_plural = "زمان‌های سرو"
+
+    def __str__(self):
+        return f"{self.item}: {self.start_time:%H:%M}-{self.end_time:%H:%M}"
+
+    def clean(self):
+        if self.start_time == self.end_time:
+            raise ValidationError("زمان شروع و پایان نمی‌توانند یکسان باشند.")
+
+
+class KitchenLoad(models.Model):
+    """
+    Running total of the preparation minutes still waiting at one kitchen
+    station. A station is a category; items without a category share the
+    station whose category is empty.
+    """
+
+    category = models.OneToOneField(Category, on_delete=models.CASCADE, null=True, blank=True, related_name="kitchen_load", verbose_name="ایستگاه")
+    minutes = models.PositiveIntegerField(default=0, verbose_name="دقیقه‌های در صف")
+    tickets = models.PositiveIntegerField(default=0, verbose_name="سفارش‌های در صف")
+    updated_date = models.DateTimeField(auto_now=True, verbose_name="تاریخ بروزرسانی")
+
+    class Meta:
+        verbose_name = "بار آشپزخانه"
+        verbose_name_plural = "بار آشپزخانه"
+
+    def __str__(self):
+        return f"{self.category or 'عمومی'}: {self.minutes}"
+
+
+class TicketStatus(models.IntegerChoices):
+    queued = 1, "در صف"
+    done = 2, "آماده"
+
+
+class KitchenTicket(models.Model):
+    item = models.ForeignKey(MenuItem, on_delete=models.SET_NULL, null=True, related_name="kitchen_tickets", verbose_name="آیتم منو")
+    station = models.ForeignKey(KitchenLoad, on_delete=models.CASCADE, related_name="kitchen_tickets", verbose_name="ایستگاه")
+    quantity = models.PositiveIntegerField(default=1, verbose_name="تعداد")
+    minutes = models.PositiveIntegerField(verbose_name="زمان آماده‌سازی (دقیقه)")
+    status = models.IntegerField(choices=TicketStatus.choices, default=TicketStatus.queued.value, verbose_name="وضعیت")
+    created_date = models.DateTimeField(auto_now_add=True, verbose_name="تاریخ ایجاد")
+    completed_date = models.DateTimeField(null=True, blank=True, verbose_name="تاریخ آماده شدن")
+
+    class Meta:
+        ordering = ["created_date"]
+        verbose_name = "سفارش آشپزخانه"
+        verbose_name_plural = "سفارش‌های آشپزخانه"
+        indexes = [
+            models.Index(fields=["status", "created_date"], name="kitchen_ticket_queue_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.item} x{self.quantity}"
@@ -0,0 +1,230 @@
+"""
+Full-text search over menu items.
+
+Every item keeps a normalized shadow document (``MenuItem.search_text``)
+built from its title, category titles and description. A search backend
+indexes those documents and answers ranked queries:
+
+- ``SQLiteFTSBackend`` keeps an FTS5 table (``menu_search``) keyed by item id
+  and ranks with bm25.
+- ``ContainsSearchBackend`` works on any database by matching the shadow
+  column directly.
+
+``settings.MENU_SEARCH_BACKEND`` may point to another backend class; by
+default FTS5 is used on SQLite and the contains backend everywhere else.
+"""
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, When, Value, IntegerField
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+
+SEARCH_RANK = "search_rank"
+FTS_TABLE = "menu_search"
+
+# حروف عربی و گونه‌های نوشتاری به شکل فارسی استاندارد برگردانده می‌شوند
+CHARACTER_MAP = str.maketrans({
+    "ي": "ی",
+    "ى": "ی",
+    "ئ": "ی",
+    "ك": "ک",
+    "ة": "ه",
+    "ۀ": "ه",
+    "ؤ": "و",
+    "أ": "ا",
+    "إ": "ا",
+    "ٱ": "ا",
+    "آ": "ا",
+    "\u200c": " ",  # ZWNJ
+    "\u200d": "",  # ZWJ
+    "\u0640": "",  # کشیده
+    **{persian: str(digit) for digit, persian in enumerate("۰۱۲۳۴۵۶۷۸۹")},
+    **{arabic: str(digit) for digit, arabic in enumerate("٠١٢٣٤٥٦٧٨٩")},
+})
+DIACRITICS = re.compile("[\u064b-\u065f\u0670\u06d6-\u06ed]")
+
+
+def normalize_text(text):
+    """
+    Fold Arabic/Persian letter variants, ZWNJ, diacritics and digits so that
+    the same word always produces the same tokens.
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text)
+    text = DIACRITICS.sub("", text).translate(CHARACTER_MAP).lower()
+    return " ".join(text.split())
+
+
+def build_document(title, category_titles, description):
+    return normalize_text(" ".join([title, *category_titles, description]))
+
+
+class ContainsSearchBackend:
+    """
+    Portable backend: every query term must appear in the shadow document.
+    Items whose document starts with the first term (a title match) rank first.
+    """
+
+    def index(self, documents):
+        pass
+
+    def remove(self, ids):
+        pass
+
+    def search(self, queryset, query):
+        terms = normalize_text(query).split()
+        if not terms:
+            return queryset.none()
+        for term in terms:
+            queryset = queryset.filter(search_text__contains=term)
+        return queryset.annotate(**{
+            SEARCH_RANK: Case(
+                When(search_text__startswith=terms[0], then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField(),
+            )
+        }).order_by(SEARCH_RANK, "-created_date", "-id")
+
+
+class SQLiteFTSBackend:
+    """
+    FTS5 index with one row per item (``rowid`` is the item id).
+    Results are ranked by bm25 and capped at ``settings.MENU_SEARCH_LIMIT``.
+    """
+
+    def index(self, documents):
+        if not documents:
+            return
+        with connection.cursor() as cursor:
+            self._delete(cursor, list(documents))
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, document) VALUES (%s, %s)",
+                list(documents.items()),
+            )
+
+    def remove(self, ids):
+        if not ids:
+            return
+        with connection.cursor() as cursor:
+            self._delete(cursor, list(ids))
+
+    def _delete(self, cursor, ids):
+        # SQLite محدودیت تعداد پارامتر دارد
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", chunk)
+
+    def match_expression(self, query):
+        terms = normalize_text(query).split()
+        # هر کلمه به صورت پیشوندی جستجو می‌شود
+        return " ".join('"%s"*' % term.replace('"', '""') for term in terms)
+
+    def ranked_ids(self, query, queryset=None):
+        """
+        Best-ranked ids, at most ``MENU_SEARCH_LIMIT``. The filters of
+        ``queryset`` (e.g. published only) are checked per match before the
+        limit, so drafts can't push visible items out of the cap.
+        """
+        expression = self.match_expression(query)
+        if not expression:
+            return []
+        sql, params = f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [expression]
+        if queryset is not None:
+            matching = queryset.order_by().filter(pk=RawSQL(f"{FTS_TABLE}.rowid", [])).values("pk")
+            inner, inner_params = matching.query.sql_with_params()
+            sql += f" AND EXISTS ({inner})"
+            params += inner_params
+        with connection.cursor() as cursor:
+            cursor.execute(f"{sql} ORDER BY rank LIMIT %s", [*params, settings.MENU_SEARCH_LIMIT])
+            return [row[0] for row in cursor.fetchall()]
+
+    def search(self, queryset, query):
+        ids = self.ranked_ids(query, queryset)
+        if not ids:
+            return queryset.none()
+        # جایگاه شناسه در رشته مرتب‌شده همان رتبه است؛ یک پارامتر به جای صدها CASE
+        positions = "," + ",".join(map(str, ids)) + ","
+        column = '"%s"."%s"' % (queryset.model._meta.db_table, queryset.model._meta.pk.column)
+        return queryset.filter(pk__in=ids).annotate(**{
+            SEARCH_RANK: RawSQL(f"instr(%s, ',' || {column} || ',')", [positions], output_field=IntegerField())
+        }).order_by(SEARCH_RANK)
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        if settings.MENU_SEARCH_BACKEND:
+            backend_class = import_string(settings.MENU_SEARCH_BACKEND)
+        elif connection.vendor == "sqlite":
+            backend_class = SQLiteFTSBackend
+        else:
+            backend_class = ContainsSearchBackend
+        _backend = backend_class()
+    return _backend
+
+
+def search_menu_items(queryset, query):
+    return get_backend().search(queryset, query)
+
+
+def is_ranked(queryset):
+    return bool(queryset.query.order_by) and queryset.query.order_by[0] == SEARCH_RANK
+
+
+def build_documents(ids):
+    """
+    Shadow documents for the given items in two queries, whatever their count.
+    """
+    from .models import MenuItem
+
+    category_titles = {}
+    rows = MenuItem.category.through.objects.filter(menuitem_id__in=ids).values_list(
+        "menuitem_id", "category__title"
+    )
+    for item_id, title in rows:
+        category_titles.setdefault(item_id, []).append(title)
+
+    return {
+        pk: build_document(title, category_titles.get(pk, []), description)
+        for pk, title, description in MenuItem.objects.filter(pk__in=ids).values_list(
+            "pk", "title", "description"
+        )
+    }
+
+
+def index_items(ids, batch_size=1000):
+    """
+    Rebuild shadow documents and the search index for the given item ids.
+    """
+    from .models import MenuItem
+
+    ids = list(ids)
+    backend = get_backend()
+    for start in range(0, len(ids), batch_size):
+        documents = build_documents(ids[start:start + batch_size])
+        MenuItem.objects.bulk_update(
+            [MenuItem(pk=pk, search_text=document) for pk, document in documents.items()],
+            ["search_text"],
+        )
+        backend.index(documents)
+
+
+def index_documents(documents):
+    """
+    Index ``{pk: search_text}`` for items whose shadow column is already set,
+    e.g. rows written with ``bulk_create``.
+    """
+    get_backend().index(documents)
+
+
+def remove_items(ids):
+    get_backend().remove(list(ids))
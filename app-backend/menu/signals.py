@@ -0,0 +1,104 @@
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from .models import MenuItem, Category, ServingWindow
+from .cache import invalidate_menu_snapshots, invalidate_menu_items
+from .search import index_items, remove_items
+from .stock import sold_out
+from .api.V1.tasks import generate_menu_item_image_variants
+from config.images import schedule_derivatives, derivatives_ready
+
+
+@receiver([post_save, post_delete], sender=MenuItem)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=ServingWindow)
+def invalidate_menu_on_change(sender, **kwargs):
+    invalidate_menu_snapshots()
+
+
+@receiver(sold_out, sender=MenuItem)
+def invalidate_menu_on_sold_out(sender, **kwargs):
+    invalidate_menu_snapshots()
+
+
+@receiver(derivatives_ready, sender=MenuItem)
+def invalidate_menu_on_derivatives(sender, instance, **kwargs):
+    # srcset در اسنپ‌شات‌ها و جزئیات آیتم تغییر کرده است
+    invalidate_menu_snapshots()
+    invalidate_menu_items([instance.slug])
+
+
+@receiver(m2m_changed, sender=MenuItem.category.through)
+def invalidate_menu_on_category_change(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_menu_snapshots()
+
+
+# ---------------- item details ----------------
+
+def invalidate_item_ids(ids):
+    ids = list(ids)
+    if ids:
+        invalidate_menu_items(MenuItem.objects.filter(pk__in=ids).values_list("slug", flat=True))
+
+
+@receiver([post_save, post_delete], sender=MenuItem)
+def invalidate_menu_item_detail(sender, instance, **kwargs):
+    # اگر نامک عوض شده باشد نسخه قدیمی هم پاک می‌شود
+    invalidate_menu_items([instance.slug, getattr(instance, "_loaded_slug", None)])
+
+
+# ---------------- search index ----------------
+
+@receiver(post_save, sender=MenuItem)
+def index_menu_item(sender, instance, **kwargs):
+    index_items([instance.pk])
+
+
+@receiver(post_delete, sender=MenuItem)
+def unindex_menu_item(sender, instance, **kwargs):
+    remove_items([instance.pk])
+
+
+@receiver(m2m_changed, sender=MenuItem.category.through)
+def reindex_on_category_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            index_items([instance.pk])
+            invalidate_menu_items([instance.slug])
+        return
+
+    # تغییر از سمت دسته‌بندی: pk_set شامل آیتم‌های منو است
+    if action == "pre_clear":
+        instance._search_item_ids = list(instance.categories.values_list("pk", flat=True))
+    elif action == "post_clear":
+        index_items(getattr(instance, "_search_item_ids", []))
+        invalidate_item_ids(getattr(instance, "_search_item_ids", []))
+    elif action in ("post_add", "post_remove"):
+        index_items(pk_set)
+        invalidate_item_ids(pk_set)
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_items(sender, instance, created, **kwargs):
+    if not created and instance.title_changed():
+        ids = list(instance.categories.values_list("pk", flat=True))
+        index_items(ids)
+        invalidate_item_ids(ids)
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_items(sender, instance, **kwargs):
+    instance._search_item_ids = list(instance.categories.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Category)
+def reindex_after_category_delete(sender, instance, **kwargs):
+    index_items(getattr(instance, "_search_item_ids", []))
+    invalidate_item_ids(getattr(instance, "_search_item_ids", []))
+
+
+# ---------------- image derivatives ----------------
+
+@receiver(post_save, sender=MenuItem)
+def queue_menu_item_image_variants(sender, instance, **kwargs):
+    schedule_derivatives(instance, generate_menu_item_image_variants)
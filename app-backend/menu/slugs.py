@@ -0,0 +1,61 @@
+from collections import Counter
+
+from django.db.models import Q
+from django.utils.text import slugify
+
+
+# بیشتر از این تعداد شرط OR در یک کوئری از عمق مجاز SQLite بیشتر می‌شود
+PREFIX_CHUNK = 300
+
+
+def base_slug(instance):
+    slug = slugify(instance.title, allow_unicode=True)
+    return slug or instance._meta.model_name
+
+
+def _fit(base, suffix, max_length):
+    return base[:max_length - len(suffix)].rstrip("-") + suffix
+
+
+def _variant_prefix(base, max_length):
+    # نامک‌های بلند هنگام افزودن پسوند کوتاه می‌شوند؛ پیشوند باید همه آن‌ها را بگیرد
+    if len(base) + 6 <= max_length:
+        return base + "-"
+    return base[:max_length - 6]
+
+
+def allocate_slugs(model, instances):
+    """
+    Give each instance a unique slug derived from its title.
+
+    Exact matches for the whole batch are found in a single query; only the
+    titles that collide (with the database or within the batch) cost one
+    more query to collect their ``-N`` variants.
+    Instances in the same batch never receive the same slug.
+    """
+    if not instances:
+        return
+
+    max_length = model._meta.get_field("slug").max_length
+    bases = {id(instance): base_slug(instance)[:max_length] for instance in instances}
+    own_pks = [instance.pk for instance in instances if instance.pk is not None]
+
+    existing = model._default_manager.exclude(pk__in=own_pks)
+    taken = set(existing.filter(slug__in=set(bases.values())).values_list("slug", flat=True))
+
+    repeated = {base for base, count in Counter(bases.values()).items() if count > 1}
+    colliding = sorted(taken | repeated)
+    for start in range(0, len(colliding), PREFIX_CHUNK):
+        prefixes = Q()
+        for base in colliding[start:start + PREFIX_CHUNK]:
+            prefixes |= Q(slug__startswith=_variant_prefix(base, max_length))
+        taken.update(existing.filter(prefixes).values_list("slug", flat=True))
+
+    for instance in instances:
+        base = bases[id(instance)]
+        slug, number = base, 1
+        while slug in taken:
+            number += 1
+            slug = _fit(base, f"-{number}", max_length)
+        taken.add(slug)
+        instance.slug = slug
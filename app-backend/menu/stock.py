@@ -0,0 +1,86 @@
+"""
+Atomic stock reservation for menu items.
+
+Every order line is a conditional update::
+
+    UPDATE menu_menuitem SET stock = stock - n WHERE id = ... AND stock >= n
+
+so the check and the decrement happen in one statement and concurrent
+orders can never oversell. All lines of an order run in one transaction,
+in id order so two orders touching the same items always lock them in the
+same sequence. If any line cannot be filled the whole order is rolled back.
+
+Items whose stock reaches zero are announced with the ``sold_out`` signal
+once the transaction has committed.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+from django.dispatch import Signal
+
+from .cache import invalidate_menu_items
+from .models import MenuItem, ProductStatusType
+
+
+# sender=MenuItem, item_ids=[...]
+sold_out = Signal()
+
+
+class OutOfStock(Exception):
+    def __init__(self, item_id, requested):
+        self.item_id = item_id
+        self.requested = requested
+        super().__init__(f"Not enough stock for menu item {item_id} (requested {requested}).")
+
+
+def merge_lines(lines):
+    """
+    Sum ``(item_id, quantity)`` pairs per item and return them in id order.
+    """
+    totals = Counter()
+    for item_id, quantity in lines:
+        if quantity < 1:
+            raise ValueError("Quantity must be at least 1.")
+        totals[item_id] += quantity
+    return sorted(totals.items())
+
+
+def reserve_stock(lines):
+    """
+    Take stock for every ``(item_id, quantity)`` line or for none of them.
+
+    Returns the ids of the items that sold out with this order. Raises
+    ``OutOfStock`` for the first line that cannot be filled; unpublished
+    items count as out of stock.
+    """
+    lines = merge_lines(lines)
+    published = MenuItem.objects.filter(status=ProductStatusType.publish.value)
+
+    with transaction.atomic():
+        for item_id, quantity in lines:
+            updated = published.filter(pk=item_id, stock__gte=quantity).update(stock=F("stock") - quantity)
+            if not updated:
+                raise OutOfStock(item_id, quantity)
+
+        rows = list(MenuItem.objects.filter(pk__in=[item_id for item_id, _ in lines]).values_list("pk", "slug", "stock"))
+        slugs = [slug for _, slug, _ in rows]
+        # قبل از این سفارش موجودی حداقل برابر مقدار درخواستی بوده؛ صفر یعنی همین الان تمام شد
+        sold = [pk for pk, _, stock in rows if stock == 0]
+
+        transaction.on_commit(lambda: invalidate_menu_items(slugs))
+        if sold:
+            transaction.on_commit(lambda: sold_out.send(sender=MenuItem, item_ids=sold))
+    return sold
+
+
+def release_stock(lines):
+    """
+    Put the stock of a cancelled order back.
+    """
+    lines = merge_lines(lines)
+    with transaction.atomic():
+        for item_id, quantity in lines:
+            MenuItem.objects.filter(pk=item_id).update(stock=F("stock") + quantity)
+        slugs = list(MenuItem.objects.filter(pk__in=[item_id for item_id, _ in lines]).values_list("slug", flat=True))
+        transaction.on_commit(lambda: invalidate_menu_items(slugs))
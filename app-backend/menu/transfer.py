@@ -0,0 +1,244 @@
+"""
+Streaming bulk import and export of menu items as CSV or JSON Lines.
+
+Import reads the source row by row, validates rows in chunks and writes each
+chunk with one ``bulk_create`` for the items and one for their category
+rows. Export walks the table with ``.iterator()`` and yields text, so neither
+direction holds the whole menu in memory.
+
+Both formats use the same columns; ``categories`` holds category slugs
+(``|``-separated in CSV, a list in JSONL).
+"""
+import csv
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+
+from .cache import invalidate_menu_snapshots
+from .models import MenuItem, Category
+from .search import build_document, index_documents
+
+
+FORMATS = ("csv", "jsonl")
+IMPORT_FIELDS = (
+    "title", "description", "price", "discount_percent", "stock",
+    "status", "is_featured", "preparation_time",
+)
+EXPORT_FIELDS = ("id", "slug", *IMPORT_FIELDS, "image", "categories")
+CSV_CATEGORY_SEPARATOR = "|"
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportReport:
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, row_number, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "errors": errors})
+
+    def as_dict(self):
+        return {"created": self.created, "failed": self.failed, "errors": self.errors}
+
+
+class ImportFileError(ValueError):
+    """The source cannot be read any further (bad encoding or broken CSV)."""
+
+    def __init__(self, row_number, message):
+        super().__init__(message)
+        self.row_number = row_number
+        self.message = message
+
+
+def detect_format(filename, default="csv"):
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    return extension if extension in FORMATS else default
+
+
+def read_rows(stream, fmt):
+    """
+    Yield ``(row_number, dict)`` from a text stream. Malformed JSON lines are
+    yielded as ``None`` so they show up in the report; an undecodable or
+    broken file raises ``ImportFileError`` with the row it stopped at.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    # شماره سطر بعدی که خوانده می‌شود؛ برای گزارش خطای فایل
+    number = 2 if fmt == "csv" else 1
+    try:
+        if fmt == "csv":
+            for number, row in enumerate(csv.DictReader(stream), start=2):
+                if row.get("categories") is not None:
+                    row["categories"] = [slug for slug in row["categories"].split(CSV_CATEGORY_SEPARATOR) if slug]
+                yield number, row
+                number += 1
+        else:
+            for number, line in enumerate(stream, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                yield number, row if isinstance(row, dict) else None
+                number += 1
+    except UnicodeDecodeError:
+        raise ImportFileError(number, "File is not valid UTF-8.") from None
+    except csv.Error as e:
+        raise ImportFileError(number, f"Malformed CSV: {e}") from None
+
+
+def clean_row(row, categories_by_slug):
+    """
+    Validate one row with the model fields' own validators.
+    Returns ``(item, category_ids, errors)``.
+    """
+    if row is None:
+        return None, [], {"row": ["Malformed row."]}
+
+    values, errors = {}, {}
+    for name in IMPORT_FIELDS:
+        field = MenuItem._meta.get_field(name)
+        raw = row.get(name)
+        if raw in (None, ""):
+            if not field.has_default():
+                errors[name] = ["This field is required."]
+            continue
+        try:
+            values[name] = field.clean(raw, None)
+        except ValidationError as e:
+            errors[name] = e.messages
+
+    category_ids = []
+    for slug in row.get("categories") or []:
+        if slug in categories_by_slug:
+            category_ids.append(categories_by_slug[slug])
+        else:
+            errors.setdefault("categories", []).append(f"Unknown category: {slug}")
+
+    if errors:
+        return None, [], errors
+    return MenuItem(image=row.get("image") or "", **values), category_ids, None
+
+
+def _write_chunk(chunk, user):
+    items = [item for item, _ in chunk]
+    for item in items:
+        item.user = user
+    with transaction.atomic():
+        MenuItem.objects.bulk_create(items)
+        insert_category_rows(
+            (item.pk, category_id) for item, category_ids in chunk for category_id in category_ids
+        )
+        index_documents({item.pk: item.search_text for item in items})
+    return len(items)
+
+
+def insert_category_rows(rows):
+    """
+    Insert ``(menuitem_id, category_id)`` pairs into the through table with a
+    single ``executemany`` instead of building a model instance per row.
+    """
+    Through = MenuItem.category.through
+    table = connection.ops.quote_name(Through._meta.db_table)
+    menuitem = connection.ops.quote_name(Through._meta.get_field("menuitem").column)
+    category = connection.ops.quote_name(Through._meta.get_field("category").column)
+    with connection.cursor() as cursor:
+        cursor.executemany(f"INSERT INTO {table} ({menuitem}, {category}) VALUES (%s, %s)", list(rows))
+
+
+def import_menu_items(stream, fmt="csv", user=None, chunk_size=1000):
+    """
+    Import menu items from a text stream and return an ``ImportReport``.
+    Valid rows are written even when other rows fail; reading stops at the
+    first undecodable or malformed part of the file.
+    """
+    categories = Category.objects.values_list("slug", "pk", "title")
+    categories_by_slug = {slug: pk for slug, pk, _ in categories}
+    category_titles = {pk: title for _, pk, title in categories}
+    report = ImportReport()
+    chunk = []
+
+    try:
+        for number, row in read_rows(stream, fmt):
+            item, category_ids, errors = clean_row(row, categories_by_slug)
+            if errors:
+                report.add_error(number, errors)
+                continue
+            item.search_text = build_document(
+                item.title, [category_titles[pk] for pk in category_ids], item.description
+            )
+            chunk.append((item, category_ids))
+            if len(chunk) >= chunk_size:
+                report.created += _write_chunk(chunk, user)
+                chunk = []
+    except ImportFileError as e:
+        # بقیه فایل قابل خواندن نیست؛ سطرهای سالم قبلی مثل خطای سطری ذخیره می‌شوند
+        report.add_error(e.row_number, {"file": [e.message]})
+
+    if chunk:
+        report.created += _write_chunk(chunk, user)
+    if report.created:
+        invalidate_menu_snapshots()
+    return report
+
+
+class _Echo:
+    # بافر ساختگی برای csv.writer؛ هر سطر را برمی‌گرداند تا stream شود
+    def write(self, value):
+        return value
+
+
+def _export_chunks(chunk_size):
+    """
+    Yield lists of export rows (dicts); each chunk costs one query for the
+    items (streamed by ``.iterator()``) and one for their category slugs.
+    """
+    columns = [name for name in EXPORT_FIELDS if name != "categories"]
+    rows = MenuItem.objects.order_by("pk").values_list(*columns).iterator(chunk_size=chunk_size)
+    chunk = []
+    for values in rows:
+        chunk.append(dict(zip(columns, values)))
+        if len(chunk) >= chunk_size:
+            yield _with_categories(chunk)
+            chunk = []
+    if chunk:
+        yield _with_categories(chunk)
+
+
+def _with_categories(chunk):
+    slugs = {}
+    category_rows = MenuItem.category.through.objects.filter(
+        menuitem_id__gte=chunk[0]["id"], menuitem_id__lte=chunk[-1]["id"]
+    ).values_list("menuitem_id", "category__slug")
+    for item_id, slug in category_rows:
+        slugs.setdefault(item_id, []).append(slug)
+    for row in chunk:
+        row["price"] = int(row["price"])
+        row["image"] = row["image"] or ""
+        row["categories"] = slugs.get(row["id"], [])
+    return chunk
+
+
+def export_menu_items(fmt="csv", chunk_size=2000):
+    """
+    Yield the whole menu as CSV or JSONL text, ``chunk_size`` rows per query.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+    if fmt == "csv":
+        writer = csv.writer(_Echo())
+        yield writer.writerow(EXPORT_FIELDS)
+        for chunk in _export_chunks(chunk_size):
+            for row in chunk:
+                row["categories"] = CSV_CATEGORY_SEPARATOR.join(row["categories"])
+                yield writer.writerow([row[name] for name in EXPORT_FIELDS])
+    else:
+        for chunk in _export_chunks(chunk_size):
+            for row in chunk:
+                yield json.dumps(row, ensure_ascii=False) + "\n"
@@ -1,8 +1,33 @@
-from django.contrib import admin
-from .models import Reservation
+from django import forms
+from django.contrib import admin, messages
+from django.http import HttpResponseRedirect
+from .models import Reservation, SeatingPlan
+from .capacity import get_plan, book, rebook, remaining_covers, SlotFull
+
+
+def slot_full_message(remaining):
+    return f"ظرفیت این زمان تکمیل است. ظرفیت باقیمانده: {remaining} نفر"
+
+
+class ReservationAdminForm(forms.ModelForm):
+
+    class Meta:
+        model = Reservation
+        fields = "__all__"
+
+    def clean(self):
+        data = super().clean()
+        if all(data.get(name) is not None for name in ("date", "time", "people")):
+            remaining = remaining_covers(get_plan(), data["date"], data["time"], self.instance)
+            if data["people"] > remaining:
+                raise forms.ValidationError(slot_full_message(remaining))
+        return data
+
 
 @admin.register(Reservation)
 class ReservationAdmin(admin.ModelAdmin):
+    # ثبت و جابه‌جایی از پنل مدیریت هم از شمارنده ظرفیت بازه‌ها رد می‌شود
+    form = ReservationAdminForm
     list_display = ("user", "date", "time", "people", "created_date")
     list_filter = ("date", "time")
     search_fields = ("user__email", "user__username", "user__profile__phone")  # بستگی به مدل profile داره
@@ -20,3 +45,41 @@ class ReservationAdmin(admin.ModelAdmin):
             "fields": ("created_date",)
         }),
     )
+
+    def save_model(self, request, obj, form, change):
+        def save():
+            super(ReservationAdmin, self).save_model(request, obj, form, change)
+
+        try:
+            if change:
+                rebook(Reservation.objects.get(pk=obj.pk), obj.date, obj.time, obj.people, save)
+            else:
+                book(obj.date, obj.time, obj.people, save)
+        except SlotFull as e:
+            # بین اعتبارسنجی فرم و ذخیره، رزرو دیگری ظرفیت را گرفته است
+            obj._slot_full = True
+            self.message_user(request, slot_full_message(e.remaining), messages.ERROR)
+
+    def log_addition(self, request, obj, message):
+        if not getattr(obj, "_slot_full", False):
+            return super().log_addition(request, obj, message)
+
+    def log_change(self, request, obj, message):
+        if not getattr(obj, "_slot_full", False):
+            return super().log_change(request, obj, message)
+
+    def response_add(self, request, obj, post_url_continue=None):
+        if getattr(obj, "_slot_full", False):
+            return HttpResponseRedirect(request.get_full_path())
+        return super().response_add(request, obj, post_url_continue)
+
+    def response_change(self, request, obj):
+        if getattr(obj, "_slot_full", False):
+            return HttpResponseRedirect(request.get_full_path())
+        return super().response_change(request, obj)
+
+
+@admin.register(SeatingPlan)
+class SeatingPlanAdmin(admin.ModelAdmin):
+    list_display = ("title", "covers_per_slot", "slot_minutes", "opens_at", "closes_at", "is_active")
+    list_filter = ("is_active",)
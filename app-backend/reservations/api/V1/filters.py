@@ -0,0 +1,23 @@
+import django_filters
+from reservations.models import Reservation
+
+
+class ReservationFilter(django_filters.FilterSet):
+    """
+    Date and time ranges are inclusive; with ``?date=`` (or a date range)
+    and ``?ordering=date,time`` the rows come straight from the
+    ``(date, time)`` index.
+    """
+
+    date_from = django_filters.DateFilter(field_name='date', lookup_expr='gte')
+    date_to = django_filters.DateFilter(field_name='date', lookup_expr='lte')
+    time_from = django_filters.TimeFilter(field_name='time', lookup_expr='gte')
+    time_to = django_filters.TimeFilter(field_name='time', lookup_expr='lte')
+    min_people = django_filters.NumberFilter(field_name='people', lookup_expr='gte')
+    max_people = django_filters.NumberFilter(field_name='people', lookup_expr='lte')
+    email = django_filters.CharFilter(field_name='user__email', lookup_expr='iexact')
+
+    class Meta:
+        model = Reservation
+        fields = ['date', 'people', 'user', 'date_from', 'date_to', 'time_from', 'time_to',
+                  'min_people', 'max_people', 'email']
@@ -0,0 +1,19 @@
+from rest_framework.pagination import CursorPagination
+
+
+class ReservationPagination(CursorPagination):
+    """
+    Keyset pagination on ``(created_date, id)``, newest first (or on the
+    ``?ordering=`` of the view); no COUNT and no OFFSET however many
+    reservations there are.
+    """
+
+    page_size = 20
+    ordering = ('-created_date', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        ordering = tuple(super().get_ordering(request, queryset, view))
+        # مرتب‌سازی روی (date, time) با id قطعی می‌شود
+        if ordering[-1].lstrip('-') not in ('id', 'pk'):
+            ordering += ('-id' if ordering[-1].startswith('-') else 'id',)
+        return ordering
@@ -1,8 +1,10 @@
 from rest_framework import serializers
 from reservations.models import Reservation
-from datetime import datetime, time
+from datetime import datetime
+from reservations.capacity import get_plan
+from config.instrumentation import TimedSerializerMixin
 
-class ReservationSerializer(serializers.ModelSerializer):
+class ReservationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     email = serializers.SerializerMethodField()
     phone = serializers.SerializerMethodField()
 
@@ -15,13 +17,18 @@ class ReservationSerializer(serializers.ModelSerializer):
         return obj.user.email
 
     def get_phone(self, obj):
-        return getattr(obj.user.profile, 'phone_number', None)
+        # کاربر بدون پروفایل خطای RelatedObjectDoesNotExist می‌دهد
+        profile = getattr(obj.user, 'profile', None)
+        return getattr(profile, 'phone_number', None)
 
     def validate(self, data):
         if data['date'] < datetime.today().date():
             raise serializers.ValidationError("تاریخ رزرو نمی‌تواند در گذشته باشد.")
         
-        if not time(12, 0) <= data['time'] <= time(22, 0):
-            raise serializers.ValidationError("رزرو فقط بین ساعت 12 تا 22 ممکن است.")
+        plan = get_plan()
+        if not plan.opens_at <= data['time'] <= plan.closes_at:
+            raise serializers.ValidationError(
+                f"رزرو فقط بین ساعت {plan.opens_at:%H:%M} تا {plan.closes_at:%H:%M} ممکن است."
+            )
         
         return data
\ No newline at end of file
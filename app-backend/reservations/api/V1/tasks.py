@@ -42,3 +42,13 @@ def send_reservation_email(name, email, date, time):
     except Exception as e:
         logger.error(f"خطا در ارسال ایمیل رزرو برای {email}: {e}")
         raise
+
+
+@shared_task
+def reconcile_reservation_occupancy():
+    """
+    Repairs cached availability and slot counters that drifted from the reservations.
+    """
+    from reservations.occupancy import reconcile
+
+    return reconcile()
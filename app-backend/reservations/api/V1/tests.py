@@ -5,6 +5,8 @@ from accounts.models import CustomeUser
 from reservations.models import Reservation
 from datetime import timedelta, time
 from unittest.mock import patch
+from contextlib import contextmanager
+from django.core.cache import cache
 @pytest.fixture
 def client():
     return APIClient()
@@ -106,7 +108,7 @@ def test_reservation_fails_with_invalid_time(client, create_user_with_profile):
 
     response = client.post("/reservations/api/V1/reserve/", data, format="json")
     assert response.status_code == 400
-    assert "رزرو فقط بین ساعت 12 تا 22 ممکن است" in str(response.data)
+    assert "رزرو فقط بین ساعت 12:00 تا 22:00 ممکن است" in str(response.data)
 
 
 
@@ -152,12 +154,347 @@ def test_my_reservations_returns_only_user_reservations(client, create_user_with
     response = client.get("/reservations/api/V1/user-reservations/")
 
     assert response.status_code == 200
-    assert len(response.data) == 2  # فقط رزروهای user1
-    for res in response.data:
+    assert len(response.data["results"]) == 2  # فقط رزروهای user1
+    for res in response.data["results"]:
         assert res["email"] == user1.email
+        assert res["phone"] == "09120000000"
+
+
+@pytest.mark.django_db
+def test_my_reservations_query_budget(client, create_user_with_profile, query_budget):
+    user = create_user_with_profile()
+    client.force_authenticate(user=user)
+    day = timezone.now().date() + timedelta(days=1)
+
+    def seed(n):
+        Reservation.objects.bulk_create([Reservation(user=user, date=day, time="13:00", people=2) for _ in range(n)])
+
+    query_budget(client, "/reservations/api/V1/user-reservations/", seed)
+    response = client.get("/reservations/api/V1/user-reservations/")
+    assert len(response.data["results"]) == 20 and response.data["next"]
 
 
 @pytest.mark.django_db
 def test_my_reservations_requires_authentication(client):
     response = client.get("/reservations/api/V1/user-reservations/")
-    assert response.status_code == 401
\ No newline at end of file
+    assert response.status_code == 401
+
+# ---------------- capacity ----------------
+
+AVAILABILITY_URL = "/reservations/api/V1/availability/"
+
+
+@pytest.fixture
+def seating_plan(db):
+    from reservations.models import SeatingPlan
+    return SeatingPlan.objects.create(title="سالن اصلی", covers_per_slot=10, slot_minutes=60)
+
+
+@pytest.mark.django_db
+def test_availability_reports_every_slot_in_one_query(client, create_user_with_profile, seating_plan, django_assert_num_queries):
+    user = create_user_with_profile()
+    day = timezone.now().date() + timedelta(days=1)
+    Reservation.objects.create(user=user, date=day, time="19:00", people=4)
+    Reservation.objects.create(user=user, date=day, time="19:30", people=3)
+    Reservation.objects.create(user=user, date=day + timedelta(days=1), time="19:00", people=5)
+
+    # پلن از کش خوانده می‌شود؛ فقط جمع گروهی
+    with django_assert_num_queries(1):
+        response = client.get(AVAILABILITY_URL, {"date": day.isoformat()})
+    assert response.status_code == 200
+    slots = {slot["time"]: slot for slot in response.data["slots"]}
+    assert list(slots)[0] == "12:00" and list(slots)[-1] == "22:00"
+    assert slots["19:00"] == {"time": "19:00", "capacity": 10, "booked": 7, "remaining": 3}
+    assert slots["20:00"]["remaining"] == 10
+
+    assert client.get(AVAILABILITY_URL, {"date": "2025-13-40"}).status_code == 400
+    assert client.get(AVAILABILITY_URL).status_code == 400
+
+
+@pytest.mark.django_db
+@patch("reservations.api.V1.views.send_reservation_email.delay")
+def test_reservation_hours_follow_seating_plan(mock_send_email, client, create_user_with_profile):
+    from django.core.exceptions import ValidationError as ModelValidationError
+    from reservations.models import SeatingPlan
+
+    plan = SeatingPlan.objects.create(title="شام", covers_per_slot=10, opens_at=time(17, 0), closes_at=time(23, 0))
+    user = create_user_with_profile()
+    client.force_authenticate(user=user)
+    day = (timezone.now().date() + timedelta(days=1)).isoformat()
+
+    response = client.post("/reservations/api/V1/reserve/", {"date": day, "time": "12:30:00", "people": 2}, format="json")
+    assert response.status_code == 400
+    assert "رزرو فقط بین ساعت 17:00 تا 23:00 ممکن است" in str(response.data)
+    assert client.post("/reservations/api/V1/reserve/", {"date": day, "time": "22:30:00", "people": 2}, format="json").status_code == 201
+
+    plan.slot_minutes = 0
+    with pytest.raises(ModelValidationError):
+        plan.full_clean()
+
+    # تغییر پلن کش آن را پاک می‌کند
+    plan.opens_at = time(12, 0)
+    plan.slot_minutes = 30
+    plan.save()
+    assert client.post("/reservations/api/V1/reserve/", {"date": day, "time": "12:30:00", "people": 2}, format="json").status_code == 201
+
+
+@pytest.mark.django_db
+@patch("reservations.api.V1.views.send_reservation_email.delay")
+def test_reservation_rejected_when_slot_is_full(mock_send_email, client, create_user_with_profile, seating_plan):
+    user = create_user_with_profile()
+    client.force_authenticate(user=user)
+    day = (timezone.now().date() + timedelta(days=1)).isoformat()
+
+    assert client.post("/reservations/api/V1/reserve/", {"date": day, "time": "19:00:00", "people": 6}, format="json").status_code == 201
+    response = client.post("/reservations/api/V1/reserve/", {"date": day, "time": "19:45:00", "people": 5}, format="json")
+    assert response.status_code == 400
+    assert "ظرفیت این زمان تکمیل است" in str(response.data["time"])
+
+    # بازه بعدی هنوز خالی است
+    assert client.post("/reservations/api/V1/reserve/", {"date": day, "time": "20:00:00", "people": 5}, format="json").status_code == 201
+    assert client.post("/reservations/api/V1/reserve/", {"date": day, "time": "19:15:00", "people": 4}, format="json").status_code == 201
+    assert Reservation.objects.filter(date=day).count() == 3
+
+
+@pytest.mark.django_db
+def test_slot_counter_follows_create_edit_and_delete(create_user_with_profile, seating_plan):
+    from reservations.capacity import book, rebook, SlotFull
+    from reservations.models import SlotOccupancy
+
+    user = create_user_with_profile()
+    day = timezone.now().date() + timedelta(days=1)
+    # رزرو قدیمی که پیش از شمارنده‌ها ثبت شده
+    Reservation.objects.create(user=user, date=day, time="19:10", people=3)
+
+    def make(value, people):
+        return book(day, time(*value), people, lambda: Reservation.objects.create(user=user, date=day, time=time(*value), people=people))
+
+    second = make((19, 40), 6)
+    assert SlotOccupancy.objects.get(date=day, slot=time(19, 0)).covers == 9
+    with pytest.raises(SlotFull) as full:
+        make((19, 0), 2)
+    assert full.value.remaining == 1
+    assert Reservation.objects.filter(date=day).count() == 2
+
+    def save():
+        second.time, second.people = time(20, 0), 8
+        second.save()
+        return second
+
+    rebook(second, day, time(20, 0), 8, save)
+    covers = dict(SlotOccupancy.objects.filter(date=day).values_list("slot", "covers"))
+    assert covers == {time(19, 0): 3, time(20, 0): 8}
+
+    second.delete()
+    assert SlotOccupancy.objects.get(date=day, slot=time(20, 0)).covers == 0
+
+
+@pytest.mark.django_db
+def test_booking_retries_while_database_is_locked(create_user_with_profile, seating_plan, mocker, settings):
+    from django.db import OperationalError
+    from reservations.capacity import book
+    from reservations.models import SlotOccupancy
+
+    settings.RESERVATION_RETRY_DELAY = 0
+    user = create_user_with_profile()
+    day = timezone.now().date() + timedelta(days=1)
+    calls = []
+
+    def save():
+        calls.append(1)
+        if len(calls) < 3:
+            raise OperationalError("database is locked")
+        return Reservation.objects.create(user=user, date=day, time="13:00", people=2)
+
+    book(day, time(13, 0), 2, save)
+    assert len(calls) == 3
+    assert Reservation.objects.count() == 1
+    # تلاش‌های ناموفق برگشت خورده‌اند
+    assert SlotOccupancy.objects.get(date=day).covers == 2
+
+    with pytest.raises(OperationalError):
+        book(day, time(13, 0), 2, lambda: (_ for _ in ()).throw(OperationalError("no such table")))
+
+
+# ---------------- occupancy cache ----------------
+
+@contextmanager
+def cache_round_trips():
+    """
+    Names of the cache calls made by the code under test; get_many of the
+    memory cache calls get per key, so those inner calls are not counted.
+    """
+    calls, depth = [], [0]
+    originals = {name: getattr(cache, name) for name in ("get", "get_many", "set", "set_many", "delete")}
+
+    def counted(name):
+        def call(*args, **kwargs):
+            if not depth[0]:
+                calls.append(name)
+            depth[0] += 1
+            try:
+                return originals[name](*args, **kwargs)
+            finally:
+                depth[0] -= 1
+        return call
+
+    for name in originals:
+        setattr(cache, name, counted(name))
+    try:
+        yield calls
+    finally:
+        for name in originals:
+            delattr(cache, name)
+
+
+@pytest.mark.django_db
+def test_month_availability_is_served_from_cache(client, create_user_with_profile, seating_plan, django_assert_num_queries):
+    user = create_user_with_profile()
+    day = timezone.now().date() + timedelta(days=1)
+    Reservation.objects.create(user=user, date=day, time="19:00", people=4)
+    month = f"{day:%Y-%m}"
+
+    with django_assert_num_queries(1):
+        response = client.get(f"{AVAILABILITY_URL}month/", {"month": month})
+    assert response.status_code == 200
+    assert response.data["slots"][7] == "19:00"
+    assert response.data["days"][day.isoformat()][7] == 6
+    assert len(response.data["days"]) >= 28
+
+    # روزهای ماه و پلن با یک get_many از کش خوانده می‌شوند
+    with django_assert_num_queries(0), cache_round_trips() as trips:
+        assert client.get(f"{AVAILABILITY_URL}month/", {"month": month}).data == response.data
+    assert trips == ["get_many"]
+
+    for value in ("2025-13", "2025", "abc"):
+        assert client.get(f"{AVAILABILITY_URL}month/", {"month": value}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_occupancy_cache_follows_create_edit_and_delete(create_user_with_profile, seating_plan, django_capture_on_commit_callbacks):
+    from reservations.occupancy import day_availability
+
+    user = create_user_with_profile()
+    day = timezone.now().date() + timedelta(days=1)
+
+    def booked():
+        slots = day_availability(day)["slots"]
+        return {slot["time"]: slot["booked"] for slot in slots if slot["booked"]}
+
+    assert booked() == {}
+    with django_capture_on_commit_callbacks(execute=True):
+        reservation = Reservation.objects.create(user=user, date=day, time="19:30", people=4)
+    assert booked() == {"19:00": 4}
+
+    reservation = Reservation.objects.get(pk=reservation.pk)
+    reservation.time, reservation.people = time(21, 0), 6
+    with django_capture_on_commit_callbacks(execute=True):
+        reservation.save()
+    assert booked() == {"21:00": 6}
+
+    # ذخیره بدون تغییر چیزی را دوبار حساب نمی‌کند
+    with django_capture_on_commit_callbacks(execute=True):
+        reservation.save()
+    assert booked() == {"21:00": 6}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        reservation.delete()
+    assert booked() == {}
+
+
+@pytest.mark.django_db
+def test_occupancy_signals_accept_string_values(create_user_with_profile, seating_plan, django_capture_on_commit_callbacks):
+    from reservations.capacity import book
+    from reservations.models import SlotOccupancy
+    from reservations.occupancy import day_availability
+
+    user = create_user_with_profile()
+    day = timezone.now().date() + timedelta(days=1)
+    assert day_availability(day)["slots"][7]["booked"] == 0
+
+    # create با رشته؛ ویرایش بعدی همان نمونه باید زمان قبلی را بشناسد
+    with django_capture_on_commit_callbacks(execute=True):
+        reservation = book(day, time(19, 0), 2, lambda: Reservation.objects.create(
+            user=user, date=day.isoformat(), time="19:00", people=2
+        ))
+    reservation.people = 5
+    with django_capture_on_commit_callbacks(execute=True):
+        reservation.save()
+    assert day_availability(day)["slots"][7]["booked"] == 5
+
+    with django_capture_on_commit_callbacks(execute=True):
+        reservation.delete()
+    assert day_availability(day)["slots"][7]["booked"] == 0
+
+    # آزاد کردن شمارنده هم با مقدار رشته‌ای
+    other = book(day, time(20, 0), 3, lambda: Reservation.objects.create(user=user, date=day, time="20:00", people=3))
+    other.delete()
+    assert SlotOccupancy.objects.get(date=day, slot=time(20, 0)).covers == 0
+
+
+@pytest.mark.django_db
+def test_reconcile_repairs_drifted_cache_and_counters(create_user_with_profile, seating_plan):
+    from reservations.capacity import book
+    from reservations.models import SlotOccupancy
+    from reservations.occupancy import day_availability, reconcile
+
+    user = create_user_with_profile()
+    day = timezone.now().date() + timedelta(days=1)
+    book(day, time(19, 0), 4, lambda: Reservation.objects.create(user=user, date=day, time="19:00", people=4))
+    assert day_availability(day)["slots"][7]["booked"] == 4
+
+    # تغییر مستقیم در دیتابیس بدون سیگنال
+    Reservation.objects.filter(date=day).update(people=2)
+    assert day_availability(day)["slots"][7]["booked"] == 4
+
+    assert reconcile(days=3) == (1, 1)
+    assert day_availability(day)["slots"][7]["booked"] == 2
+    assert SlotOccupancy.objects.get(date=day).covers == 2
+    assert reconcile(days=3) == (0, 0)
+
+
+# ---------------- django admin ----------------
+
+@pytest.mark.django_db
+def test_admin_add_and_change_go_through_slot_counters(admin_client, create_user_with_profile, seating_plan):
+    from django.urls import reverse
+    from reservations.models import SlotOccupancy
+
+    user = create_user_with_profile()
+    day = timezone.now().date() + timedelta(days=1)
+    form = {"user": user.pk, "people": 6, "date": day.isoformat(), "time": "19:15"}
+
+    response = admin_client.post(reverse("admin:reservations_reservation_add"), form)
+    assert response.status_code == 302
+    reservation = Reservation.objects.get()
+    assert SlotOccupancy.objects.get(date=day, slot=time(19, 0)).covers == 6
+
+    # ظرفیت بازه ۱۰ نفر است
+    response = admin_client.post(reverse("admin:reservations_reservation_add"), {**form, "people": 5})
+    assert response.status_code == 200
+    assert "ظرفیت این زمان تکمیل است" in response.content.decode()
+    assert Reservation.objects.count() == 1
+
+    # ویرایش در همان بازه صندلی‌های خودش را آزاد حساب می‌کند
+    change_url = reverse("admin:reservations_reservation_change", args=[reservation.pk])
+    assert admin_client.post(change_url, {**form, "people": 9}).status_code == 302
+    assert admin_client.post(change_url, {**form, "people": 8, "time": "20:00"}).status_code == 302
+    covers = dict(SlotOccupancy.objects.filter(date=day).values_list("slot", "covers"))
+    assert covers == {time(19, 0): 0, time(20, 0): 8}
+
+
+@pytest.mark.django_db
+def test_admin_add_reports_slot_taken_after_validation(admin_client, create_user_with_profile, seating_plan, mocker):
+    from django.urls import reverse
+
+    user = create_user_with_profile()
+    day = timezone.now().date() + timedelta(days=1)
+    Reservation.objects.create(user=user, date=day, time="19:00", people=8)
+    # فرم ظرفیت کافی دیده ولی هنگام ذخیره بازه پر شده است
+    mocker.patch("reservations.admin.remaining_covers", return_value=10)
+
+    url = reverse("admin:reservations_reservation_add")
+    response = admin_client.post(url, {"user": user.pk, "people": 4, "date": day.isoformat(), "time": "19:00"}, follow=True)
+    assert response.status_code == 200
+    assert "ظرفیت این زمان تکمیل است" in response.content.decode()
+    assert Reservation.objects.count() == 1
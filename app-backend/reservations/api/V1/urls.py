@@ -1,10 +1,13 @@
 from django.urls import path
 from .views import ReservationCreateView
 from .views import MyReservationsView
+from .views import AvailabilityView, MonthAvailabilityView
 
 app_name = 'reserv-api'
 
 urlpatterns = [
     path('reserve/', ReservationCreateView.as_view(), name='reserve'),
     path('user-reservations/', MyReservationsView.as_view(), name='user_reservations'),
+    path('availability/', AvailabilityView.as_view(), name='availability'),
+    path('availability/month/', MonthAvailabilityView.as_view(), name='availability_month'),
 ]
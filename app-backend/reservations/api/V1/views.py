@@ -3,10 +3,19 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import ValidationError
 from reservations.models import Reservation
 from .serializers import ReservationSerializer
+from .paginations import ReservationPagination
 from .tasks import send_reservation_email  # اگه ایمیل رو با Celery می‌فرستی
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError
+from rest_framework import status
+from django.utils.dateparse import parse_date
+from reservations.capacity import book, SlotFull
+from reservations.occupancy import day_availability, month_availability
+
+
+def slot_full_error(e):
+    return ValidationError({"time": f"ظرفیت این زمان تکمیل است. ظرفیت باقیمانده: {e.remaining} نفر"})
 
 
 class ReservationCreateView(generics.CreateAPIView):
@@ -25,7 +34,11 @@ class ReservationCreateView(generics.CreateAPIView):
         if not phone:
             raise ValidationError("شماره تلفن شما ثبت نشده. لطفاً ابتدا پروفایل خود را تکمیل کنید.")
 
-        reservation = serializer.save(user=user)
+        data = serializer.validated_data
+        try:
+            reservation = book(data["date"], data["time"], data["people"], lambda: serializer.save(user=user))
+        except SlotFull as e:
+            raise slot_full_error(e)
 
         # ارسال ایمیل
         try:
@@ -44,10 +57,42 @@ class ReservationCreateView(generics.CreateAPIView):
 
 
 
-class MyReservationsView(APIView):
+class MyReservationsView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
+    serializer_class = ReservationSerializer
+    pagination_class = ReservationPagination
+
+    def get_queryset(self):
+        # ایمیل و تلفن هر ردیف از همین کوئری خوانده می‌شود
+        return Reservation.objects.filter(user=self.request.user).select_related('user__profile')
+
+
+class AvailabilityView(APIView):
+    """
+    Remaining covers of every slot on ``?date=YYYY-MM-DD``.
+    """
 
     def get(self, request):
-        reservations = Reservation.objects.filter(user=request.user)
-        serializer = ReservationSerializer(reservations, many=True)
-        return Response(serializer.data)
+        try:
+            date = parse_date(request.query_params.get("date", ""))
+        except ValueError:
+            date = None
+        if date is None:
+            return Response({"detail": "پارامتر date نامعتبر است."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(day_availability(date))
+
+
+class MonthAvailabilityView(APIView):
+    """
+    Remaining covers per slot for every day of ``?month=YYYY-MM``, read from
+    the occupancy cache in one round trip.
+    """
+
+    def get(self, request):
+        try:
+            year, month = (int(part) for part in request.query_params.get("month", "").split("-"))
+        except ValueError:
+            year, month = 0, 0
+        if not (1 <= year <= 9999 and 1 <= month <= 12):
+            return Response({"detail": "پارامتر month نامعتبر است."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(month_availability(year, month))
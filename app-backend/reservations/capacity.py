@@ -0,0 +1,193 @@
+"""
+Seating capacity per reservation slot.
+
+The day is cut into slots of ``slot_minutes`` starting at ``opens_at``; a
+reservation takes its party size from the slot its time falls in.
+
+Bookings go through a ``SlotOccupancy`` counter row per slot::
+
+    UPDATE ... SET covers = covers + n WHERE ... AND covers <= capacity - n
+
+in the same transaction as the reservation insert, so two concurrent
+requests can never both take the last seats. A missing counter row is
+created from the reservations already in its slot. SQLite answers a busy
+write lock with "database is locked" after its timeout; those writes are
+retried with backoff.
+"""
+import random
+import time as clock
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction, IntegrityError, OperationalError
+from django.db.models import F, Sum
+
+from .models import Reservation, SeatingPlan, SlotOccupancy
+
+
+class SlotFull(Exception):
+    def __init__(self, slot, remaining):
+        self.slot = slot
+        self.remaining = remaining
+        super().__init__(f"Slot {slot:%H:%M} has {remaining} covers left.")
+
+
+PLAN_CACHE_KEY = "reservations:plan"
+
+
+def get_plan():
+    """
+    The active plan, cached until a ``SeatingPlan`` changes; every booking
+    reads it several times (validation, counters, occupancy signals).
+    """
+    plan = cache.get(PLAN_CACHE_KEY)
+    if plan is None:
+        plan = load_plan()
+    return plan
+
+
+def load_plan():
+    """
+    Read the active plan from the database and cache it.
+    """
+    plan = SeatingPlan.objects.filter(is_active=True).order_by("-created_date", "-id").first()
+    if plan is None:
+        plan = SeatingPlan(
+            title="default",
+            covers_per_slot=settings.RESERVATION_COVERS_PER_SLOT,
+            slot_minutes=settings.RESERVATION_SLOT_MINUTES,
+        )
+    cache.set(PLAN_CACHE_KEY, plan, settings.RESERVATION_PLAN_TIMEOUT)
+    return plan
+
+
+def invalidate_plan():
+    cache.delete(PLAN_CACHE_KEY)
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def day_slots(plan):
+    """
+    Start times of every slot from ``opens_at`` up to and including ``closes_at``.
+    """
+    start, last = _minutes(plan.opens_at), _minutes(plan.closes_at)
+    return [time(minute // 60, minute % 60) for minute in range(start, last + 1, plan.slot_minutes)]
+
+
+def slot_of(plan, value):
+    offset = (_minutes(value) - _minutes(plan.opens_at)) // plan.slot_minutes * plan.slot_minutes
+    # زمان‌های قبل از شروع پذیرش به بازه‌ای بیرون از day_slots می‌افتند
+    minute = (_minutes(plan.opens_at) + offset) % (24 * 60)
+    return time(minute // 60, minute % 60)
+
+
+def slot_reservations(plan, date, slot):
+    end = (datetime.combine(date, slot) + timedelta(minutes=plan.slot_minutes)).time()
+    reservations = Reservation.objects.filter(date=date, time__gte=slot)
+    # آخرین بازه ممکن است از نیمه‌شب بگذرد
+    return reservations.filter(time__lt=end) if end > slot else reservations
+
+
+def occupancy(plan, date, slot):
+    """
+    The counter row of a slot, created from its reservations when missing.
+    """
+    lookup = {"date": date, "slot": slot, "slot_minutes": plan.slot_minutes}
+    row = SlotOccupancy.objects.filter(**lookup).first()
+    if row is None:
+        booked = slot_reservations(plan, date, slot).aggregate(covers=Sum("people"))["covers"] or 0
+        try:
+            with transaction.atomic():
+                row = SlotOccupancy.objects.create(covers=booked, **lookup)
+        except IntegrityError:
+            # درخواست همزمان دیگری ردیف را ساخته است
+            row = SlotOccupancy.objects.get(**lookup)
+    return row
+
+
+def reserve_seats(plan, date, value, people):
+    """
+    Take ``people`` covers in the slot of ``value``; raise ``SlotFull`` if they don't fit.
+    Must run inside the transaction that saves the reservation.
+    """
+    slot = slot_of(plan, value)
+    row = occupancy(plan, date, slot)
+    taken = SlotOccupancy.objects.filter(pk=row.pk, covers__lte=plan.covers_per_slot - people).update(
+        covers=F("covers") + people
+    )
+    if not taken:
+        row.refresh_from_db(fields=["covers"])
+        raise SlotFull(slot, max(plan.covers_per_slot - row.covers, 0))
+
+
+def release_seats(plan, date, value, people):
+    slot = slot_of(plan, value)
+    SlotOccupancy.objects.filter(
+        date=date, slot=slot, slot_minutes=plan.slot_minutes, covers__gte=people
+    ).update(covers=F("covers") - people)
+
+
+def remaining_covers(plan, date, value, reservation=None):
+    """
+    Covers still free in the slot of ``value``. The seats ``reservation``
+    already holds in that slot count as free, so it can be edited in place.
+    """
+    slot = slot_of(plan, value)
+    remaining = plan.covers_per_slot - occupancy(plan, date, slot).covers
+    saved = getattr(reservation, "_saved_booking", None)
+    if reservation is not None and reservation.pk and saved and None not in saved:
+        if saved[0] == date and slot_of(plan, saved[1]) == slot:
+            remaining += saved[2]
+    return max(remaining, 0)
+
+
+def retry_on_locked(func):
+    """
+    Run ``func``, retrying with jittered backoff while SQLite reports the
+    database as locked.
+    """
+    attempts = settings.RESERVATION_WRITE_RETRIES
+    for attempt in range(attempts):
+        try:
+            return func()
+        except OperationalError as e:
+            if "locked" not in str(e) or attempt == attempts - 1:
+                raise
+            clock.sleep(settings.RESERVATION_RETRY_DELAY * 2 ** attempt * random.random())
+
+
+def book(date, value, people, save):
+    """
+    Reserve the seats and call ``save()`` in one transaction; returns its result.
+    """
+    plan = get_plan()
+
+    def attempt():
+        with transaction.atomic():
+            reserve_seats(plan, date, value, people)
+            return save()
+
+    return retry_on_locked(attempt)
+
+
+def rebook(reservation, date, value, people, save):
+    """
+    Move an existing reservation to a new slot / party size.
+    """
+    plan = get_plan()
+    # save() مقادیر نمونه را عوض می‌کند؛ برای تکرار، مقادیر قبلی نگه داشته می‌شوند
+    old_date, old_time, old_people = reservation.date, reservation.time, reservation.people
+
+    def attempt():
+        with transaction.atomic():
+            # ردیف قدیمی باید پیش از کم کردن وجود داشته باشد تا همین رزرو را شمرده باشد
+            occupancy(plan, old_date, slot_of(plan, old_time))
+            release_seats(plan, old_date, old_time, old_people)
+            reserve_seats(plan, date, value, people)
+            return save()
+
+    return retry_on_locked(attempt)
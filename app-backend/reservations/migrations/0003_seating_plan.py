@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-18 18:40
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0002_remove_reservation_email_remove_reservation_name_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatingPlan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=100, verbose_name='عنوان')),
+                ('covers_per_slot', models.PositiveIntegerField(verbose_name='ظرفیت هر بازه (نفر)')),
+                ('slot_minutes', models.PositiveIntegerField(default=30, verbose_name='طول هر بازه (دقیقه)')),
+                ('opens_at', models.TimeField(default=datetime.time(12, 0), verbose_name='شروع پذیرش')),
+                ('closes_at', models.TimeField(default=datetime.time(22, 0), verbose_name='آخرین نوبت')),
+                ('is_active', models.BooleanField(default=True, verbose_name='فعال')),
+                ('created_date', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ساخت')),
+            ],
+            options={
+                'verbose_name': 'ظرفیت سالن',
+                'verbose_name_plural': 'ظرفیت\u200cهای سالن',
+            },
+        ),
+    ]
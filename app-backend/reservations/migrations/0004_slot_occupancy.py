@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-18 18:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0003_seating_plan'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='روز')),
+                ('slot', models.TimeField(verbose_name='شروع بازه')),
+                ('slot_minutes', models.PositiveIntegerField(verbose_name='طول بازه (دقیقه)')),
+                ('covers', models.PositiveIntegerField(default=0, verbose_name='تعداد رزرو شده')),
+            ],
+            options={
+                'verbose_name': 'اشغال بازه',
+                'verbose_name_plural': 'اشغال بازه\u200cها',
+                'constraints': [models.UniqueConstraint(fields=('date', 'slot', 'slot_minutes'), name='reservation_slot_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-18 18:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0004_slot_occupancy'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['date', 'time'], name='reservation_date_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['user', 'created_date'], name='reservation_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['created_date'], name='reservation_created_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-18 19:20
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0005_reservation_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='seatingplan',
+            name='slot_minutes',
+            field=models.PositiveIntegerField(default=30, validators=[django.core.validators.MinValueValidator(1)], verbose_name='طول هر بازه (دقیقه)'),
+        ),
+    ]
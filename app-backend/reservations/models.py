@@ -1,5 +1,7 @@
 from django.db import models
+from django.core.validators import MinValueValidator
 from django.contrib.auth import get_user_model
+from datetime import time
 
 User = get_user_model()
 
@@ -14,7 +16,80 @@ class Reservation(models.Model):
     class Meta:
         ordering = ["-created_date"]
         verbose_name = "رزرو میز"
+        indexes = [
+            # رزروهای یک روز به ترتیب ساعت (لیست امشب پذیرش)
+            models.Index(fields=["date", "time"], name="reservation_date_time_idx"),
+            # رزروهای هر کاربر، جدیدترین اول
+            models.Index(fields=["user", "created_date"], name="reservation_user_created_idx"),
+            # ترتیب پیش‌فرض لیست مدیریت
+            models.Index(fields=["created_date"], name="reservation_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user.email} - {self.date} {self.time}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.mark_booking_saved()
+        return instance
+
+    def booking(self):
+        """
+        ``(date, time, people)`` as Python values; they may still be strings
+        after e.g. ``create(time="19:00")``. Deferred fields are ``None``.
+        """
+        return tuple(
+            self._meta.get_field(name).to_python(self.__dict__.get(name)) for name in ("date", "time", "people")
+        )
+
+    def mark_booking_saved(self):
+        # مقادیر ذخیره‌شده تا سیگنال‌ها بتوانند تغییر بازه را از جای قبلی کم کنند
+        self._saved_booking = self.booking()
+
+
+
+class SeatingPlan(models.Model):
+    """
+    How many covers the restaurant seats per reservation slot. The newest
+    active plan is used; without one the ``RESERVATION_*`` settings apply.
+    """
+
+    title = models.CharField(max_length=100, verbose_name="عنوان")
+    covers_per_slot = models.PositiveIntegerField(verbose_name="ظرفیت هر بازه (نفر)")
+    slot_minutes = models.PositiveIntegerField(default=30, validators=[MinValueValidator(1)], verbose_name="طول هر بازه (دقیقه)")
+    opens_at = models.TimeField(default=time(12, 0), verbose_name="شروع پذیرش")
+    closes_at = models.TimeField(default=time(22, 0), verbose_name="آخرین نوبت")
+    is_active = models.BooleanField(default=True, verbose_name="فعال")
+    created_date = models.DateTimeField(auto_now_add=True, verbose_name="تاریخ ساخت")
+
+    class Meta:
+        verbose_name = "ظرفیت سالن"
+        verbose_name_plural = "ظرفیت‌های سالن"
+
+    def __str__(self):
+        return f"{self.title}: {self.covers_per_slot} نفر / {self.slot_minutes} دقیقه"
+
+
+class SlotOccupancy(models.Model):
+    """
+    Covers booked in one slot of one day. Reservations add to it with a
+    conditional UPDATE in the same transaction as the insert, so the slot
+    can never go over capacity. Rows are keyed by the slot's start and
+    length, so changing the seating plan starts fresh rows.
+    """
+
+    date = models.DateField(verbose_name="روز")
+    slot = models.TimeField(verbose_name="شروع بازه")
+    slot_minutes = models.PositiveIntegerField(verbose_name="طول بازه (دقیقه)")
+    covers = models.PositiveIntegerField(default=0, verbose_name="تعداد رزرو شده")
+
+    class Meta:
+        verbose_name = "اشغال بازه"
+        verbose_name_plural = "اشغال بازه‌ها"
+        constraints = [
+            models.UniqueConstraint(fields=["date", "slot", "slot_minutes"], name="reservation_slot_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.slot:%H:%M}: {self.covers}"
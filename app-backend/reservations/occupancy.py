@@ -0,0 +1,169 @@
+"""
+Cached per-day slot occupancy for the availability calendar.
+
+Each date is one cache entry: the slot layout of the plan it was built for
+and a tuple with the covers booked in every slot of ``day_slots(plan)``. An
+entry of another layout counts as missing, so changing the plan's slots
+makes old entries useless. The keys only depend on the date, so the plan and
+a whole month are read together with one ``get_many``.
+
+- Missing dates are built together with one grouped aggregate and stored
+  with ``set_many``.
+- Reservation signals apply the change of a create, edit or delete to the
+  cached tuple once the transaction commits, instead of rebuilding it.
+- ``reconcile`` recomputes the upcoming days from the database and repairs
+  both the cache entries and the ``SlotOccupancy`` counters that drifted,
+  e.g. after edits made outside the API.
+
+The cache must be shared by the web and Celery processes (``CACHE_URL``);
+with the per-process memory cache, signals and ``reconcile`` only update
+the process they run in.
+"""
+import calendar
+from datetime import date as dt_date, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+
+from .capacity import PLAN_CACHE_KEY, get_plan, load_plan, day_slots, slot_of, retry_on_locked
+from .models import Reservation, SlotOccupancy
+
+
+def _layout(plan):
+    return f"{plan.slot_minutes}:{plan.opens_at:%H%M}:{plan.closes_at:%H%M}"
+
+
+def _key(date):
+    return f"reservations:occupancy:{date.isoformat()}"
+
+
+def _slot_index(plan):
+    return {slot: index for index, slot in enumerate(day_slots(plan))}
+
+
+def load_covers(plan, dates):
+    """
+    ``{date: (covers per slot, ...)}`` for ``dates`` from one grouped query.
+    """
+    index = _slot_index(plan)
+    days = {date: [0] * len(index) for date in dates}
+    rows = Reservation.objects.filter(date__in=dates).values_list("date", "time").annotate(
+        covers=Sum("people")
+    ).order_by()
+    for date, value, covers in rows:
+        position = index.get(slot_of(plan, value))
+        # رزروهای بیرون از ساعات پذیرش در هیچ بازه‌ای نیستند
+        if position is not None:
+            days[date][position] += covers
+    return {date: tuple(covers) for date, covers in days.items()}
+
+
+def get_covers(dates, plan=None):
+    """
+    ``(plan, {date: covers per slot})``. Without ``plan`` the cached plan is
+    read in the same ``get_many`` as the days.
+    """
+    keys = {_key(date): date for date in dates}
+    values = cache.get_many(list(keys) if plan else [PLAN_CACHE_KEY, *keys])
+    if plan is None:
+        plan = values.pop(PLAN_CACHE_KEY, None) or load_plan()
+
+    layout = _layout(plan)
+    covers = {keys[key]: entry[1] for key, entry in values.items() if entry[0] == layout}
+    missing = [date for date in dates if date not in covers]
+    if missing:
+        built = load_covers(plan, missing)
+        cache.set_many({_key(date): (layout, value) for date, value in built.items()}, settings.RESERVATION_OCCUPANCY_TIMEOUT)
+        covers.update(built)
+    return plan, covers
+
+
+def apply_change(plan, date, value, people):
+    """
+    Add ``people`` (negative to remove) to a cached day, if it is cached.
+    """
+    key = _key(date)
+    entry = cache.get(key)
+    position = _slot_index(plan).get(slot_of(plan, value))
+    if entry is None or entry[0] != _layout(plan) or position is None:
+        return
+    covers = list(entry[1])
+    covers[position] = max(covers[position] + people, 0)
+    cache.set(key, (entry[0], tuple(covers)), settings.RESERVATION_OCCUPANCY_TIMEOUT)
+
+
+def day_availability(date, plan=None):
+    plan, covers = get_covers([date], plan)
+    covers = covers[date]
+    return {
+        "date": date.isoformat(),
+        "slot_minutes": plan.slot_minutes,
+        "slots": [
+            {
+                "time": f"{slot:%H:%M}",
+                "capacity": plan.covers_per_slot,
+                "booked": booked,
+                "remaining": max(plan.covers_per_slot - booked, 0),
+            }
+            for slot, booked in zip(day_slots(plan), covers)
+        ],
+    }
+
+
+def month_availability(year, month, plan=None):
+    """
+    Remaining covers of every slot of every day in the month.
+    """
+    dates = [dt_date(year, month, day) for day in range(1, calendar.monthrange(year, month)[1] + 1)]
+    plan, covers = get_covers(dates, plan)
+    return {
+        "month": f"{year:04d}-{month:02d}",
+        "slot_minutes": plan.slot_minutes,
+        "capacity": plan.covers_per_slot,
+        "slots": [f"{slot:%H:%M}" for slot in day_slots(plan)],
+        "days": {
+            date.isoformat(): [max(plan.covers_per_slot - booked, 0) for booked in covers[date]]
+            for date in dates
+        },
+    }
+
+
+def reconcile(days=None, plan=None):
+    """
+    Repair cached days and slot counters from today on that no longer match
+    the reservations. Returns ``(cache entries fixed, counters fixed)``.
+
+    The reservations are read and the counters repaired in one transaction;
+    under ``transaction_mode`` IMMEDIATE it holds the write lock from the
+    start, so no booking can commit in between and be overwritten.
+    """
+    plan = plan or get_plan()
+    today = dt_date.today()
+    dates = [today + timedelta(days=offset) for offset in range(days or settings.RESERVATION_RECONCILE_DAYS)]
+    slots = day_slots(plan)
+
+    def attempt():
+        with transaction.atomic():
+            truth = load_covers(plan, dates)
+
+            counters_fixed = 0
+            rows = SlotOccupancy.objects.filter(date__in=dates, slot_minutes=plan.slot_minutes).values_list("pk", "date", "slot", "covers")
+            for pk, date, slot, covers in rows:
+                expected = truth[date][slots.index(slot)] if slot in slots else covers
+                if covers != expected:
+                    counters_fixed += SlotOccupancy.objects.filter(pk=pk).update(covers=expected)
+
+            layout = _layout(plan)
+            cached = cache.get_many([_key(date) for date in dates])
+            stale = {
+                _key(date): (layout, covers)
+                for date, covers in truth.items()
+                if _key(date) in cached and cached[_key(date)] != (layout, covers)
+            }
+            if stale:
+                cache.set_many(stale, settings.RESERVATION_OCCUPANCY_TIMEOUT)
+        return len(stale), counters_fixed
+
+    return retry_on_locked(attempt)
@@ -0,0 +1,53 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Reservation, SeatingPlan
+from .capacity import get_plan, invalidate_plan, release_seats
+from .occupancy import apply_change
+
+
+@receiver([post_save, post_delete], sender=SeatingPlan)
+def invalidate_plan_on_change(sender, **kwargs):
+    # همین حالا و دوباره بعد از commit، تا درخواستی پلن قدیمی را دوباره در کش نگذارد
+    invalidate_plan()
+    transaction.on_commit(invalidate_plan)
+
+
+@receiver(post_delete, sender=Reservation)
+def release_reservation_seats(sender, instance, **kwargs):
+    release_seats(get_plan(), *instance.booking())
+
+
+# ---------------- occupancy cache ----------------
+
+
+@receiver(post_save, sender=Reservation)
+def update_occupancy_on_save(sender, instance, created, **kwargs):
+    saved = getattr(instance, "_saved_booking", None)
+    new = instance.booking()
+    instance.mark_booking_saved()
+    if created:
+        old = None
+    elif saved is None or None in saved:
+        # مقدار قبلی معلوم نیست؛ reconcile آن را درست می‌کند
+        return
+    else:
+        old = saved
+    if old == new:
+        return
+
+    plan = get_plan()
+
+    def apply():
+        if old:
+            apply_change(plan, old[0], old[1], -old[2])
+        apply_change(plan, new[0], new[1], new[2])
+
+    transaction.on_commit(apply)
+
+
+@receiver(post_delete, sender=Reservation)
+def update_occupancy_on_delete(sender, instance, **kwargs):
+    plan = get_plan()
+    date, value, people = instance.booking()
+    transaction.on_commit(lambda: apply_change(plan, date, value, -people))
@@ -8,13 +8,27 @@ function Menu() {
   const [activeCategory, setActiveCategory] = useState("starters");
 
   useEffect(() => {
-    axios.get("http://127.0.0.1:8000/menu/api/V1/menu-items/")
-      .then((response) => {
-        setMenuItems(response.data);
-      })
-      .catch((error) => {
-        console.error("❌ خطا در دریافت منو:", error);
-      });
+    let cancelled = false;
+
+    // لیست منو صفحه‌بندی شده است؛ همه صفحه‌ها با دنبال کردن next خوانده می‌شوند
+    const loadMenu = async () => {
+      let url = "http://127.0.0.1:8000/menu/api/V1/menu-items/";
+      let items = [];
+      while (url && !cancelled) {
+        const response = await axios.get(url);
+        items = items.concat(response.data.results);
+        url = response.data.next;
+      }
+      if (!cancelled) setMenuItems(items);
+    };
+
+    loadMenu().catch((error) => {
+      console.error("❌ خطا در دریافت منو:", error);
+    });
+
+    return () => {
+      cancelled = true;
+    };
   }, []);
 
   const groupedItems = menuItems.reduce((acc, item) => {
@@ -7,6 +7,8 @@ function Dashboard() {
   const navigate = useNavigate();
   const [reservations, setReservations] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextPage, setNextPage] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [userData, setUserData] = useState({});
   const [profileImage, setProfileImage] = useState(null);
   const [selectedFile, setSelectedFile] = useState(null);
@@ -23,7 +25,9 @@ function Dashboard() {
         headers: { Authorization: `Bearer ${token}` },
       })
       .then((res) => {
-        setReservations(res.data);
+        // لیست رزروها صفحه‌بندی شده است؛ آدرس صفحه بعد برای دکمه «نمایش بیشتر» نگه داشته می‌شود
+        setReservations(res.data.results);
+        setNextPage(res.data.next);
         setLoading(false);
       })
       .catch(() => setLoading(false));
@@ -43,6 +47,22 @@ function Dashboard() {
     }
   }, [navigate]);
 
+  const handleLoadMore = () => {
+    const token = localStorage.getItem('access');
+    if (!token || !nextPage) return;
+
+    setLoadingMore(true);
+    axios.get(nextPage, {
+      headers: { Authorization: `Bearer ${token}` },
+    })
+    .then((res) => {
+      setReservations((previous) => [...previous, ...res.data.results]);
+      setNextPage(res.data.next);
+    })
+    .catch((err) => console.error(err))
+    .finally(() => setLoadingMore(false));
+  };
+
   const handleLogout = () => {
     localStorage.removeItem('access');
     localStorage.removeItem('refresh');
@@ -283,6 +303,18 @@ function Dashboard() {
                   </div>
                 </div>
               ))}
+              {nextPage && (
+                <div className="col-12 text-center">
+                  <button
+                    className="btn btn-outline-danger rounded-pill px-4"
+                    onClick={handleLoadMore}
+                    disabled={loadingMore}
+                  >
+                    {loadingMore && <span className="spinner-border spinner-border-sm me-2" role="status"></span>}
+                    {t('dashboard.loadMore')}
+                  </button>
+                </div>
+              )}
             </div>
           ) : (
             <p className="text-muted">{t('dashboard.noReservations')}</p>